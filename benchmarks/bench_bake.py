@@ -0,0 +1,158 @@
+#!/usr/bin/env python
+# encoding: utf-8
+"""
+Benchmark of `darlog_maya_tools.export_rig_cleanup` bake engines: direct sampling vs ``bakeResults``.
+
+Requires Maya: run it with ``mayapy``. With a regular Python interpreter, it's skipped.
+Builds a synthetic rig: chains of joints, each one driven by a parent constraint to its own
+animated control. Then bakes the joints' local transforms with each engine (on a freshly built
+rig each time) and verifies the baked curves against the values of the rig itself.
+
+Usage (from repo root)::
+
+	mayapy benchmarks/bench_bake.py
+	mayapy benchmarks/bench_bake.py --joints 50 --frames 200 --engines sampling --json out.json
+	mayapy benchmarks/bench_bake.py --compare baseline.json --tolerance 0.25
+
+Exit code is non-zero if baked values are wrong or, with ``--compare``,
+if any case got slower than the baseline by more than the tolerance.
+"""
+
+__author__ = 'Lex Darlog (DRL)'
+
+import random as _random
+import sys as _sys
+
+import harness as _harness
+
+try:
+	import typing as _t
+except ImportError:
+	pass
+
+
+_engines = ['sampling', 'bakeResults']
+_checked_attribs = 'tx ty tz rx ry rz'.split()
+
+
+def _build_rig(n_joints: int, n_frames: int, chain_length: int, seed: int) -> _t.List[str]:
+	"""Joint chains, each joint constrained to a control with a key every 10 frames."""
+	from maya import cmds
+	cmds.file(new=True, force=True)
+	cmds.playbackOptions(min=1, max=n_frames)
+	rnd = _random.Random(seed)
+	joints = list()
+	for i in range(n_joints):
+		if i % chain_length == 0:
+			cmds.select(clear=True)  # start a new chain
+		joint = cmds.joint(position=(0, (i % chain_length) * 2.0, i // chain_length * 3.0))
+		control = cmds.spaceLocator()[0]
+		cmds.delete(cmds.parentConstraint(joint, control))
+		for frame in range(1, n_frames + 1, 10):
+			for attr in _checked_attribs:
+				cmds.setKeyframe(
+					control, attribute=attr, time=frame,
+					value=cmds.getAttr('{}.{}'.format(control, attr)) + rnd.uniform(-1.0, 1.0) * (
+						30.0 if attr.startswith('r') else 0.5
+					)
+				)
+		cmds.parentConstraint(control, joint, maintainOffset=True)
+		joints.append(cmds.ls(joint, long=True)[0])
+		cmds.select(joint)  # the next joint is its child
+	return joints
+
+
+def _reference_values(
+	joints: _t.List[str], frames: _t.List[int]
+) -> _t.Dict[_t.Tuple[str, str, int], float]:
+	"""Values evaluated by the rig itself (before bake), for a few sampled joints and frames."""
+	from maya import cmds
+	res = dict()
+	for joint in joints:
+		for attr in _checked_attribs:
+			for frame in frames:
+				res[(joint, attr, frame)] = cmds.getAttr('{}.{}'.format(joint, attr), time=frame)
+	return res
+
+
+def _n_mismatched(reference: _t.Dict[_t.Tuple[str, str, int], float], tolerance=1e-3) -> int:
+	"""Baked curves vs. the reference. Rotations may differ by full turns (after minimizing rotation)."""
+	from maya import cmds
+	n = 0
+	for (joint, attr, frame), expected in reference.items():
+		value = cmds.getAttr('{}.{}'.format(joint, attr), time=frame)
+		diff = value - expected
+		if attr.startswith('r'):
+			diff = (diff + 180.0) % 360.0 - 180.0
+		if abs(diff) > tolerance:
+			n += 1
+	return n
+
+
+def run_case(n_joints: int, n_frames: int, engine: str, chain_length: int, seed: int) -> _t.Dict[str, _t.Any]:
+	from maya import cmds
+	from darlog_maya_tools import export_rig_cleanup
+
+	joints = _build_rig(n_joints, n_frames, chain_length, seed)
+	check_joints = [joints[0], joints[len(joints) // 2], joints[-1]]
+	check_frames = sorted({1, 2, n_frames // 3, n_frames // 2 + 5, n_frames})
+	reference = _reference_values(check_joints, check_frames)
+
+	cmds.flushUndo()
+	seconds, _ = _harness.timed(export_rig_cleanup._bake_keys, joints, frame_range=(1, n_frames), engine=engine)
+
+	return dict(
+		case='{}-{}x{}'.format(engine, n_joints, n_frames),
+		engine=engine,
+		joints=n_joints,
+		frames=n_frames,
+		seconds=seconds,
+		keys_per_second=n_joints * len(export_rig_cleanup._baked_attribs) * n_frames / seconds if seconds > 0 else float('inf'),
+		mismatched=_n_mismatched(reference),
+	)
+
+
+def _format_row(row: _t.Dict[str, _t.Any]) -> str:
+	return "{case:<26} {joints:>7} {frames:>7} {s:>10.2f} {mkps:>9.2f}  {ok}".format(
+		s=row['seconds'],
+		mkps=row['keys_per_second'] / 1e6,
+		ok='OK' if not row['mismatched'] else 'WRONG ({} values)'.format(row['mismatched']),
+		**row
+	)
+
+
+def main(args=None) -> int:
+	parser = _harness.argument_parser(__doc__)
+	parser.add_argument('--joints', type=int, default=300)
+	parser.add_argument('--frames', type=int, default=2000)
+	parser.add_argument('--chain-length', type=int, default=10, help="Joints per chain")
+	parser.add_argument('--engines', nargs='+', default=_engines, choices=_engines)
+	parser.add_argument('--seed', type=int, default=0)
+	opts = parser.parse_args(args)
+
+	if not _harness.init_maya():
+		return 0
+
+	from maya import cmds
+
+	print("{:<26} {:>7} {:>7} {:>10} {:>9}".format('case', 'joints', 'frames', 'time, s', 'M key/s'))
+	rows = list()
+	for engine in opts.engines:
+		_harness.add_row(rows, run_case(opts.joints, opts.frames, engine, opts.chain_length, opts.seed), _format_row)
+
+	if len(rows) > 1 and all(row['seconds'] > 0 for row in rows):
+		fastest = min(rows, key=lambda x: x['seconds'])
+		slowest = max(rows, key=lambda x: x['seconds'])
+		print("\n{} is {:.1f}x faster than {}".format(
+			fastest['engine'], slowest['seconds'] / fastest['seconds'], slowest['engine']
+		))
+
+	return _harness.finish(
+		opts, rows,
+		error="baked values don't match the rig." if any(row['mismatched'] for row in rows) else None,
+		environment=dict(maya=cmds.about(version=True)), unit='s',
+	)
+
+
+if __name__ == '__main__':
+	_sys.exit(main())
@@ -0,0 +1,117 @@
+#!/usr/bin/env python
+# encoding: utf-8
+"""
+Cross-check of `darlog_maya_tools.unlock_normals` engines: the vectorized one vs the per-edge PyMel one.
+
+Requires Maya: run it with ``mayapy``. With a regular Python interpreter, it's skipped.
+Builds meshes with some hard edges, locks their normals, and classifies the edges with both engines.
+Both must find exactly the same hard edges: the engine choice (or NumPy availability)
+may only change the speed.
+
+Usage (from repo root)::
+
+	mayapy benchmarks/bench_unlock_engines.py
+	mayapy benchmarks/bench_unlock_engines.py --shapes sphere --subdivisions 8 16 --json out.json
+	mayapy benchmarks/bench_unlock_engines.py --compare baseline.json --tolerance 0.25
+
+Exit code is non-zero if the engines disagree or, with ``--compare``,
+if any case got slower than the baseline by more than the tolerance.
+"""
+
+__author__ = 'Lex Darlog (DRL)'
+
+import sys as _sys
+
+import harness as _harness
+
+try:
+	import typing as _t
+except ImportError:
+	pass
+
+
+_default_subdivisions = [8, 24]
+_shapes = ['sphere', 'cube', 'torus']
+
+
+def _build_mesh(shape: str, subdivisions: int) -> str:
+	"""A mesh with locked normals: partially hardened (by angle), then frozen."""
+	from maya import cmds
+	cmds.file(new=True, force=True)
+	if shape == 'sphere':
+		transform = cmds.polySphere(sx=subdivisions, sy=subdivisions, ch=False)[0]
+		angle = 10.0  # lower than the angle between neighbour faces: all edges are hard
+	elif shape == 'cube':
+		transform = cmds.polyCube(sx=subdivisions, sy=subdivisions, sz=subdivisions, ch=False)[0]
+		angle = 30.0  # only the cube's own edges are hard
+	else:
+		transform = cmds.polyTorus(sx=subdivisions, sy=subdivisions, ch=False)[0]
+		angle = 180.0  # all edges are soft
+	cmds.polySoftEdge(transform, angle=angle, ch=False)
+	cmds.polyNormalPerVertex(transform, freezeNormal=True)
+	cmds.delete(transform, constructionHistory=True)
+	return cmds.listRelatives(transform, shapes=True, fullPath=True)[0]
+
+
+def run_case(shape: str, subdivisions: int) -> _t.Dict[str, _t.Any]:
+	from pymel import core as pm
+	from darlog_maya.progress import NullProgress
+	from darlog_maya_tools import unlock_normals
+
+	mesh = pm.PyNode(_build_mesh(shape, subdivisions))
+	unlock_normals.clear_cache()
+	seconds, (arrays_edges, _) = _harness.timed(
+		unlock_normals._shape_hard_edge_ids_arrays, mesh, NullProgress()
+	)
+	legacy_seconds, (legacy_edges, _) = _harness.timed(
+		unlock_normals._shape_hard_edge_ids_legacy, mesh, NullProgress()
+	)
+	return dict(
+		case='{}-{}'.format(shape, subdivisions),
+		shape=shape,
+		edges=mesh.numEdges(),
+		hard_edges=len(arrays_edges),
+		mismatched=len(set(arrays_edges).symmetric_difference(legacy_edges)),
+		seconds=seconds,
+		legacy_seconds=legacy_seconds,
+	)
+
+
+def _format_row(row: _t.Dict[str, _t.Any]) -> str:
+	return "{case:<12} {edges:>8} {hard_edges:>8} {ms:>11.2f} {legacy_ms:>11.1f}  {ok}".format(
+		ms=row['seconds'] * 1000.0,
+		legacy_ms=row['legacy_seconds'] * 1000.0,
+		ok='OK' if not row['mismatched'] else 'MISMATCH ({} edges)'.format(row['mismatched']),
+		**row
+	)
+
+
+def main(args=None) -> int:
+	parser = _harness.argument_parser(__doc__)
+	parser.add_argument('--shapes', nargs='+', default=_shapes, choices=_shapes)
+	parser.add_argument(
+		'--subdivisions', type=int, nargs='+', default=_default_subdivisions,
+		help="Subdivisions of each primitive (the legacy engine is slow: keep them low)"
+	)
+	opts = parser.parse_args(args)
+
+	if not _harness.init_maya():
+		return 0
+
+	from maya import cmds
+
+	print("{:<12} {:>8} {:>8} {:>11} {:>11}".format('case', 'edges', 'hard', 'arrays, ms', 'legacy, ms'))
+	rows = list()
+	for shape in opts.shapes:
+		for subdivisions in opts.subdivisions:
+			_harness.add_row(rows, run_case(shape, subdivisions), _format_row)
+
+	return _harness.finish(
+		opts, rows,
+		error="the engines found different hard edges." if any(row['mismatched'] for row in rows) else None,
+		environment=dict(maya=cmds.about(version=True)),
+	)
+
+
+if __name__ == '__main__':
+	_sys.exit(main())
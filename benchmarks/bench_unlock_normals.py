@@ -0,0 +1,126 @@
+#!/usr/bin/env python
+# encoding: utf-8
+"""
+Benchmark of the hard-edge classification kernel used by `darlog_maya_tools.unlock_normals`.
+
+Runs on plain CPython (only NumPy is required, no Maya): generates synthetic meshes
+with locked normals, verifies the kernel result against the expected hard edges
+and reports throughput and peak memory.
+
+Usage (from repo root)::
+
+	python benchmarks/bench_unlock_normals.py
+	python benchmarks/bench_unlock_normals.py --sizes 1000 100000 --shapes grid box --json out.json
+	python benchmarks/bench_unlock_normals.py --compare baseline.json --tolerance 0.25
+
+Exit code is non-zero if the kernel result is wrong or, with ``--compare``,
+if any case got slower than the baseline by more than the tolerance.
+"""
+
+__author__ = 'Lex Darlog (DRL)'
+
+import math as _math
+import sys as _sys
+import time as _time
+import tracemalloc as _tracemalloc
+
+import harness as _harness
+
+import numpy as _np
+
+from darlog_maya.mesh_arrays import hard_edges_mask
+from synthetic_meshes import generators, SyntheticMesh
+
+try:
+	import typing as _t
+except ImportError:
+	pass
+
+
+_default_sizes = [1000, 10000, 100000, 1000000]
+# The same threshold `unlock_normals` uses:
+_min_angle_cos = _math.cos(_math.radians(1.5))
+
+
+def _time_kernel(synthetic: SyntheticMesh, repeat: int) -> _t.Tuple[float, _np.ndarray]:
+	best = float('inf')
+	res = None
+	for _ in range(repeat):
+		start = _time.perf_counter()
+		res = hard_edges_mask(synthetic.mesh, _min_angle_cos)
+		best = min(best, _time.perf_counter() - start)
+	return best, res
+
+
+def _peak_memory(synthetic: SyntheticMesh) -> int:
+	"""Peak memory allocated by the kernel itself (on top of the input mesh), in bytes."""
+	_tracemalloc.start()
+	try:
+		_tracemalloc.reset_peak()
+		hard_edges_mask(synthetic.mesh, _min_angle_cos)
+		current, peak = _tracemalloc.get_traced_memory()
+	finally:
+		_tracemalloc.stop()
+	return peak
+
+
+def _input_size(synthetic: SyntheticMesh) -> int:
+	mesh = synthetic.mesh
+	return sum(x.nbytes for x in (mesh.face_counts, mesh.face_vertices, mesh.fv_normals, mesh.edge_vertices))
+
+
+def run_case(shape: str, size: int, repeat: int) -> _t.Dict[str, _t.Any]:
+	synthetic = generators[shape](size)
+	mesh = synthetic.mesh
+	seconds, res = _time_kernel(synthetic, repeat)
+	n_mismatched = int((res != synthetic.expected_hard).sum())
+	return dict(
+		case='{}-{}'.format(shape, size),
+		shape=shape,
+		vertices=mesh.n_vertices,
+		edges=mesh.n_edges,
+		face_vertices=mesh.n_face_vertices,
+		hard_edges=int(res.sum()),
+		mismatched=n_mismatched,
+		seconds=seconds,
+		edges_per_second=mesh.n_edges / seconds if seconds > 0 else float('inf'),
+		input_bytes=_input_size(synthetic),
+		peak_bytes=_peak_memory(synthetic),
+	)
+
+
+def _format_row(row: _t.Dict[str, _t.Any]) -> str:
+	return "{case:<18} {vertices:>9} {edges:>9} {hard_edges:>8} {ms:>10.2f} {meps:>9.2f} {in_mb:>8.1f} {peak_mb:>8.1f}  {ok}".format(
+		ms=row['seconds'] * 1000.0,
+		meps=row['edges_per_second'] / 1e6,
+		in_mb=row['input_bytes'] / 2.0 ** 20,
+		peak_mb=row['peak_bytes'] / 2.0 ** 20,
+		ok='OK' if not row['mismatched'] else 'WRONG ({} edges)'.format(row['mismatched']),
+		**row
+	)
+
+
+def main(args=None) -> int:
+	parser = _harness.argument_parser(__doc__)
+	parser.add_argument('--sizes', type=int, nargs='+', default=_default_sizes, help="Approximate vertex counts")
+	parser.add_argument('--shapes', nargs='+', default=list(generators.keys()), choices=list(generators.keys()))
+	parser.add_argument('--repeat', type=int, default=3, help="Best of N runs is reported")
+	opts = parser.parse_args(args)
+
+	print("{:<18} {:>9} {:>9} {:>8} {:>10} {:>9} {:>8} {:>8}".format(
+		'case', 'vertices', 'edges', 'hard', 'time, ms', 'M edge/s', 'in, MB', 'peak, MB'
+	))
+	rows = list()
+	for shape in opts.shapes:
+		for size in opts.sizes:
+			_harness.add_row(rows, run_case(shape, size, opts.repeat), _format_row)
+
+	return _harness.finish(
+		opts, rows,
+		error="the kernel result doesn't match the expected hard edges." if any(row['mismatched'] for row in rows) else None,
+		environment=dict(numpy=_np.__version__),
+	)
+
+
+if __name__ == '__main__':
+	_sys.exit(main())
@@ -0,0 +1,140 @@
+#!/usr/bin/env python
+# encoding: utf-8
+"""
+Benchmark of `darlog_maya_tools.uv_batch_copy` engines: direct UV arrays vs ``polyCopyUV``.
+
+Requires Maya: run it with ``mayapy``. With a regular Python interpreter, it's skipped.
+Builds a scene with the given numbers of history-free meshes, copies ``map1`` to a new UV-set
+on all of them (a single undo chunk), verifies the copied UVs and that undo reverts the copy.
+
+Usage (from repo root)::
+
+	mayapy benchmarks/bench_uv_copy.py
+	mayapy benchmarks/bench_uv_copy.py --counts 1000 10000 --engines arrays --json out.json
+	mayapy benchmarks/bench_uv_copy.py --compare baseline.json --tolerance 0.25
+
+Exit code is non-zero if a copy (or its undo) is wrong or, with ``--compare``,
+if any case got slower than the baseline by more than the tolerance.
+"""
+
+__author__ = 'Lex Darlog (DRL)'
+
+import sys as _sys
+
+import harness as _harness
+
+try:
+	import typing as _t
+except ImportError:
+	pass
+
+
+_default_counts = [1000, 10000, 100000]
+_engines = ['arrays', 'command']
+
+
+def _build_scene(n_meshes: int, subdivisions: int) -> _t.List[str]:
+	from maya import cmds
+	cmds.file(new=True, force=True)
+	source = cmds.polyPlane(sx=subdivisions, sy=subdivisions, ch=False)[0]
+	transforms = [source]
+	for _ in range(n_meshes - 1):
+		transforms.append(cmds.duplicate(source)[0])
+	return cmds.ls(transforms, long=True)
+
+
+def _uv_sets_count(transform: str) -> int:
+	from maya import cmds
+	return len(cmds.polyUVSet(transform, q=True, allUVSets=True) or [])
+
+
+def _is_copy_correct(transform: str, target: str) -> bool:
+	from maya.api import OpenMaya as om
+	sel = om.MSelectionList()
+	sel.add(transform)
+	fn = om.MFnMesh(sel.getDagPath(0))
+	return (
+		list(fn.getUVs('map1')[0]) == list(fn.getUVs(target)[0]) and
+		list(fn.getAssignedUVs('map1')[1]) == list(fn.getAssignedUVs(target)[1])
+	)
+
+
+def run_case(n_meshes: int, engine: str, subdivisions: int) -> _t.Dict[str, _t.Any]:
+	from maya import cmds
+	from darlog_maya.undo import undoable_context
+	from darlog_maya_tools import uv_batch_copy
+
+	transforms = _build_scene(n_meshes, subdivisions)
+	cmds.flushUndo()
+	n_nodes_before = len(cmds.ls())
+
+	def copy():
+		with undoable_context('benchUVCopy'):
+			uv_batch_copy._copy_uv(uv_batch_copy.plan_copy_uv(transforms, 'map1', None), engine=engine)
+
+	seconds, _ = _harness.timed(copy)
+
+	n_history_nodes = len(cmds.ls()) - n_nodes_before
+	sample = [transforms[0], transforms[len(transforms) // 2], transforms[-1]]
+	is_correct = all(_uv_sets_count(x) == 2 and _is_copy_correct(x, 'uvSet1') for x in sample)
+
+	undo_seconds, _ = _harness.timed(cmds.undo)
+	is_undone = all(_uv_sets_count(x) == 1 for x in sample)
+
+	return dict(
+		case='{}-{}'.format(engine, n_meshes),
+		engine=engine,
+		meshes=n_meshes,
+		seconds=seconds,
+		meshes_per_second=n_meshes / seconds if seconds > 0 else float('inf'),
+		undo_seconds=undo_seconds,
+		history_nodes=n_history_nodes,
+		correct=is_correct,
+		undone=is_undone,
+	)
+
+
+def _format_row(row: _t.Dict[str, _t.Any]) -> str:
+	return "{case:<16} {meshes:>8} {ms:>11.1f} {kmps:>10.2f} {undo_ms:>10.1f} {history_nodes:>8}  {ok}".format(
+		ms=row['seconds'] * 1000.0,
+		kmps=row['meshes_per_second'] / 1e3,
+		undo_ms=row['undo_seconds'] * 1000.0,
+		ok='OK' if row['correct'] and row['undone'] else 'WRONG ({})'.format(
+			'copy' if not row['correct'] else 'undo'
+		),
+		**row
+	)
+
+
+def main(args=None) -> int:
+	parser = _harness.argument_parser(__doc__)
+	parser.add_argument('--counts', type=int, nargs='+', default=_default_counts, help="Numbers of meshes")
+	parser.add_argument('--engines', nargs='+', default=_engines, choices=_engines)
+	parser.add_argument('--subdivisions', type=int, default=4, help="Each mesh is a plane of N x N faces")
+	opts = parser.parse_args(args)
+
+	if not _harness.init_maya():
+		return 0
+
+	from maya import cmds
+	cmds.undoInfo(state=True, infinity=True)
+
+	print("{:<16} {:>8} {:>11} {:>10} {:>10} {:>8}".format(
+		'case', 'meshes', 'time, ms', 'K mesh/s', 'undo, ms', 'history'
+	))
+	rows = list()
+	for n_meshes in opts.counts:
+		for engine in opts.engines:
+			_harness.add_row(rows, run_case(n_meshes, engine, opts.subdivisions), _format_row)
+
+	return _harness.finish(
+		opts, rows,
+		error=None if all(row['correct'] and row['undone'] for row in rows) else (
+			"the copied UVs (or their undo) don't match the expected ones."
+		),
+		environment=dict(maya=cmds.about(version=True)),
+	)
+
+
+if __name__ == '__main__':
+	_sys.exit(main())
@@ -0,0 +1,106 @@
+# encoding: utf-8
+"""
+The skeleton shared by all the benchmarks: command line, Maya initialization (for ``mayapy`` ones),
+timing, results output and comparison against a previously saved baseline.
+
+Importing it also makes ``darlog_maya`` / ``darlog_maya_tools`` (from ``scripts``) importable.
+"""
+
+__author__ = 'Lex Darlog (DRL)'
+
+import argparse as _argparse
+import json as _json
+import os as _os
+import sys as _sys
+import time as _time
+
+scripts_dir = _os.path.join(_os.path.dirname(_os.path.dirname(_os.path.abspath(__file__))), 'scripts')
+if scripts_dir not in _sys.path:
+	_sys.path.insert(0, scripts_dir)
+
+try:
+	import typing as _t
+except ImportError:
+	pass
+
+
+_h_row = _t.Dict[str, _t.Any]
+
+_units = {'ms': 1000.0, 's': 1.0}
+
+
+def argument_parser(doc: str) -> _argparse.ArgumentParser:
+	"""Parser with the common ``--json`` / ``--compare`` / ``--tolerance`` options. Described by the doc's first line."""
+	parser = _argparse.ArgumentParser(description=doc.strip().split('\n')[0])
+	parser.add_argument('--json', help="Save results to this file")
+	parser.add_argument('--compare', help="Compare against results previously saved with --json")
+	parser.add_argument('--tolerance', type=float, default=0.25, help="Allowed slowdown for --compare (0.25 = 25%%)")
+	return parser
+
+
+def init_maya() -> bool:
+	"""Initialize standalone Maya. If it's not available, report the benchmark as skipped."""
+	try:
+		import maya.standalone
+	except ImportError:
+		print("Maya isn't available (run this benchmark with mayapy). Skipped.")
+		return False
+	maya.standalone.initialize(name='python')
+	return True
+
+
+def timed(f: _t.Callable, *args, **kwargs) -> _t.Tuple[float, _t.Any]:
+	"""Call the function once. Returns the time it took (in seconds) and its result."""
+	start = _time.perf_counter()
+	res = f(*args, **kwargs)
+	return _time.perf_counter() - start, res
+
+
+def add_row(rows: _t.List[_h_row], row: _h_row, format_row: _t.Callable[[_h_row], str]):
+	"""Store a result and print it right away."""
+	rows.append(row)
+	print(format_row(row))
+	_sys.stdout.flush()
+
+
+def compare(rows: _t.List[_h_row], baseline_path: str, tolerance: float, unit='ms') -> _t.List[str]:
+	"""Descriptions of the cases which got slower than the baseline by more than the tolerance."""
+	scale = _units[unit]
+	with open(baseline_path, 'r') as f:
+		baseline = {x['case']: x for x in _json.load(f)['results']}
+	regressions = list()
+	for row in rows:
+		base = baseline.get(row['case'])
+		if base is None:
+			continue
+		ratio = row['seconds'] / base['seconds'] if base['seconds'] > 0 else 1.0
+		if ratio > 1.0 + tolerance:
+			regressions.append("{case}: {ratio:.2f}x slower than baseline ({cur:.2f} {unit} > {base:.2f} {unit})".format(
+				case=row['case'], ratio=ratio, cur=row['seconds'] * scale, base=base['seconds'] * scale, unit=unit,
+			))
+	return regressions
+
+
+def finish(
+	opts: _argparse.Namespace, rows: _t.List[_h_row], error: _t.Optional[str] = None,
+	environment: _t.Dict[str, str] = None, unit='ms',
+) -> int:
+	"""
+	Save the results (with ``--json``), compare them with the baseline (with ``--compare``)
+	and return the exit code: non-zero on the ``error`` (wrong results) or on a regression.
+	"""
+	if opts.json:
+		data = dict(environment or dict(), python=_sys.version.split()[0], results=rows)
+		with open(opts.json, 'w') as f:
+			_json.dump(data, f, indent=2)
+
+	exit_code = 0
+	if error:
+		print("\nERROR: {}".format(error))
+		exit_code = 1
+	if opts.compare:
+		regressions = compare(rows, opts.compare, opts.tolerance, unit=unit)
+		if regressions:
+			print("\nPerformance regressions:\n\t" + '\n\t'.join(regressions))
+			exit_code = 1
+	return exit_code
@@ -0,0 +1,221 @@
+# encoding: utf-8
+"""
+Synthetic meshes with locked normals, in `darlog_maya.mesh_arrays.MeshArrays` form.
+
+Each generated mesh comes together with the expected hard-edge mask, so it can be used
+both to benchmark and to verify the hard-edge classification kernel. No Maya required.
+
+Normals are built from per-face smoothing groups: at each vertex, a face-vertex normal
+is the average of normals of all the faces around this vertex within the same group.
+So, edges between faces of different groups are (expected to be) hard, and the rest are soft.
+"""
+
+__author__ = 'Lex Darlog (DRL)'
+
+import math as _math
+from dataclasses import dataclass as _dataclass
+
+import numpy as _np
+
+from darlog_maya.mesh_arrays import MeshArrays, _t_float, _t_index
+
+try:
+	import typing as _t
+except ImportError:
+	pass
+
+
+@_dataclass
+class SyntheticMesh:
+	name: str
+	mesh: MeshArrays
+	expected_hard: _np.ndarray  # bool mask per edge
+
+	@property
+	def n_vertices(self) -> int:
+		return self.mesh.n_vertices
+
+
+def _quad_grid_faces(n_u: int, n_v: int, closed_u=False) -> _np.ndarray:
+	"""Quad faces (as an ``(n, 4)`` array of vertex IDs) for a ``(n_u + 1) x (n_v + 1)`` vertex grid."""
+	n_cols = n_u if closed_u else n_u + 1
+	u = _np.arange(n_u)
+	v = _np.arange(n_v)
+	uu, vv = _np.meshgrid(u, v, indexing='xy')
+	uu = uu.ravel()
+	vv = vv.ravel()
+	u_next = (uu + 1) % n_cols
+	return _np.stack([
+		vv * n_cols + uu,
+		vv * n_cols + u_next,
+		(vv + 1) * n_cols + u_next,
+		(vv + 1) * n_cols + uu,
+	], axis=1).astype(_t_index)
+
+
+def _weld(positions: _np.ndarray, face_vertices: _np.ndarray, precision=6) -> _t.Tuple[_np.ndarray, _np.ndarray]:
+	"""Merge vertices at the same position."""
+	keys = _np.round(positions, precision)
+	unique_pos, remap = _np.unique(keys, axis=0, return_inverse=True)
+	return unique_pos, remap.ravel()[face_vertices].astype(_t_index)
+
+
+def _edges(face_counts: _np.ndarray, face_vertices: _np.ndarray) -> _t.Tuple[_np.ndarray, _np.ndarray, _np.ndarray]:
+	"""
+	Unique edges of a mesh, plus, for each face-vertex, the index of the edge starting at it.
+
+	Returns: ``edge_vertices``, ``corner_edge``, ``next_corner``.
+	"""
+	n_fv = len(face_vertices)
+	face_start = _np.repeat(_np.cumsum(face_counts) - face_counts, face_counts)
+	local_i = _np.arange(n_fv) - face_start
+	next_corner = face_start + (local_i + 1) % _np.repeat(face_counts, face_counts)
+	v_a = face_vertices
+	v_b = face_vertices[next_corner]
+	pairs = _np.stack([_np.minimum(v_a, v_b), _np.maximum(v_a, v_b)], axis=1)
+	edge_vertices, corner_edge = _np.unique(pairs, axis=0, return_inverse=True)
+	return edge_vertices.astype(_t_index), corner_edge.ravel(), next_corner
+
+
+def _face_normals(positions: _np.ndarray, face_counts: _np.ndarray, face_vertices: _np.ndarray, next_corner) -> _np.ndarray:
+	"""Newell's method: works for any planar polygon."""
+	p = positions[face_vertices]
+	p_next = positions[face_vertices[next_corner]]
+	corner_cross = _np.cross(p, p_next)
+	face_i = _np.repeat(_np.arange(len(face_counts)), face_counts)
+	normals = _np.stack([
+		_np.bincount(face_i, weights=corner_cross[:, k], minlength=len(face_counts)) for k in range(3)
+	], axis=1)
+	return normals / _np.linalg.norm(normals, axis=1)[:, None]
+
+
+def _build(
+	name: str, positions: _np.ndarray, face_counts: _np.ndarray, face_vertices: _np.ndarray, face_groups: _np.ndarray
+) -> SyntheticMesh:
+	"""Compute smoothing-group normals and the expected hard edges, and pack it all."""
+	face_counts = _np.asarray(face_counts, dtype=_t_index)
+	face_vertices = _np.asarray(face_vertices, dtype=_t_index)
+	face_groups = _np.asarray(face_groups, dtype=_np.int64)
+	edge_vertices, corner_edge, next_corner = _edges(face_counts, face_vertices)
+	face_normals = _face_normals(positions, face_counts, face_vertices, next_corner)
+
+	fv_face = _np.repeat(_np.arange(len(face_counts)), face_counts)
+	fv_group = face_groups[fv_face]
+	n_groups = int(face_groups.max()) + 1
+	vertex_group_key = face_vertices.astype(_np.int64) * n_groups + fv_group
+	unique_keys, fv_key_i = _np.unique(vertex_group_key, return_inverse=True)
+	fv_face_normals = face_normals[fv_face]
+	summed = _np.stack([
+		_np.bincount(fv_key_i, weights=fv_face_normals[:, k], minlength=len(unique_keys)) for k in range(3)
+	], axis=1)
+	summed /= _np.linalg.norm(summed, axis=1)[:, None]
+	fv_normals = summed[fv_key_i].astype(_t_float)
+
+	# An edge is expected to be hard if the faces around it belong to different groups:
+	n_edges = len(edge_vertices)
+	group_min = _np.full(n_edges, _np.iinfo(_np.int64).max)
+	group_max = _np.full(n_edges, -1)
+	_np.minimum.at(group_min, corner_edge, fv_group)
+	_np.maximum.at(group_max, corner_edge, fv_group)
+	expected_hard = group_min != group_max
+
+	mesh = MeshArrays(
+		face_counts=face_counts,
+		face_vertices=face_vertices,
+		fv_normals=fv_normals,
+		edge_vertices=edge_vertices,
+	)
+	return SyntheticMesh(name=name, mesh=mesh, expected_hard=expected_hard)
+
+
+def pleated_grid(n_vertices: int, pleat_width=8) -> SyntheticMesh:
+	"""
+	A square grid folded into zig-zag pleats (like a paper fan): each pleat is flat,
+	and fold lines between pleats are hard.
+	"""
+	n = max(2, int(round(_math.sqrt(n_vertices))) - 1)  # quads per side
+	x = _np.arange(n + 1, dtype=_np.float64)
+	# triangle wave across X, with 30 degree slopes:
+	phase = x % (2 * pleat_width)
+	height = _np.where(phase <= pleat_width, phase, 2 * pleat_width - phase) * _math.tan(_math.radians(30))
+	xx, zz = _np.meshgrid(x, _np.arange(n + 1, dtype=_np.float64), indexing='xy')
+	yy = _np.broadcast_to(height, xx.shape)
+	positions = _np.stack([xx.ravel(), yy.ravel(), zz.ravel()], axis=1)
+
+	faces = _quad_grid_faces(n, n)
+	face_u = _np.tile(_np.arange(n), n)
+	face_groups = face_u // pleat_width
+	return _build(
+		'grid', positions, _np.full(len(faces), 4), faces.ravel(), face_groups
+	)
+
+
+def cylinder(n_vertices: int, segments=None) -> SyntheticMesh:
+	"""A closed cylinder with smooth sides, and flat n-gon caps with hard rim edges."""
+	if segments is None:
+		segments = max(3, int(round(_math.sqrt(n_vertices))))
+	rings = max(1, int(round(n_vertices / segments)) - 1)
+	angles = _np.arange(segments) * (2.0 * _math.pi / segments)
+	heights = _np.linspace(0.0, 1.0, rings + 1) * (2.0 * _math.pi * rings / segments)
+	hh, aa = _np.meshgrid(heights, angles, indexing='ij')
+	positions = _np.stack([_np.cos(aa).ravel(), hh.ravel(), -_np.sin(aa).ravel()], axis=1)
+
+	side_faces = _quad_grid_faces(segments, rings, closed_u=True)
+	bottom_cap = _np.arange(segments)[::-1]
+	top_cap = _np.arange(segments) + rings * segments
+	face_vertices = _np.concatenate([side_faces.ravel(), bottom_cap, top_cap])
+	face_counts = _np.concatenate([_np.full(len(side_faces), 4), [segments, segments]])
+	face_groups = _np.concatenate([_np.zeros(len(side_faces)), [1, 2]])
+	return _build('cylinder', positions, face_counts, face_vertices, face_groups)
+
+
+def bevelled_box(n_vertices: int, bevel=0.1) -> SyntheticMesh:
+	"""
+	A box with all its edges chamfered (single-segment bevel) and flat-shaded:
+	hard edges are between sides, bevel strips and corner triangles.
+	"""
+	m = max(3, int(round(_math.sqrt(n_vertices / 6.0))))  # quads per box side
+	coord = _np.concatenate([[-1.0], _np.linspace(-1.0 + bevel, 1.0 - bevel, m - 1), [1.0]])
+	cu, cv = _np.meshgrid(coord, coord, indexing='xy')
+	cu = cu.ravel()
+	cv = cv.ravel()
+	ones = _np.ones_like(cu)
+	grid_faces = _quad_grid_faces(m, m)
+	n_grid_verts = len(cu)
+
+	all_pos = list()
+	all_faces = list()
+	for axis in range(3):
+		for sign in (-1.0, 1.0):
+			u_axis, v_axis = [a for a in range(3) if a != axis]
+			pos = _np.zeros((n_grid_verts, 3))
+			pos[:, axis] = sign * ones
+			pos[:, u_axis] = cu
+			pos[:, v_axis] = cv
+			faces = grid_faces if sign > 0 else grid_faces[:, ::-1]
+			if axis == 1:
+				faces = faces[:, ::-1]  # keep all the sides facing outwards
+			all_faces.append(faces + len(all_pos) * n_grid_verts)
+			all_pos.append(pos)
+
+	positions, face_vertices = _weld(_np.concatenate(all_pos), _np.concatenate(all_faces).ravel())
+
+	# Pull cube edges and corners inwards, so the outermost quad rows become bevel strips/corner triangles:
+	n_extreme = (_np.abs(positions) > 1.0 - 1e-9).sum(axis=1)
+	is_extreme = _np.abs(positions) > 1.0 - 1e-9
+	shift = _np.where(n_extreme == 2, bevel / 2.0, _np.where(n_extreme == 3, bevel * 2.0 / 3.0, 0.0))
+	positions = positions - _np.sign(positions) * is_extreme * shift[:, None]
+
+	face_counts = _np.full(len(face_vertices) // 4, 4)
+	# Each flat patch is a smoothing group of its own, so group faces by their (rounded) normal:
+	edge_vertices, corner_edge, next_corner = _edges(face_counts, face_vertices)
+	face_normals = _face_normals(positions, face_counts, face_vertices, next_corner)
+	unique_normals, face_groups = _np.unique(_np.round(face_normals, 4), axis=0, return_inverse=True)
+	return _build('box', positions, face_counts, face_vertices, face_groups.ravel())
+
+
+generators = {
+	'grid': pleated_grid,
+	'cylinder': cylinder,
+	'box': bevelled_box,
+}  # type: _t.Dict[str, _t.Callable[[int], SyntheticMesh]]
@@ -0,0 +1,221 @@
+# encoding: utf-8
+"""
+Bake animation by direct sampling: an alternative to ``bakeResults(simulation=True)``.
+
+Instead of stepping the timeline with a full scene evaluation on each frame, only the given
+plugs (e.g., local transform channels of joints) are pulled through DG context evaluation
+at each sampled time. The samples are collected into a single NumPy array (frames x plugs),
+and each plug then gets its anim curve with one bulk `MFnAnimCurve.addKeys` call.
+
+Since it's a DG pull, it doesn't work for anything depending on the previous frames
+(dynamics, caches with a state): use ``bakeResults`` for those.
+"""
+
+from maya.api import OpenMaya as _om
+from maya.api import OpenMayaAnim as _oma
+import numpy as _np
+
+from darlog_maya import api_undo as _api_undo
+from darlog_maya.api_nodes import _h_node_input, node_object as _node_object
+from darlog_maya.progress import NullProgress as _NullProgress, ProgressReporter as _ProgressReporter
+from darlog_maya.py23 import *
+
+try:
+	import typing as _t
+except ImportError:
+	pass
+
+
+def node_plugs(nodes: _t.Iterable[_h_node_input], attributes: _t.Iterable[_t.AnyStr]) -> _t.List[_om.MPlug]:
+	"""The given attributes (long or short names) of each node, in order. Locked ones are skipped."""
+	attributes = list(attributes)
+	res = list()  # type: _t.List[_om.MPlug]
+	for node in nodes:
+		fn = _om.MFnDependencyNode(_node_object(node))
+		for attr_name in attributes:
+			plug = fn.findPlug(attr_name, False)
+			if not plug.isLocked:
+				res.append(plug)
+	return res
+
+
+def frame_samples(frame_range: _t.Tuple[float, float], sample_by: float = 1.0) -> _np.ndarray:
+	"""Sampled frames: from the first one to the last one (inclusive), with the given step."""
+	first, last = frame_range
+	n = int(_np.floor((last - first) / sample_by + 1e-6)) + 1
+	return first + _np.arange(max(n, 1), dtype=_np.float64) * sample_by
+
+
+def _is_angle(plug: _om.MPlug) -> bool:
+	attr = plug.attribute()
+	return attr.hasFn(_om.MFn.kUnitAttribute) and _om.MFnUnitAttribute(attr).unitType() == _om.MFnUnitAttribute.kAngle
+
+
+def _is_bool(plug: _om.MPlug) -> bool:
+	attr = plug.attribute()
+	return attr.hasFn(_om.MFn.kNumericAttribute) and (
+		_om.MFnNumericAttribute(attr).numericType() == _om.MFnNumericData.kBoolean
+	)
+
+
+def _driving_connection(plug: _om.MPlug) -> _t.Optional[_t.Tuple[_om.MPlug, _om.MPlug]]:
+	"""
+	The ``(source, destination)`` connection driving the plug: either its own one, or the one of its parent
+	compound (e.g., ``rotate`` connected as a whole drives ``rotateX``). ``None`` if the plug isn't driven.
+	"""
+	while True:
+		if plug.isDestination:
+			return plug.source(), plug
+		if not plug.isChild:
+			return None
+		plug = plug.parent()
+
+
+def _plug_key(plug: _om.MPlug) -> _t.Tuple[str, str]:
+	return _om.MFnDependencyNode(plug.node()).uuid().asString(), plug.partialName(useLongNames=True)
+
+
+def sample_plugs(
+	plugs: _t.List[_om.MPlug], frames: _np.ndarray, progress: _ProgressReporter = None
+) -> _np.ndarray:
+	"""
+	Values of the plugs at each frame (in UI time units), as a ``(frames, plugs)`` array in internal units
+	(centimeters, radians).
+
+	Plugs with no incoming connection (neither their own, nor their parent compound's)
+	can't change over time, so they're read only once.
+
+	:raises darlog_maya.progress.Cancelled: if interrupted by user.
+	"""
+	if progress is None:
+		progress = _NullProgress()
+	samples = _np.empty((len(frames), len(plugs)), dtype=_np.float64)
+	is_driven = [_driving_connection(plug) is not None for plug in plugs]
+	driven = [i for i, x in enumerate(is_driven) if x]
+	static = [i for i, x in enumerate(is_driven) if not x]
+	if static:
+		samples[:, static] = [plugs[i].asDouble() for i in static]
+	if not driven:
+		return samples
+
+	driven_plugs = [plugs[i] for i in driven]
+	time_unit = _om.MTime.uiUnit()
+	progress.start(len(frames), "Sampling animation")
+	previous_context = None
+	try:
+		for i, frame in enumerate(frames):
+			progress.update(i)
+			context = _om.MDGContext(_om.MTime(float(frame), time_unit))
+			if previous_context is None:
+				previous_context = context.makeCurrent()
+			else:
+				context.makeCurrent()
+			samples[i, driven] = [plug.asDouble() for plug in driven_plugs]
+	finally:
+		if previous_context is not None:
+			previous_context.makeCurrent()
+	progress.finish()
+	return samples
+
+
+def minimize_rotation(plugs: _t.List[_om.MPlug], samples: _np.ndarray) -> _np.ndarray:
+	"""
+	Remove full-turn jumps between consecutive frames in rotation channels
+	(the same as ``minimizeRotation`` of ``bakeResults``). Modifies the samples in place.
+	"""
+	angles = [i for i, plug in enumerate(plugs) if _is_angle(plug)]
+	if angles and len(samples) > 1:
+		samples[:, angles] = _np.unwrap(samples[:, angles], axis=0)
+	return samples
+
+
+def write_anim_curves(
+	plugs: _t.List[_om.MPlug], frames: _np.ndarray, samples: _np.ndarray, undoable=True,
+	progress: _ProgressReporter = None
+):
+	"""
+	Replace whatever drives each plug with a new anim curve having a key per frame
+	(written with a single `MFnAnimCurve.addKeys` call per plug).
+
+	If a plug is driven through its parent compound, the compound is disconnected, and its other children
+	(not being baked) are re-connected to the corresponding children of the source, to keep their motion.
+
+	If ``undoable``, the whole write is registered as a single undo-queue entry.
+	"""
+	if progress is None:
+		progress = _NullProgress()
+	time_unit = _om.MTime.uiUnit()
+	times = _om.MTimeArray([_om.MTime(float(frame), time_unit) for frame in frames])
+
+	modifier = _om.MDGModifier()
+	baked_keys = None  # type: _t.Optional[_t.Set[_t.Tuple[str, str]]]
+	disconnected = set()  # type: _t.Set[_t.Tuple[str, str]]
+	for plug in plugs:
+		connection = _driving_connection(plug)
+		if connection is None:
+			continue
+		source, destination = connection
+		if destination is plug:
+			modifier.disconnect(source, destination)
+			continue
+
+		# Driven via the parent compound:
+		destination_key = _plug_key(destination)
+		if destination_key in disconnected:
+			continue
+		disconnected.add(destination_key)
+		modifier.disconnect(source, destination)
+		if not (source.isCompound and source.numChildren() == destination.numChildren()):
+			continue
+		if baked_keys is None:
+			baked_keys = set(_plug_key(x) for x in plugs)
+		for j in _range(destination.numChildren()):
+			child = destination.child(j)
+			if _plug_key(child) not in baked_keys:
+				modifier.connect(source.child(j), child)
+	modifier.doIt()
+
+	change = _oma.MAnimCurveChange() if undoable else None
+	curve_fn = _oma.MFnAnimCurve()
+	progress.start(len(plugs), "Writing anim curves")
+	for i, plug in enumerate(plugs):
+		progress.update(i)
+		curve_fn.create(plug, modifier)  # connected by the modifier, below
+		tangent = _oma.MFnAnimCurve.kTangentStep if _is_bool(plug) else _oma.MFnAnimCurve.kTangentLinear
+		values = _om.MDoubleArray(samples[:, i].tolist())
+		if change is None:
+			curve_fn.addKeys(times, values, tangent, tangent, False)
+		else:
+			curve_fn.addKeys(times, values, tangent, tangent, False, change)
+	modifier.doIt()  # only the operations queued since the previous call
+	progress.finish()
+
+	if undoable:
+		def redo():
+			modifier.doIt()
+			change.redoIt()
+
+		def undo():
+			change.undoIt()
+			modifier.undoIt()
+
+		_api_undo.commit(undo, redo)
+
+
+def bake(
+	nodes: _t.Iterable[_h_node_input], attributes: _t.Iterable[_t.AnyStr], frame_range: _t.Tuple[float, float],
+	sample_by: float = 1.0, minimize_rotations=True, undoable=True, progress: _ProgressReporter = None
+) -> _t.List[_om.MPlug]:
+	"""
+	Bake the given attributes of the nodes to anim curves: sample them all first, then write.
+	Returns the baked plugs.
+	"""
+	plugs = node_plugs(nodes, attributes)
+	if not plugs:
+		return plugs
+	frames = frame_samples(frame_range, sample_by)
+	samples = sample_plugs(plugs, frames, progress=progress)
+	if minimize_rotations:
+		minimize_rotation(plugs, samples)
+	write_anim_curves(plugs, frames, samples, undoable=undoable, progress=progress)
+	return plugs
@@ -0,0 +1,65 @@
+# encoding: utf-8
+"""
+Resolve nodes given in any form (names, PyNodes or OpenMaya 2.0 objects themselves)
+to OpenMaya 2.0 handles, with a single ``MSelectionList`` lookup.
+
+Only OpenMaya is needed here (no NumPy, no PyMel), so these helpers are shared
+by all the API-based modules.
+"""
+
+from maya.api import OpenMaya as _om
+
+from darlog_maya.py23 import *
+
+try:
+	import typing as _t
+except ImportError:
+	pass
+
+
+_h_node_input = _t.Union[_t.AnyStr, _om.MDagPath, _om.MObject, _t.Any]  # the last one is PyNode
+_h_mesh_input = _t.Union[_t.AnyStr, _om.MDagPath, _t.Any]  # the last one is PyMel's Mesh
+
+
+def node_name(node: _h_node_input) -> _t.AnyStr:
+	if isinstance(node, _t_str):
+		return node
+	if isinstance(node, _om.MDagPath):
+		return node.fullPathName()
+	return _unicode(node)
+
+
+def _selection(node: _h_node_input) -> _om.MSelectionList:
+	sel = _om.MSelectionList()
+	sel.add(node_name(node))
+	return sel
+
+
+def dag_path(node: _h_node_input) -> _om.MDagPath:
+	"""Get OpenMaya 2.0 DAG path from either a node name, a PyNode or a DAG path itself."""
+	if isinstance(node, _om.MDagPath):
+		return node
+	return _selection(node).getDagPath(0)
+
+
+def node_object(node: _h_node_input) -> _om.MObject:
+	"""Get OpenMaya 2.0 node object (for DAG and non-DAG nodes alike)."""
+	if isinstance(node, _om.MObject):
+		return node
+	if isinstance(node, _om.MDagPath):
+		return node.node()
+	return _selection(node).getDependNode(0)
+
+
+def mesh_fn(mesh: _h_mesh_input) -> _om.MFnMesh:
+	return _om.MFnMesh(dag_path(mesh))
+
+
+def has_history(mesh: _t.Union[_h_mesh_input, _om.MFnMesh]) -> bool:
+	"""
+	Whether the mesh has anything connected to its input (construction history, deformers).
+
+	Direct API edits on such meshes don't stick: they're overridden on the next evaluation.
+	"""
+	fn = mesh if isinstance(mesh, _om.MFnMesh) else mesh_fn(mesh)
+	return fn.findPlug('inMesh', False).isDestination
@@ -0,0 +1,96 @@
+# encoding: utf-8
+"""
+Register direct OpenMaya 2.0 edits in Maya's undo queue.
+
+API calls made outside of a command aren't recorded by Maya at all, so they
+can't be undone. This module is also a tiny Maya plugin providing a single command.
+`commit()` stores a pair of undo/redo functions and calls that command,
+which takes ownership of them and becomes the undo-queue entry for the edit.
+
+When called inside an open undo chunk (see `darlog_maya.undo.undoable_context`),
+all the commits are undone together with the rest of the chunk.
+"""
+
+import os as _os
+
+from maya import cmds as _cmds
+from maya.api import OpenMaya as _om
+
+try:
+	import typing as _t
+except ImportError:
+	pass
+
+
+maya_useNewAPI = True  # tells Maya this plugin uses OpenMaya 2.0
+
+command_name = 'darlogApiUndo'
+
+_h_action = _t.Callable[[], _t.Any]
+
+# The pair of undo/redo functions waiting for the command to pick them up.
+# It's always read from the `darlog_maya.api_undo` module, because Maya loads
+# the plugin file as a separate module.
+_pending = None  # type: _t.Optional[_t.Tuple[_h_action, _h_action]]
+
+
+class _ApiUndoCommand(_om.MPxCommand):
+	def __init__(self):
+		super(_ApiUndoCommand, self).__init__()
+		self.__undo = None  # type: _t.Optional[_h_action]
+		self.__redo = None  # type: _t.Optional[_h_action]
+
+	@staticmethod
+	def creator():
+		return _ApiUndoCommand()
+
+	def doIt(self, args):
+		from darlog_maya import api_undo as shared
+		if shared._pending is None:
+			raise RuntimeError("{} command isn't supposed to be called directly".format(command_name))
+		self.__undo, self.__redo = shared._pending
+		shared._pending = None
+		# The edit itself is already done by the caller, no need to call redo here.
+
+	def undoIt(self):
+		self.__undo()
+
+	def redoIt(self):
+		self.__redo()
+
+	def isUndoable(self):
+		return True
+
+
+def initializePlugin(plugin):
+	_om.MFnPlugin(plugin, 'Lex Darlog (DRL)', '1.0').registerCommand(command_name, _ApiUndoCommand.creator)
+
+
+def uninitializePlugin(plugin):
+	_om.MFnPlugin(plugin).deregisterCommand(command_name)
+
+
+def _plugin_path() -> str:
+	return _os.path.splitext(_os.path.abspath(__file__))[0] + '.py'
+
+
+def ensure_plugin_loaded():
+	plugin_path = _plugin_path()
+	if not _cmds.pluginInfo(plugin_path, q=True, loaded=True):
+		_cmds.loadPlugin(plugin_path, quiet=True)
+
+
+def commit(undo: _h_action, redo: _h_action):
+	"""
+	Record an already-performed API edit as a single undo-queue entry.
+
+	:param undo: A function reverting the edit.
+	:param redo: A function performing the edit again.
+	"""
+	global _pending
+	ensure_plugin_loaded()
+	_pending = (undo, redo)
+	try:
+		getattr(_cmds, command_name)()
+	finally:
+		_pending = None
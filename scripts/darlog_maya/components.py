@@ -0,0 +1,97 @@
+# encoding: utf-8
+"""
+Compact representation of mesh components: sorted index arrays per component type
+instead of a PyNode (or a string) per component.
+
+Converted back to the minimal list of command arguments, with consecutive indices
+merged into ranges (``mesh.f[0:999]``).
+"""
+
+from array import array as _array
+from dataclasses import dataclass as _dataclass, field as _field
+
+from darlog_maya.py23 import *
+
+try:
+	import typing as _t
+except ImportError:
+	pass
+
+
+VERTEX = 'vtx'
+EDGE = 'e'
+FACE = 'f'
+UV = 'map'
+VERTEX_FACE = 'vtxFace'
+
+
+def index_ranges(ids: _t.Iterable[int]) -> _t.List[_t.Tuple[int, int]]:
+	"""Merge sorted unique indices into ``(first, last)`` ranges of consecutive ones."""
+	ranges = list()  # type: _t.List[_t.List[int]]
+	for i in ids:
+		if ranges and ranges[-1][1] + 1 == i:
+			ranges[-1][1] = i
+		else:
+			ranges.append([i, i])
+	return [(first, last) for first, last in ranges]
+
+
+def component_strings(node: _t.AnyStr, comp_type: _t.AnyStr, ids: _t.Iterable[int]) -> _t.List[_t.AnyStr]:
+	"""The minimal list of component strings for the given single-indexed components (sorted unique indices)."""
+	return [
+		'{}.{}[{}]'.format(node, comp_type, first) if first == last
+		else '{}.{}[{}:{}]'.format(node, comp_type, first, last)
+		for first, last in index_ranges(ids)
+	]
+
+
+def _sorted_unique(ids: _t.Iterable[int]) -> _array:
+	return _array('i', sorted(set(ids)))
+
+
+@_dataclass
+class MeshComponents:
+	"""
+	All the items of a single mesh, compacted:
+
+		- ``whole``: the mesh itself was given (components are irrelevant then).
+		- ``indices``: sorted unique indices per single-indexed component type (`VERTEX`, `EDGE`, `FACE`, `UV`).
+		- ``vertex_faces``: flat ``(vertex, face)`` index pairs.
+	"""
+	path: _t.AnyStr  # full DAG path of the mesh
+	whole: bool = False
+	indices: _t.Dict[_t.AnyStr, _array] = _field(default_factory=dict)
+	vertex_faces: _array = _field(default_factory=lambda: _array('i'))
+
+	def add(self, comp_type: _t.AnyStr, ids: _t.Iterable[int]):
+		if comp_type == VERTEX_FACE:
+			for vertex_face in ids:
+				self.vertex_faces.extend(vertex_face)
+			return
+		if comp_type not in self.indices:
+			self.indices[comp_type] = _array('i')
+		self.indices[comp_type].extend(ids)
+
+	def normalize(self):
+		"""Sort and deduplicate indices. To be called once all the components are added."""
+		for comp_type in list(self.indices.keys()):
+			self.indices[comp_type] = _sorted_unique(self.indices[comp_type])
+		pairs = sorted(set(_zip(self.vertex_faces[0::2], self.vertex_faces[1::2])))
+		self.vertex_faces = _array('i', (i for pair in pairs for i in pair))
+
+	@property
+	def n_components(self) -> int:
+		return sum(len(x) for x in self.indices.values()) + len(self.vertex_faces) // 2
+
+	def command_args(self) -> _t.List[_t.AnyStr]:
+		"""Items to pass to a Maya command: the mesh itself or the minimal list of component strings."""
+		if self.whole:
+			return [self.path, ]
+		res = list()  # type: _t.List[_t.AnyStr]
+		for comp_type, ids in self.indices.items():
+			res.extend(component_strings(self.path, comp_type, ids))
+		res.extend(
+			'{}.{}[{}][{}]'.format(self.path, VERTEX_FACE, vertex, face)
+			for vertex, face in _zip(self.vertex_faces[0::2], self.vertex_faces[1::2])
+		)
+		return res
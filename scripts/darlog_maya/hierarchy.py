@@ -0,0 +1,262 @@
+# encoding: utf-8
+"""
+Session-level index of the scene's DAG hierarchy: parents/children of each DAG node.
+
+The index is built once (a single DAG iterator pass) and then kept up to date incrementally,
+by OpenMaya node-added/removed and DAG-change callbacks. Scene new/open/import and reference
+changes just mark it for a lazy rebuild. It's invalidated already *before* them, so the per-node
+callbacks return right away for all the nodes created/deleted in the process.
+So, tools called many times a minute (e.g., from marking menus) don't walk the DAG again on each call.
+
+Nodes are keyed by ``MObjectHandle`` hash codes. Each entry also keeps the handle itself,
+so a stale or colliding entry is detected, and then it's just a cache miss: the caller
+should fall back to querying the scene directly.
+
+It's disabled by default. See `enable()` / `disable()` / `stats()`.
+"""
+
+from maya.api import OpenMaya as _om
+
+from darlog_maya.py23 import *
+
+try:
+	import typing as _t
+except ImportError:
+	pass
+
+
+def _key(obj: _om.MObject) -> int:
+	return _om.MObjectHandle(obj).hashCode()
+
+
+class HierarchyIndex(object):
+	"""Parent/children maps of all the DAG nodes in the scene."""
+
+	def __init__(self):
+		super(HierarchyIndex, self).__init__()
+		self.__handles = dict()  # type: _t.Dict[int, _om.MObjectHandle]
+		self.__children = dict()  # type: _t.Dict[int, _t.List[int]]
+		self.__parents = dict()  # type: _t.Dict[int, _t.List[int]]
+		self.__stale = set()  # type: _t.Set[int]
+		self.__dirty = True
+		self.__callback_ids = list()  # type: _t.List[int]
+		self.n_builds = 0
+		self.n_updates = 0
+		self.n_hits = 0
+		self.n_misses = 0
+
+	# Building / updating:
+
+	def __add_node(self, obj: _om.MObject) -> int:
+		key = _key(obj)
+		self.__handles[key] = _om.MObjectHandle(obj)
+		self.__children.setdefault(key, list())
+		self.__parents.setdefault(key, list())
+		return key
+
+	def __read_node_relatives(self, obj: _om.MObject):
+		"""(Re-)read both children and parents of a node from the scene."""
+		key = self.__add_node(obj)
+		fn = _om.MFnDagNode(obj)
+		children = list()  # type: _t.List[int]
+		for i in _range(fn.childCount()):
+			child = fn.child(i)
+			child_key = self.__add_node(child)
+			children.append(child_key)
+			if key not in self.__parents[child_key]:
+				self.__parents[child_key].append(key)
+		self.__children[key] = children
+
+		parents = list()  # type: _t.List[int]
+		for i in _range(fn.parentCount()):
+			parent = fn.parent(i)
+			parent_key = self.__add_node(parent)
+			parents.append(parent_key)
+			if key not in self.__children[parent_key]:
+				self.__children[parent_key].append(key)
+		self.__parents[key] = parents
+
+	def rebuild(self):
+		"""Read the whole hierarchy with a single DAG iterator pass."""
+		self.__handles.clear()
+		self.__children.clear()
+		self.__parents.clear()
+		self.__stale.clear()
+		it = _om.MItDag(_om.MItDag.kBreadthFirst, _om.MFn.kInvalid)
+		while not it.isDone():
+			obj = it.currentItem()
+			key = self.__add_node(obj)
+			fn = _om.MFnDagNode(obj)
+			self.__children[key] = [self.__add_node(fn.child(i)) for i in _range(fn.childCount())]
+			# All the parents at once (an instanced node is visited once per its path, that's fine):
+			self.__parents[key] = [self.__add_node(fn.parent(i)) for i in _range(fn.parentCount())]
+			it.next()
+		self.__dirty = False
+		self.n_builds += 1
+
+	def invalidate(self):
+		"""Mark the whole index for rebuild on the next query."""
+		self.__dirty = True
+
+	def _on_node_added(self, obj: _om.MObject, *args):
+		if self.__dirty:
+			return
+		self.__add_node(obj)
+		self.n_updates += 1
+
+	def _on_node_removed(self, obj: _om.MObject, *args):
+		if self.__dirty:
+			return
+		key = _key(obj)
+		for parent_key in self.__parents.pop(key, list()):
+			siblings = self.__children.get(parent_key)
+			if siblings is not None and key in siblings:
+				siblings.remove(key)
+		for child_key in self.__children.pop(key, list()):
+			parents = self.__parents.get(child_key)
+			if parents is not None and key in parents:
+				parents.remove(key)
+		self.__handles.pop(key, None)
+		self.__stale.discard(key)
+		self.n_updates += 1
+
+	def _on_dag_changed(self, msg_type: int, child: _om.MDagPath, parent: _om.MDagPath, *args):
+		"""
+		Any re-parenting / instancing / reordering: both ends of the changed relation are re-read
+		on their next query (the change might be not complete yet at the moment of the callback).
+		"""
+		if self.__dirty:
+			return
+		for path in (parent, child):
+			try:
+				self.__stale.add(self.__add_node(path.node()))
+			except RuntimeError:
+				pass  # the node is being deleted
+		self.n_updates += 1
+
+	def _on_scene_changed(self, *args):
+		self.invalidate()
+
+	# Callbacks:
+
+	@property
+	def is_tracking(self) -> bool:
+		return bool(self.__callback_ids)
+
+	def start_tracking(self):
+		if self.__callback_ids:
+			return
+		self.__callback_ids = [
+			_om.MDGMessage.addNodeAddedCallback(self._on_node_added, 'dagNode'),
+			_om.MDGMessage.addNodeRemovedCallback(self._on_node_removed, 'dagNode'),
+			_om.MDagMessage.addAllDagChangesCallback(self._on_dag_changed),
+		] + [
+			_om.MSceneMessage.addCallback(msg, self._on_scene_changed) for msg in (
+				# Before: skip per-node updates during the whole operation.
+				_om.MSceneMessage.kBeforeNew,
+				_om.MSceneMessage.kBeforeOpen,
+				_om.MSceneMessage.kBeforeImport,
+				_om.MSceneMessage.kBeforeCreateReference,
+				_om.MSceneMessage.kBeforeLoadReference,
+				_om.MSceneMessage.kBeforeUnloadReference,
+				_om.MSceneMessage.kBeforeRemoveReference,
+				# After: a query made from another callback in the middle of it might have rebuilt the index.
+				_om.MSceneMessage.kAfterNew,
+				_om.MSceneMessage.kAfterOpen,
+				_om.MSceneMessage.kAfterImport,
+				_om.MSceneMessage.kAfterCreateReference,
+				_om.MSceneMessage.kAfterLoadReference,
+				_om.MSceneMessage.kAfterUnloadReference,
+				_om.MSceneMessage.kAfterRemoveReference,
+			)
+		]
+		self.invalidate()  # the scene might have changed while not tracked
+
+	def stop_tracking(self):
+		if self.__callback_ids:
+			_om.MMessage.removeCallbacks(self.__callback_ids)
+		self.__callback_ids = list()
+		self.invalidate()
+
+	# Queries:
+
+	def __entry_key(self, obj: _om.MObject) -> _t.Optional[int]:
+		if self.__dirty:
+			self.rebuild()
+		key = _key(obj)
+		handle = self.__handles.get(key)
+		if handle is None or not handle.isValid() or handle.object() != obj:
+			self.n_misses += 1
+			return None
+		if key in self.__stale:
+			self.__stale.discard(key)
+			self.__read_node_relatives(obj)
+		self.n_hits += 1
+		return key
+
+	def __objects(self, keys: _t.Iterable[int]) -> _t.Optional[_t.List[_om.MObject]]:
+		res = list()
+		for key in keys:
+			handle = self.__handles.get(key)
+			if handle is None or not handle.isValid():
+				self.n_misses += 1
+				return None
+			res.append(handle.object())
+		return res
+
+	def children(self, obj: _om.MObject) -> _t.Optional[_t.List[_om.MObject]]:
+		"""Child nodes in their order, or ``None`` if the node isn't in the index (then, query the scene)."""
+		key = self.__entry_key(obj)
+		return None if key is None else self.__objects(self.__children[key])
+
+	def parents(self, obj: _om.MObject) -> _t.Optional[_t.List[_om.MObject]]:
+		"""All the parent nodes (more than one for instances), or ``None`` if the node isn't in the index."""
+		key = self.__entry_key(obj)
+		return None if key is None else self.__objects(self.__parents[key])
+
+	def stats(self) -> _t.Dict[_t.AnyStr, _t.Any]:
+		return dict(
+			tracking=self.is_tracking,
+			dirty=self.__dirty,
+			nodes=len(self.__handles),
+			stale=len(self.__stale),
+			builds=self.n_builds,
+			updates=self.n_updates,
+			hits=self.n_hits,
+			misses=self.n_misses,
+		)
+
+
+_index = None  # type: _t.Optional[HierarchyIndex]
+
+
+def enable() -> HierarchyIndex:
+	"""Start maintaining the session-wide index. It's built lazily, on the first query."""
+	global _index
+	if _index is None:
+		_index = HierarchyIndex()
+	_index.start_tracking()
+	return _index
+
+
+def disable():
+	"""Remove the callbacks and drop the index."""
+	global _index
+	if _index is not None:
+		_index.stop_tracking()
+	_index = None
+
+
+def is_enabled() -> bool:
+	return _index is not None
+
+
+def active_index() -> _t.Optional[HierarchyIndex]:
+	"""The session-wide index if enabled, ``None`` otherwise."""
+	return _index
+
+
+def stats() -> _t.Dict[_t.AnyStr, _t.Any]:
+	if _index is None:
+		return dict(tracking=False)
+	return _index.stats()
@@ -3,11 +3,16 @@
 """
 
 from abc import ABC, abstractmethod
+from collections import OrderedDict as _OrderedDict
 from dataclasses import dataclass as _dataclass
 
+from maya import cmds as _cmds
+from maya.api import OpenMaya as _om
 from pymel import core as _pm
 from pymel.core import nodetypes as _nt
 
+from darlog_maya import hierarchy as _hierarchy
+from darlog_maya.api_nodes import dag_path as _dag_path
 from darlog_maya.py23 import *
 from darlog_maya.typing_poly import *
 
@@ -50,6 +55,155 @@ def cleanup_input(items: _h_input_seq) -> _t.List[_pm.PyNode]:
 	return _pm.ls(items)
 
 
+# Strings are converted to PyNodes by batches of this size, with a single ``ls`` each:
+_cleanup_batch_size = 1000
+
+
+def cleanup_input_gen(items: _h_input_seq) -> _t.Generator[_pm.PyNode, _t.Any, None]:
+	"""
+	Lazy version of `cleanup_input()`: the input isn't turned into a list first,
+	and items are converted to PyNodes as they're consumed. Consecutive strings are looked up together,
+	with one ``ls`` per up to `_cleanup_batch_size` of them (PyNodes are passed as-is, in order).
+	"""
+	if items is None:
+		return
+
+	if isinstance(items, _t_str):
+		items = [items, ]
+
+	try:
+		items = iter(items)
+	except TypeError:
+		items = iter([items, ])
+
+	names = list()
+	for item in items:
+		if item is None:
+			continue
+		if not isinstance(item, _pm.PyNode):
+			names.append(item)
+			if len(names) < _cleanup_batch_size:
+				continue
+		if names:
+			for node in _pm.ls(names):
+				yield node
+			names = list()
+		if isinstance(item, _pm.PyNode):
+			yield item
+	if names:
+		for node in _pm.ls(names):
+			yield node
+
+
+_TKey = _t.TypeVar('TKey')
+
+
+def _unsupported_input_error(item) -> ValueError:
+	return ValueError("Unsupported selection: {}".format(repr(item)))
+
+
+def _iter_unique_keys(
+	key_item_pairs: _t.Iterable[_t.Tuple[_t.Optional[_TKey], _t.Any]], error_input: _t.Optional[list] = None
+) -> _t.Generator[_TKey, _t.Any, None]:
+	"""
+	Streaming dedup of ``(shape, item)`` pairs, with ``None`` shape for an invalid item.
+
+	Invalid items are appended to ``error_input`` list. If it's ``None``, the first one raises ``ValueError`` instead.
+	"""
+	seen = set()  # type: _t.Set[_TKey]
+	for key, item in key_item_pairs:
+		if key is None:
+			if error_input is None:
+				raise _unsupported_input_error(item)
+			error_input.append(item)
+			continue
+		if key in seen:
+			continue
+		seen.add(key)
+		yield key
+
+
+def _iter_key_runs(
+	key_item_pairs: _t.Iterable[_t.Tuple[_t.Optional[_TKey], _t.Any]], error_input: _t.Optional[list] = None
+) -> _t.Generator[_t.Tuple[_TKey, list], _t.Any, None]:
+	"""
+	Streaming grouping of ``(shape, item)`` pairs: items are grouped by runs of the same shape.
+	I.e., a shape is yielded again if its items aren't contiguous in the input.
+
+	Invalid items are handled the same way as in `_iter_unique_keys()`.
+	"""
+	run_key = None
+	run_items = list()
+	for key, item in key_item_pairs:
+		if key is None:
+			if error_input is None:
+				raise _unsupported_input_error(item)
+			error_input.append(item)
+			continue
+		if run_items and key != run_key:
+			yield run_key, run_items
+			run_items = list()
+		run_key = key
+		run_items.append(item)
+	if run_items:
+		yield run_key, run_items
+
+
+def _iter_key_groups(
+	key_item_pairs: _t.Iterable[_t.Tuple[_t.Optional[_TKey], _t.Any]], error_input: _t.Optional[list] = None,
+	merge_repeats=False,
+) -> _t.Generator[_t.Tuple[_TKey, list], _t.Any, None]:
+	"""
+	Grouping of ``(shape, item)`` pairs for ``iter_grouped()``.
+
+	By default, it's `_iter_key_runs()`: fully streaming, but a shape whose items aren't contiguous
+	is yielded once per each run (each time, with a partial group).
+
+	With ``merge_repeats``, each shape is yielded exactly once, with all its items (in the order of the shapes'
+	first appearance). It buffers the whole input: groups are only yielded once it's all scanned,
+	though invalid items still raise right away.
+	"""
+	if not merge_repeats:
+		for key, items in _iter_key_runs(key_item_pairs, error_input=error_input):
+			yield key, items
+		return
+	groups = _OrderedDict()  # type: _t.Dict[_TKey, list]
+	for key, items in _iter_key_runs(key_item_pairs, error_input=error_input):
+		if key in groups:
+			groups[key].extend(items)
+		else:
+			groups[key] = items
+	for key, items in groups.items():
+		yield key, items
+
+
+def _indexed_child_paths(
+	parent_path: _om.MDagPath, all_descendents=False
+) -> _t.Optional[_t.List[_om.MDagPath]]:
+	"""
+	Child DAG paths from `darlog_maya.hierarchy` index.
+
+	``None`` if the index is disabled or it misses any of the nodes: then, query the scene directly.
+	"""
+	index = _hierarchy.active_index()
+	if index is None:
+		return None
+	res = list()  # type: _t.List[_om.MDagPath]
+	parents = [parent_path]
+	while parents:
+		path = parents.pop()
+		children = index.children(path.node())
+		if children is None:
+			return None
+		for child in children:
+			child_path = _om.MDagPath(path)
+			child_path.push(child)
+			res.append(child_path)
+			if all_descendents and child.hasFn(_om.MFn.kTransform):
+				parents.append(child_path)
+	return res
+
+
 @_dataclass(init=False)
 class _FromToShape(ABC):
 	"""An ABC designed to perform component/shape/transform conversions on an arbitrary shape type."""
@@ -75,15 +229,97 @@ def _comp_to_shape(cls, component: _pm.Component) -> _TShape:
 		assert isinstance(component, cls._comp_type())
 		return component.node()
 
+	def _indexed_child_shapes(
+		self, transform_nodes: _h_transform_input_seq, all_descendents=False
+	) -> _t.Optional[_t.List[_nt.Shape]]:
+		"""
+		The same shapes ``listRelatives`` returns, but from `darlog_maya.hierarchy` index.
+		``None`` if the index is disabled or it misses any of the nodes.
+		"""
+		if _hierarchy.active_index() is None:
+			return None
+		if isinstance(transform_nodes, _t_str) or not isinstance(transform_nodes, (list, tuple, set)):
+			transform_nodes = [transform_nodes]
+
+		res = list()  # type: _t.List[_nt.Shape]
+		seen = set()  # type: _t.Set[_t.AnyStr]
+		for transform in transform_nodes:
+			child_paths = _indexed_child_paths(_dag_path(transform), all_descendents=all_descendents)
+			if child_paths is None:
+				return None
+			for path in child_paths:
+				obj = path.node()
+				if not obj.hasFn(_om.MFn.kShape):
+					continue
+				if self.no_intermediate_shapes and _om.MFnDagNode(obj).isIntermediateObject:
+					continue
+				shape_path = path.fullPathName()
+				if shape_path in seen:
+					continue
+				seen.add(shape_path)
+				res.append(_pm.PyNode(shape_path))
+		return res
+
 	def _transforms_to_child_shapes_gen(
 		self, transform_nodes: _h_transform_input_seq, all_descendents=False
 	) -> _t.Generator[_TShape, _t.Any, None]:
 		shape_type = self._shape_type()
-		return (
-			x for x in _pm.listRelatives(
+		shapes = self._indexed_child_shapes(transform_nodes, all_descendents=all_descendents)
+		if shapes is None:
+			shapes = _pm.listRelatives(
 				transform_nodes, shapes=1, allDescendents=all_descendents, noIntermediate=self.no_intermediate_shapes
-			) if isinstance(x, shape_type)
-		)
+			)
+		return (x for x in shapes if isinstance(x, shape_type))
+
+	def _transforms_to_child_shapes_batch(
+		self, transform_nodes: _t.Sequence[_nt.Transform], all_descendents=False
+	) -> _t.Dict[_t.AnyStr, _t.List[_TShape]]:
+		"""
+		Like `_transforms_to_child_shapes_gen()`, but for many transforms at once, with a single DAG query
+		(or none at all: with `darlog_maya.hierarchy` index enabled).
+
+		The result is grouped back per each transform: keyed by its full path.
+		"""
+		res = dict()  # type: _t.Dict[_t.AnyStr, _t.List[_TShape]]
+		if not transform_nodes:
+			# An empty list would make ``listRelatives`` work on selection
+			return res
+
+		shape_type = self._shape_type()
+		if _hierarchy.active_index() is not None:
+			for transform in transform_nodes:
+				shapes = self._indexed_child_shapes(transform, all_descendents=all_descendents)
+				if shapes is None:
+					break
+				res[transform.longName()] = [x for x in shapes if isinstance(x, shape_type)]
+			else:
+				return res
+			res.clear()  # the index missed some node: query the scene instead
+
+		for transform in transform_nodes:
+			res[transform.longName()] = list()
+
+		seen = set()  # type: _t.Set[_t.AnyStr]
+		for shape in _pm.listRelatives(
+			transform_nodes, shapes=1, allDescendents=all_descendents, noIntermediate=self.no_intermediate_shapes,
+			fullPath=1
+		):
+			if not isinstance(shape, shape_type):
+				continue
+			shape_path = shape.longName()
+			if shape_path in seen:
+				continue
+			seen.add(shape_path)
+
+			# Parent path for direct children, or each ancestor path (which was given) for all descendents:
+			parent_path = shape_path.rsplit('|', 1)[0]
+			while parent_path:
+				if parent_path in res:
+					res[parent_path].append(shape)
+				if not all_descendents:
+					break
+				parent_path = parent_path.rsplit('|', 1)[0]
+		return res
 
 	def __to_shape_with_item_gen(
 		self, items: _h_geo_selection_input_seq, all_transform_descendents=True
@@ -101,7 +337,17 @@ def __to_shape_with_item_gen(
 		shape_type = self._shape_type()
 		comp_type = self._comp_type()
 
-		for item in cleanup_input(items):
+		items = cleanup_input(items)
+		# Children of all the transforms are found at once, and only then items are processed in order:
+		child_shapes = self._transforms_to_child_shapes_batch(
+			[
+				x for x in items
+				if isinstance(x, _nt.Transform) and not isinstance(x, shape_type) and not isinstance(x, comp_type)
+			],
+			all_descendents=all_transform_descendents
+		)
+
+		for item in items:
 			if isinstance(item, shape_type):
 				# print("Shape: {}".format(repr(item)))
 				yield item, item
@@ -112,7 +358,7 @@ def __to_shape_with_item_gen(
 				continue
 			if isinstance(item, _nt.Transform):
 				# print("Transform: {}".format(repr(item)))
-				for child_shape in self._transforms_to_child_shapes_gen(item, all_descendents=all_transform_descendents):
+				for child_shape in child_shapes[item.longName()]:
 					yield child_shape, child_shape
 				continue
 
@@ -134,8 +380,49 @@ def __to_shape_gen_with_possible_duplicates(
 		for shape, item in self.__to_shape_with_item_gen(items, all_transform_descendents=all_transform_descendents):
 			if shape is None:
 				yield True, item
+				continue
 			yield False, shape
 
+	def _iter_shape_with_item(
+		self, items: _h_geo_selection_input_seq, all_transform_descendents=True
+	) -> _t.Generator[_t.Tuple[_t.Optional[_TShape], _t.Any], _t.Any, None]:
+		"""
+		Streaming counterpart of `__to_shape_with_item_gen()`: nothing is gathered beforehand,
+		so each transform is expanded with its own query, right when it's reached.
+		"""
+		shape_type = self._shape_type()
+		comp_type = self._comp_type()
+
+		for item in cleanup_input_gen(items):
+			if isinstance(item, shape_type):
+				yield item, item
+				continue
+			if isinstance(item, comp_type):
+				yield item.node(), item
+				continue
+			if isinstance(item, _nt.Transform):
+				for child_shape in self._transforms_to_child_shapes_gen(item, all_descendents=all_transform_descendents):
+					yield child_shape, child_shape
+				continue
+			yield None, item  # invalid input
+
+	def _iter_shapes(
+		self, items: _h_geo_selection_input_seq, all_transform_descendents=True, error_input: _t.Optional[list] = None
+	) -> _t.Generator[_TShape, _t.Any, None]:
+		return _iter_unique_keys(
+			self._iter_shape_with_item(items, all_transform_descendents=all_transform_descendents),
+			error_input=error_input
+		)
+
+	def _iter_grouped(
+		self, items: _h_geo_selection_input_seq, all_transform_descendents=True, error_input: _t.Optional[list] = None,
+		merge_repeats=False,
+	) -> _t.Generator[_t.Tuple[_TShape, list], _t.Any, None]:
+		return _iter_key_groups(
+			self._iter_shape_with_item(items, all_transform_descendents=all_transform_descendents),
+			error_input=error_input, merge_repeats=merge_repeats,
+		)
+
 	def _to_shapes(
 		self, items: _h_geo_selection_input_seq, all_transform_descendents=True
 	) -> _t.Tuple[_t.List[_TShape], _t.List[_t.Any]]:
@@ -184,10 +471,17 @@ def _shape_to_transform_if_only_one(self, shape: _TShape) -> _h_geo_object:
 		"""
 		assert isinstance(shape, self._shape_type())
 		transform = shape.getTransform()  # type: _nt.Transform
-		if any(
-			isinstance(x, _nt.Transform) for x in
-			_pm.listRelatives(transform, children=1, allDescendents=False)
-		):
+		child_paths = None
+		if _hierarchy.active_index() is not None:
+			child_paths = _indexed_child_paths(_dag_path(transform))
+		if child_paths is None:
+			has_child_transforms = any(
+				isinstance(x, _nt.Transform) for x in
+				_pm.listRelatives(transform, children=1, allDescendents=False)
+			)
+		else:
+			has_child_transforms = any(x.node().hasFn(_om.MFn.kTransform) for x in child_paths)
+		if has_child_transforms:
 			# There are other child transforms
 			return shape
 
@@ -200,6 +494,95 @@ def _shape_to_transform_if_only_one(self, shape: _TShape) -> _h_geo_object:
 
 		return transform
 
+	def _indexed_only_shape_path(self, child_paths: _t.List[_om.MDagPath]) -> _t.Optional[_t.AnyStr]:
+		"""The full path of the only child shape (of the supported type), if there are no child transforms."""
+		shape_type = self._shape_type()
+		shape_paths = list()  # type: _t.List[_t.AnyStr]
+		for path in child_paths:
+			obj = path.node()
+			if obj.hasFn(_om.MFn.kTransform):
+				return None
+			if not obj.hasFn(_om.MFn.kShape):
+				continue
+			if self.no_intermediate_shapes and _om.MFnDagNode(obj).isIntermediateObject:
+				continue
+			shape_path = path.fullPathName()
+			if isinstance(_pm.PyNode(shape_path), shape_type):
+				shape_paths.append(shape_path)
+		return shape_paths[0] if len(shape_paths) == 1 else None
+
+	def _indexed_shapes_to_transforms(self, shapes: _t.List[_TShape]) -> _t.Optional[_t.List[_h_geo_object]]:
+		"""
+		`_shapes_to_transforms_if_only_one()` answered by `darlog_maya.hierarchy` index, without any DAG query.
+		``None`` if the index misses any of the nodes.
+		"""
+		only_shapes = dict()  # type: _t.Dict[_t.AnyStr, _t.Optional[_t.AnyStr]]
+		transforms = dict()  # type: _t.Dict[_t.AnyStr, _nt.Transform]
+		res = list()  # type: _t.List[_h_geo_object]
+		for shape in shapes:
+			path = _om.MDagPath(_dag_path(shape))
+			shape_path = path.fullPathName()
+			path.pop()
+			parent_path = path.fullPathName()
+			if parent_path not in only_shapes:
+				child_paths = _indexed_child_paths(path)
+				if child_paths is None:
+					return None
+				only_shapes[parent_path] = self._indexed_only_shape_path(child_paths)
+			if only_shapes[parent_path] != shape_path:
+				res.append(shape)
+				continue
+			if parent_path not in transforms:
+				transforms[parent_path] = _pm.PyNode(parent_path)
+			res.append(transforms[parent_path])
+		return res
+
+	def _shapes_to_transforms_if_only_one(self, shapes: _t.Iterable[_TShape]) -> _t.List[_h_geo_object]:
+		"""
+		`_shape_to_transform_if_only_one()` for many shapes at once.
+
+		Instead of a few DAG queries per shape, the whole hierarchy around them is captured
+		with just 3 queries: all the children of parent transforms and their types.
+		With `darlog_maya.hierarchy` index enabled, it's answered by the index instead.
+		"""
+		shapes = list(shapes)
+		if not shapes:
+			return list()
+		shape_type = self._shape_type()
+		assert all(isinstance(x, shape_type) for x in shapes)
+
+		if _hierarchy.active_index() is not None:
+			res = self._indexed_shapes_to_transforms(shapes)
+			if res is not None:
+				return res
+
+		shape_paths = [x.longName() for x in shapes]
+		parent_paths = [x.rsplit('|', 1)[0] for x in shape_paths]
+		unique_parents = list(set(parent_paths))
+
+		children = _cmds.listRelatives(unique_parents, children=True, fullPath=True) or list()
+		child_transforms = _cmds.ls(children, type='transform', long=True) if children else list()
+		type_names = [x.__melnode__ for x in (shape_type if isinstance(shape_type, tuple) else (shape_type, ))]
+		child_shapes = _cmds.ls(
+			children, type=type_names, noIntermediate=self.no_intermediate_shapes, long=True
+		) if children else list()
+
+		has_child_transforms = set(x.rsplit('|', 1)[0] for x in child_transforms)
+		parent_shapes = dict()  # type: _t.Dict[_t.AnyStr, _t.List[_t.AnyStr]]
+		for shape_path in child_shapes:
+			parent_shapes.setdefault(shape_path.rsplit('|', 1)[0], list()).append(shape_path)
+
+		res = list()  # type: _t.List[_h_geo_object]
+		transforms = dict()  # type: _t.Dict[_t.AnyStr, _nt.Transform]
+		for shape, shape_path, parent_path in _zip(shapes, shape_paths, parent_paths):
+			if parent_path in has_child_transforms or parent_shapes.get(parent_path) != [shape_path]:
+				res.append(shape)
+				continue
+			if parent_path not in transforms:
+				transforms[parent_path] = _pm.PyNode(parent_path)
+			res.append(transforms[parent_path])
+		return res
+
 
 class FromToMesh(_FromToShape):
 	"""Convert between poly-shape, it's transform and components."""
@@ -234,8 +617,46 @@ def group_by_mesh(
 		)  # suppress PyCharm's omplaints on mismatching type
 		return res_with_errors
 
+	def iter_meshes(
+		self, items: _h_poly_selection_input_seq, all_transform_descendents=True, error_input: _t.Optional[list] = None
+	) -> _t.Generator[_nt.Mesh, _t.Any, None]:
+		"""
+		Streaming version of `to_meshes()`: unique meshes are yielded as soon as they're found.
+
+		:param error_input:
+			A list to collect unsupported items to. If not given, the first such item
+			raises ``ValueError`` right away, without processing the rest of the input.
+		"""
+		return self._iter_shapes(items, all_transform_descendents=all_transform_descendents, error_input=error_input)
+
+	def iter_grouped(
+		self, items: _h_poly_selection_input_seq, all_transform_descendents=True, error_input: _t.Optional[list] = None,
+		merge_repeats=False,
+	) -> _t.Generator[_t.Tuple[_nt.Mesh, _t.List[_t.Union[_nt.Mesh, _h_poly_comp]]], _t.Any, None]:
+		"""
+		Generator version of `group_by_mesh()`, stopping on the first invalid item (unless ``error_input`` is given).
+
+		:param error_input: The same as in `iter_meshes()`.
+		:param merge_repeats:
+			By default, groups are yielded as soon as each contiguous run of the same mesh ends: fully streaming,
+			but a mesh is yielded again for each of its runs, so a group isn't necessarily all of the mesh's items.
+			When enabled, each mesh is yielded once, with all its items, even if they're interleaved
+			with other meshes' ones. Then, the whole input is buffered: groups come only after it's all scanned.
+			For a streaming, deduplicated sequence of meshes, use `iter_meshes()`.
+		"""
+		return self._iter_grouped(
+			items, all_transform_descendents=all_transform_descendents, error_input=error_input,
+			merge_repeats=merge_repeats,
+		)
+
 	def mesh_to_transform_if_only_one(self, mesh: _nt.Mesh) -> _h_poly_object:
 		"""
 		Convert mesh to it's transform if the given mesh is the only child.
 		"""
 		return self._shape_to_transform_if_only_one(mesh)
+
+	def meshes_to_transforms_if_only_one(self, meshes: _t.Iterable[_nt.Mesh]) -> _t.List[_h_poly_object]:
+		"""
+		`mesh_to_transform_if_only_one()` for the whole list of meshes, with only 3 DAG queries in total.
+		"""
+		return self._shapes_to_transforms_if_only_one(meshes)
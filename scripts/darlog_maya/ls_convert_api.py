@@ -0,0 +1,478 @@
+# encoding: utf-8
+"""
+An alternative backend for `darlog_maya.ls_convert`, built on OpenMaya 2.0 instead of PyMel.
+
+PyMel wraps each input item into a PyNode (tens of microseconds each) and then hashes/compares them.
+For large component selections, it costs more than the actual operation. Here, items are resolved
+with ``MSelectionList`` / ``MDagPath`` and meshes are keyed by their full DAG path strings.
+PyNodes are only built for the results, and only if requested.
+"""
+
+from pymel import core as _pm
+from pymel.core import nodetypes as _nt
+
+from maya.api import OpenMaya as _om
+
+from darlog_maya import components as _comp
+from darlog_maya.api_nodes import dag_path as _dag_path, node_name as _item_name
+from darlog_maya import hierarchy as _hierarchy
+from darlog_maya.ls_convert import (
+	_iter_key_groups,
+	_iter_unique_keys,
+
+	_h_poly_selection_input_seq,
+	_h_transform_input_seq,
+)
+from darlog_maya.py23 import *
+
+try:
+	import typing as _t
+except ImportError:
+	pass
+
+
+_h_mesh_key = _t.AnyStr  # full DAG path
+_h_api_input = _t.Union[_pm.PyNode, _t.AnyStr, _om.MDagPath]
+_h_mesh_output = _t.Union[_h_mesh_key, _nt.Mesh]
+_h_api_grouped_output = _t.Dict[_h_mesh_output, _t.List[_t.Any]]
+_h_api_compact_output = _t.Dict[_h_mesh_output, _comp.MeshComponents]
+
+_component_types = {
+	_om.MFn.kMeshVertComponent: _comp.VERTEX,
+	_om.MFn.kMeshEdgeComponent: _comp.EDGE,
+	_om.MFn.kMeshPolygonComponent: _comp.FACE,
+	_om.MFn.kMeshMapComponent: _comp.UV,
+	_om.MFn.kMeshVtxFaceComponent: _comp.VERTEX_FACE,
+}
+
+
+def _cleanup_input_gen(items) -> _t.Generator[_t.Any, _t.Any, None]:
+	"""Like `ls_convert.cleanup_input()`, but neither builds PyNodes nor a list."""
+	if items is None:
+		return
+	if isinstance(items, (_t_str, _om.MDagPath, _om.MSelectionList)):
+		items = [items, ]
+	try:
+		items = iter(items)
+	except TypeError:
+		items = iter([items, ])
+	for item in items:
+		if item is not None:
+			yield item
+
+
+def active_selection() -> _om.MSelectionList:
+	"""The current selection, straight from ``MGlobal``. Can be passed as input to `FromToMeshApi` methods."""
+	return _om.MGlobal.getActiveSelectionList()
+
+
+def active_poly_selection() -> _om.MSelectionList:
+	"""
+	`active_selection()` without the items which are neither poly-objects (meshes, transforms)
+	nor poly-components: the API counterpart of filtering ``ls(sl=1)`` by ``_t_poly_object_or_comp``,
+	without a PyNode per selected item.
+	"""
+	sel = active_selection()
+	res = _om.MSelectionList()
+	for i in _range(sel.length()):
+		try:
+			path, component = sel.getComponent(i)
+		except TypeError:
+			continue  # not a DAG node
+		node = path.node()
+		if _is_mesh(node):
+			res.add(path if component.isNull() else (path, component))
+		elif component.isNull() and node.hasFn(_om.MFn.kTransform):
+			res.add(path)
+	return res
+
+
+def _selection_entries_gen(
+	sel: _om.MSelectionList
+) -> _t.Generator[_t.Tuple[_t.Optional[_om.MDagPath], _t.Optional[_om.MObject], _t.Any], _t.Any, None]:
+	for i in _range(sel.length()):
+		try:
+			path, component = sel.getComponent(i)
+		except TypeError:
+			# not a DAG node
+			yield None, None, sel.getSelectionStrings(i)[0]
+			continue
+		yield path, component, (path, component)
+
+
+def _api_entries_gen(
+	items
+) -> _t.Generator[_t.Tuple[_t.Optional[_om.MDagPath], _t.Optional[_om.MObject], _t.Any], _t.Any, None]:
+	"""
+	Resolve any input into ``(MDagPath, component MObject, item)`` entries.
+	``MSelectionList``, ``MDagPath`` and ``(MDagPath, MObject)`` items are used as-is, without any string conversion.
+	Path is ``None`` for an invalid item.
+	"""
+	if isinstance(items, _om.MSelectionList):
+		for entry in _selection_entries_gen(items):
+			yield entry
+		return
+
+	for item in _cleanup_input_gen(items):
+		if isinstance(item, _om.MDagPath):
+			yield item, _om.MObject.kNullObj, item
+			continue
+		if isinstance(item, tuple) and len(item) == 2 and isinstance(item[0], _om.MDagPath):
+			yield item[0], item[1], item
+			continue
+		if isinstance(item, _om.MSelectionList):
+			for entry in _selection_entries_gen(item):
+				yield entry
+			continue
+
+		name = _item_name(item)
+		sel = _om.MSelectionList()
+		try:
+			sel.add(name)
+		except (RuntimeError, TypeError):
+			yield None, None, item  # doesn't exist
+			continue
+		for path, component, entry_item in _selection_entries_gen(sel):
+			yield path, component, (name if path is not None else item)
+
+
+def _entry_name(item: _t.Tuple[_om.MDagPath, _om.MObject]) -> _t.AnyStr:
+	sel = _om.MSelectionList()
+	sel.add(item)
+	return sel.getSelectionStrings(0)[0]
+
+
+def _is_mesh(obj: _om.MObject) -> bool:
+	return obj.apiType() == _om.MFn.kMesh
+
+
+def _child_nodes(path: _om.MDagPath) -> _t.List[_om.MObject]:
+	"""Children of the node at the end of path: from the hierarchy index if it's enabled, from the scene otherwise."""
+	index = _hierarchy.active_index()
+	if index is not None:
+		children = index.children(path.node())
+		if children is not None:
+			return children
+	return [path.child(i) for i in _range(path.childCount())]
+
+
+def _child_path(parent_path: _om.MDagPath, child: _om.MObject) -> _om.MDagPath:
+	child_path = _om.MDagPath(parent_path)
+	child_path.push(child)
+	return child_path
+
+
+class FromToMeshApi(object):
+	"""
+	The same conversions as `ls_convert.FromToMesh`, with the same input
+	(PyNodes or strings), and also API input: an ``MSelectionList`` (e.g., `active_selection()`),
+	``MDagPath``-s or ``(MDagPath, component MObject)`` pairs.
+
+	By default, the output is made of strings: meshes as full DAG paths, components - as given.
+	Then, they can be passed directly to Maya commands.
+
+	DAG queries are answered by `darlog_maya.hierarchy` index when it's enabled.
+
+	:param no_intermediate_shapes: Skip intermediate meshes when expanding transforms.
+	:param mesh_pynodes: Output meshes as PyNodes (only the resulting unique meshes are wrapped).
+	:param component_pynodes: Output components as PyNodes.
+	"""
+	def __init__(self, no_intermediate_shapes=True, mesh_pynodes=False, component_pynodes=False):
+		super(FromToMeshApi, self).__init__()
+		self.no_intermediate_shapes = no_intermediate_shapes
+		self.mesh_pynodes = mesh_pynodes
+		self.component_pynodes = component_pynodes
+
+	def _is_output_mesh(self, obj: _om.MObject) -> bool:
+		return _is_mesh(obj) and not (
+			self.no_intermediate_shapes and _om.MFnDagNode(obj).isIntermediateObject
+		)
+
+	def _child_mesh_paths_gen(
+		self, transform_path: _om.MDagPath, all_descendents=False
+	) -> _t.Generator[_om.MDagPath, _t.Any, None]:
+		if all_descendents and not _hierarchy.is_enabled():
+			it = _om.MItDag(_om.MItDag.kDepthFirst, _om.MFn.kMesh)
+			it.reset(transform_path, _om.MItDag.kDepthFirst, _om.MFn.kMesh)
+			while not it.isDone():
+				if self._is_output_mesh(it.currentItem()):
+					yield it.getPath()
+				it.next()
+			return
+
+		for child in _child_nodes(transform_path):
+			if self._is_output_mesh(child):
+				yield _child_path(transform_path, child)
+			elif all_descendents and child.hasFn(_om.MFn.kTransform):
+				for descendent_path in self._child_mesh_paths_gen(_child_path(transform_path, child), all_descendents=True):
+					yield descendent_path
+
+	def _mesh_key_with_item_gen(
+		self, items: _h_poly_selection_input_seq, all_transform_descendents=True
+	) -> _t.Generator[
+		_t.Tuple[_t.Optional[_h_mesh_key], _t.Any, _t.Optional[_om.MObject], _t.Optional[_om.MDagPath]], _t.Any, None
+	]:
+		"""
+		The core of the conversion: yields the mesh key, the item itself, the component object
+		(``None`` for a whole mesh) and the mesh's DAG path.
+		For an invalid input, it's ``None``, the original item, ``None``, ``None``.
+
+		The item is a string for string/PyNode input, and ``(MDagPath, MObject)`` for API input.
+		"""
+		for path, component, item in _api_entries_gen(items):
+			if path is None:
+				yield None, item, None, None
+				continue
+
+			node = path.node()
+			if not component.isNull():
+				if _is_mesh(node):
+					yield path.fullPathName(), item, component, path
+				else:
+					yield None, item, None, None
+				continue
+			if _is_mesh(node):
+				key = path.fullPathName()
+				yield key, key, None, path
+				continue
+			if node.hasFn(_om.MFn.kTransform):
+				for child_path in self._child_mesh_paths_gen(path, all_descendents=all_transform_descendents):
+					key = child_path.fullPathName()
+					yield key, key, None, child_path
+				continue
+			yield None, item, None, None  # unsupported node type
+
+	def _mesh_out(self, key: _h_mesh_key) -> _h_mesh_output:
+		return _pm.PyNode(key) if self.mesh_pynodes else key
+
+	def _item_out(self, key: _h_mesh_key, item: _t.Any, mesh_out: _h_mesh_output) -> _t.Any:
+		if item == key:
+			return mesh_out  # a whole mesh (components always have an attribute part)
+		if isinstance(item, tuple):
+			item = _entry_name(item)  # API input
+		return _pm.PyNode(item) if self.component_pynodes else item
+
+	def comp_to_mesh(self, component: _h_api_input) -> _h_mesh_output:
+		sel = _om.MSelectionList()
+		sel.add(_item_name(component))
+		path, comp = sel.getComponent(0)
+		if comp.isNull() or not _is_mesh(path.node()):
+			raise TypeError("Not a poly-component: {}".format(repr(component)))
+		return self._mesh_out(path.fullPathName())
+
+	def transforms_to_child_meshes_gen(
+		self, transform_nodes: _h_transform_input_seq, all_descendents=False
+	) -> _t.Generator[_h_mesh_output, _t.Any, None]:
+		for transform in _cleanup_input_gen(transform_nodes):
+			for child_path in self._child_mesh_paths_gen(_dag_path(transform), all_descendents=all_descendents):
+				yield self._mesh_out(child_path.fullPathName())
+
+	def to_meshes(
+		self, items: _h_poly_selection_input_seq, all_transform_descendents=True
+	) -> _t.Tuple[_t.List[_h_mesh_output], list]:
+		seen = set()  # type: _t.Set[_h_mesh_key]
+		meshes = list()  # type: _t.List[_h_mesh_output]
+		error_input = list()
+		for key, item, component, path in self._mesh_key_with_item_gen(items, all_transform_descendents=all_transform_descendents):
+			if key is None:
+				error_input.append(item)
+				continue
+			if key in seen:
+				continue
+			seen.add(key)
+			meshes.append(self._mesh_out(key))
+		return meshes, error_input
+
+	def _key_item_gen(
+		self, items: _h_poly_selection_input_seq, all_transform_descendents=True
+	) -> _t.Generator[_t.Tuple[_t.Optional[_h_mesh_key], _t.Any], _t.Any, None]:
+		for key, item, component, path in self._mesh_key_with_item_gen(items, all_transform_descendents=all_transform_descendents):
+			yield key, item
+
+	def to_selection_list(
+		self, items: _h_poly_selection_input_seq, all_transform_descendents=True
+	) -> _t.Tuple[_om.MSelectionList, list]:
+		"""
+		The same as `group_by_mesh()`, but the result is an ``MSelectionList``:
+		a single entry per mesh, either the mesh itself or all its components merged.
+		"""
+		paths = dict()  # type: _t.Dict[_h_mesh_key, _om.MDagPath]
+		components = dict()  # type: _t.Dict[_h_mesh_key, _t.Optional[_t.List[_om.MObject]]]
+		error_input = list()
+		for key, item, component, path in self._mesh_key_with_item_gen(
+			items, all_transform_descendents=all_transform_descendents
+		):
+			if key is None:
+				error_input.append(item)
+				continue
+			if key not in paths:
+				paths[key] = path
+				components[key] = list()
+			if component is None:
+				components[key] = None  # the whole mesh
+			elif components[key] is not None:
+				components[key].append(component)
+
+		res = _om.MSelectionList()
+		for key, path in paths.items():
+			key_components = components[key]
+			if key_components is None:
+				res.add(path)
+				continue
+			for component in key_components:
+				res.add((path, component), mergeWithExisting=True)
+		return res, error_input
+
+	def to_mesh_paths(
+		self, items: _h_poly_selection_input_seq, all_transform_descendents=True
+	) -> _t.Tuple[_t.List[_om.MDagPath], list]:
+		"""The same as `to_meshes()`, but outputs ``MDagPath``-s."""
+		seen = set()  # type: _t.Set[_h_mesh_key]
+		paths = list()  # type: _t.List[_om.MDagPath]
+		error_input = list()
+		for key, item, component, path in self._mesh_key_with_item_gen(
+			items, all_transform_descendents=all_transform_descendents
+		):
+			if key is None:
+				error_input.append(item)
+				continue
+			if key in seen:
+				continue
+			seen.add(key)
+			paths.append(path)
+		return paths, error_input
+
+	def iter_meshes(
+		self, items: _h_poly_selection_input_seq, all_transform_descendents=True, error_input: _t.Optional[list] = None
+	) -> _t.Generator[_h_mesh_output, _t.Any, None]:
+		"""
+		Streaming version of `to_meshes()`: unique meshes are yielded as soon as they're found.
+
+		:param error_input:
+			A list to collect unsupported items to. If not given, the first such item
+			raises ``ValueError`` right away, without processing the rest of the input.
+		"""
+		for key in _iter_unique_keys(
+			self._key_item_gen(items, all_transform_descendents=all_transform_descendents), error_input=error_input
+		):
+			yield self._mesh_out(key)
+
+	def iter_grouped(
+		self, items: _h_poly_selection_input_seq, all_transform_descendents=True, error_input: _t.Optional[list] = None,
+		merge_repeats=False,
+	) -> _t.Generator[_t.Tuple[_h_mesh_output, _t.List[_t.Any]], _t.Any, None]:
+		"""
+		Generator version of `group_by_mesh()`.
+
+		:param error_input: The same as in `iter_meshes()`.
+		:param merge_repeats: The same as in `darlog_maya.ls_convert.FromToMesh.iter_grouped()`.
+		"""
+		for key, key_items in _iter_key_groups(
+			self._key_item_gen(items, all_transform_descendents=all_transform_descendents),
+			error_input=error_input, merge_repeats=merge_repeats,
+		):
+			mesh_out = self._mesh_out(key)
+			yield mesh_out, [self._item_out(key, x, mesh_out) for x in key_items]
+
+	def group_by_mesh(
+		self, items: _h_poly_selection_input_seq, all_transform_descendents=True, compact=False
+	) -> _t.Tuple[_t.Union[_h_api_grouped_output, _h_api_compact_output], list]:
+		"""
+		:param compact:
+			Instead of a list of items, output `darlog_maya.components.MeshComponents` per mesh:
+			sorted index arrays per component type. Use its ``command_args()`` to pass them to Maya commands.
+		"""
+		if compact:
+			return self._group_by_mesh_compact(items, all_transform_descendents=all_transform_descendents)
+
+		grouped = dict()  # type: _t.Dict[_h_mesh_key, _t.List[_t.AnyStr]]
+		error_input = list()
+		for key, item, component, path in self._mesh_key_with_item_gen(items, all_transform_descendents=all_transform_descendents):
+			if key is None:
+				error_input.append(item)
+				continue
+			if key not in grouped:
+				grouped[key] = list()
+			grouped[key].append(item)
+
+		res = dict()  # type: _h_api_grouped_output
+		for key, key_items in grouped.items():
+			mesh_out = self._mesh_out(key)
+			res[mesh_out] = [self._item_out(key, x, mesh_out) for x in key_items]
+		return res, error_input
+
+	def _group_by_mesh_compact(
+		self, items: _h_poly_selection_input_seq, all_transform_descendents=True
+	) -> _t.Tuple[_h_api_compact_output, list]:
+		grouped = dict()  # type: _t.Dict[_h_mesh_key, _comp.MeshComponents]
+		error_input = list()
+		for key, item, component, path in self._mesh_key_with_item_gen(items, all_transform_descendents=all_transform_descendents):
+			if key is None:
+				error_input.append(item)
+				continue
+			if key not in grouped:
+				grouped[key] = _comp.MeshComponents(key)
+			mesh_components = grouped[key]
+			if component is None:
+				mesh_components.whole = True
+				continue
+			if mesh_components.whole:
+				continue
+			comp_type = _component_types.get(component.apiType())
+			if comp_type is None:
+				error_input.append(item)
+				continue
+			fn = (
+				_om.MFnDoubleIndexedComponent if comp_type == _comp.VERTEX_FACE else _om.MFnSingleIndexedComponent
+			)(component)
+			mesh_components.add(comp_type, fn.getElements())
+
+		res = dict()  # type: _h_api_compact_output
+		for key, mesh_components in grouped.items():
+			if mesh_components.whole:
+				# Components are irrelevant for a whole mesh
+				mesh_components.indices.clear()
+				del mesh_components.vertex_faces[:]
+			mesh_components.normalize()
+			res[self._mesh_out(key)] = mesh_components
+		return res, error_input
+
+	def _only_mesh_of_transform(self, transform_path: _om.MDagPath) -> _t.Optional[_om.MObject]:
+		"""The mesh node if it's the only child of the transform (no other shapes/transforms), or ``None``."""
+		only_mesh = None
+		for child in _child_nodes(transform_path):
+			if child.hasFn(_om.MFn.kTransform):
+				# There are other child transforms
+				return None
+			if self._is_output_mesh(child):
+				if only_mesh is not None:
+					# We aren't the only shape here
+					return None
+				only_mesh = child
+		return only_mesh
+
+	def mesh_to_transform_if_only_one(self, mesh: _h_api_input) -> _t.Union[_h_mesh_output, _t.Any]:
+		"""
+		Convert mesh to it's transform if the given mesh is the only child.
+		"""
+		return self.meshes_to_transforms_if_only_one([mesh])[0]
+
+	def meshes_to_transforms_if_only_one(self, meshes: _t.Iterable[_h_api_input]) -> _t.List[_t.Union[_h_mesh_output, _t.Any]]:
+		"""
+		`mesh_to_transform_if_only_one()` for many meshes at once: children of each transform are inspected only once.
+		"""
+		only_meshes = dict()  # type: _t.Dict[_t.AnyStr, _t.Optional[_om.MObject]]
+		res = list()
+		for mesh in meshes:
+			mesh_path = _dag_path(mesh)
+			transform_path = _om.MDagPath(mesh_path)
+			transform_path.pop()
+			transform = transform_path.fullPathName()
+			if transform not in only_meshes:
+				only_meshes[transform] = self._only_mesh_of_transform(transform_path)
+
+			if only_meshes[transform] != mesh_path.node():
+				res.append(mesh if self.mesh_pynodes and isinstance(mesh, _nt.Mesh) else self._mesh_out(mesh_path.fullPathName()))
+				continue
+			res.append(_pm.PyNode(transform) if self.mesh_pynodes else transform)
+		return res
@@ -0,0 +1,275 @@
+# encoding: utf-8
+"""
+Maya-independent mesh representation as flat arrays, and vectorized kernels working on it.
+
+This module depends only on NumPy (no Maya / PyMel), so everything here
+can be benchmarked or debugged in a plain Python interpreter.
+The Maya-side reader/writer lives in `darlog_maya.mesh_data`.
+"""
+
+from array import array as _array
+from collections import OrderedDict as _OrderedDict
+from dataclasses import dataclass as _dataclass
+import hashlib as _hashlib
+
+import numpy as _np
+
+from darlog_maya.py23 import _range
+
+try:
+	import typing as _t
+except ImportError:
+	pass
+
+
+_t_index = _np.int32
+_t_key = _np.int64
+_t_float = _np.float32
+
+# Enough to vectorize well, small enough to keep float temporaries within a few MB:
+default_chunk_size = 1 << 16
+
+
+@_dataclass
+class MeshArrays:
+	"""
+	Bare-minimum polygon-mesh data required to classify edges, stored as flat NumPy arrays:
+
+		- ``face_counts``: number of vertices in each face. Shape: ``(n_faces, )``.
+		- ``face_vertices``: vertex ID for each face-vertex, face after face. Shape: ``(n_face_vertices, )``.
+		- ``fv_normals``: normal for each face-vertex, in the same order. Shape: ``(n_face_vertices, 3)``.
+		- ``edge_vertices``: pair of vertex IDs for each edge. Shape: ``(n_edges, 2)``.
+		- ``edge_ids``: optional, for a part of a mesh: the actual ID of each edge in the mesh.
+			If omitted, edges are assumed to be the whole mesh, in order.
+
+	It's the same layout which ``MFnMesh.getVertices()`` / ``MFnMesh.getNormalIds()`` return.
+
+	A part of a mesh must contain all the faces around each of its edges,
+	otherwise such edges are treated as border ones.
+	"""
+	face_counts: _np.ndarray
+	face_vertices: _np.ndarray
+	fv_normals: _np.ndarray
+	edge_vertices: _np.ndarray
+	edge_ids: _t.Optional[_np.ndarray] = None
+
+	@property
+	def n_faces(self) -> int:
+		return len(self.face_counts)
+
+	@property
+	def n_face_vertices(self) -> int:
+		return len(self.face_vertices)
+
+	@property
+	def n_edges(self) -> int:
+		return len(self.edge_vertices)
+
+	@property
+	def n_vertices(self) -> int:
+		"""The number of vertices actually referenced by faces/edges (max ID + 1)."""
+		n = 0
+		if len(self.face_vertices):
+			n = int(self.face_vertices.max()) + 1
+		if len(self.edge_vertices):
+			n = max(n, int(self.edge_vertices.max()) + 1)
+		return n
+
+
+def _edge_keys(v_a: _np.ndarray, v_b: _np.ndarray, n_vertices: int) -> _np.ndarray:
+	"""Direction-independent unique integer key for each (v_a, v_b) vertex pair."""
+	lo = _np.minimum(v_a, v_b).astype(_t_key)
+	hi = _np.maximum(v_a, v_b).astype(_t_key)
+	return lo * n_vertices + hi
+
+
+def _half_edge_corners(face_counts: _np.ndarray) -> _t.Tuple[_np.ndarray, _np.ndarray]:
+	"""
+	For each face-vertex ("corner"), find the next corner within the same face.
+
+	Each (corner, next_corner) pair is a half-edge: the edge side which belongs to that face.
+	Returns two arrays of face-vertex indices: start and end corner of each half-edge.
+	"""
+	counts = _np.asarray(face_counts, dtype=_t_index)
+	n_fv = int(counts.sum())
+	corner = _np.arange(n_fv, dtype=_t_index)
+	face_start = _np.repeat(_np.cumsum(counts, dtype=_t_index) - counts, counts)
+	local_i = corner - face_start
+	next_corner = face_start + (local_i + 1) % _np.repeat(counts, counts)
+	return corner, next_corner
+
+
+def _group_firsts_chunk(is_group_start: _np.ndarray, start: int, stop: int, carry: int) -> _np.ndarray:
+	"""
+	For each element in ``[start, stop)`` range, the index of the first element of its group.
+	``carry`` is the first index of the group which continues from the previous chunk.
+	"""
+	res = _np.where(is_group_start[start:stop], _np.arange(start, stop), -1)
+	if len(res) and res[0] < 0:
+		res[0] = carry
+	return _np.maximum.accumulate(res)
+
+
+def hard_edges_mask(
+	mesh: MeshArrays, min_angle_cos: float, chunk_size: int = default_chunk_size, progress=None,
+) -> _np.ndarray:
+	"""
+	Classify all the edges of a mesh as hard/soft in one vectorized pass.
+
+	An edge is hard if, at any of its two vertices, the normals on the faces at both sides
+	of the edge diverge by more than the angle whose cosine is ``min_angle_cos``.
+	Border edges (with a single face) are never hard. For non-manifold edges,
+	each face is compared against the first one.
+
+	Normals are compared in chunks of ``chunk_size`` half-edges, so float temporaries don't grow
+	with the mesh size. The rest of the working memory is a few integers per face-vertex.
+
+	:param progress: Optional `darlog_maya.progress.ProgressReporter` (or anything with the same
+		``start()`` / ``update()`` methods), updated after each chunk.
+
+	Returns a boolean array with ``n_edges`` elements, in the order of ``mesh.edge_vertices``.
+	"""
+	n_edges = mesh.n_edges
+	res = _np.zeros(n_edges, dtype=bool)
+	if not (n_edges and mesh.n_face_vertices):
+		return res
+
+	face_vertices = _np.asarray(mesh.face_vertices, dtype=_t_index)
+	normals = _np.asarray(mesh.fv_normals, dtype=_t_float)
+	n_vertices = mesh.n_vertices
+
+	corner_a, corner_b = _half_edge_corners(mesh.face_counts)
+	v_a = face_vertices[corner_a]
+	v_b = face_vertices[corner_b]
+
+	# Orient each half-edge from lower vertex ID to the higher one,
+	# so both sides of an edge have corners at the same vertices:
+	flip = v_a > v_b
+	corner_lo = _np.where(flip, corner_b, corner_a)
+	corner_hi = _np.where(flip, corner_a, corner_b)
+	del corner_a, corner_b, flip
+
+	keys = _edge_keys(v_a, v_b, n_vertices)
+	del v_a, v_b
+	order = _np.argsort(keys, kind='stable')
+	sorted_keys = keys[order]
+	del keys
+
+	n_half = len(sorted_keys)
+	is_group_start = _np.ones(n_half, dtype=bool)
+	_np.not_equal(sorted_keys[1:], sorted_keys[:-1], out=is_group_start[1:])
+	group_starts = _np.flatnonzero(is_group_start)
+	group_keys = sorted_keys[group_starts]
+	del sorted_keys
+
+	# Compare each half-edge with the first one of the same edge:
+	chunk_size = max(1, int(chunk_size))
+	diverges = _np.zeros(n_half, dtype=bool)
+	group_first = 0
+	if progress is not None:
+		progress.start(n_half)
+	for start in _range(0, n_half, chunk_size):
+		stop = min(start + chunk_size, n_half)
+		firsts = _group_firsts_chunk(is_group_start, start, stop, group_first)
+		group_first = int(firsts[-1])
+		cur = order[start:stop]
+		ref = order[firsts]
+		chunk_diverges = diverges[start:stop]
+		for corner in (corner_lo, corner_hi):
+			n_cur = normals[corner[cur]]
+			n_ref = normals[corner[ref]]
+			dot = _np.einsum('ij,ij->i', n_cur, n_ref)
+			lengths = _np.sqrt(_np.einsum('ij,ij->i', n_cur, n_cur) * _np.einsum('ij,ij->i', n_ref, n_ref))
+			chunk_diverges |= dot < lengths * min_angle_cos
+		if progress is not None:
+			progress.update(stop)
+	del order, corner_lo, corner_hi, is_group_start
+	group_hard = _np.logical_or.reduceat(diverges, group_starts)
+
+	edge_vertices = _np.asarray(mesh.edge_vertices, dtype=_t_index).reshape(-1, 2)
+	edge_keys = _edge_keys(edge_vertices[:, 0], edge_vertices[:, 1], n_vertices)
+	pos = _np.searchsorted(group_keys, edge_keys)
+	pos[pos >= len(group_keys)] = 0
+	found = group_keys[pos] == edge_keys
+	res[found] = group_hard[pos[found]]
+	return res
+
+
+def hard_edge_ids(mesh: MeshArrays, min_angle_cos: float, progress=None) -> _np.ndarray:
+	"""Same as `hard_edges_mask`, but returns IDs of hard edges instead."""
+	hard_i = _np.flatnonzero(hard_edges_mask(mesh, min_angle_cos, progress=progress))
+	if mesh.edge_ids is not None:
+		return _np.asarray(mesh.edge_ids, dtype=_t_index)[hard_i]
+	return hard_i.astype(_t_index)
+
+
+
+def content_hash(mesh: MeshArrays) -> bytes:
+	"""
+	Digest of the mesh topology and normals: meshes with equal hashes have the same hard edges.
+	"""
+	hasher = _hashlib.blake2b(digest_size=20)
+	for arr, dtype in (
+		(mesh.face_counts, _t_index),
+		(mesh.face_vertices, _t_index),
+		(mesh.edge_vertices, _t_index),
+		(mesh.fv_normals, _t_float),
+		(() if mesh.edge_ids is None else mesh.edge_ids, _t_index),
+	):
+		arr = _np.ascontiguousarray(arr, dtype=dtype)
+		hasher.update(str(arr.shape).encode('ascii'))
+		hasher.update(arr.data)
+	return hasher.digest()
+
+
+class HardEdgesCache(object):
+	"""
+	Content-addressed cache of computed hard edges, so duplicated meshes
+	(same topology and normals, anywhere in the scene) are only classified once.
+
+	Least recently used entries are dropped when the cache grows over ``max_entries``.
+	"""
+	def __init__(self, max_entries=256):
+		super(HardEdgesCache, self).__init__()
+		self.max_entries = max_entries
+		self.__entries = _OrderedDict()  # type: _t.Dict[_t.Tuple[bytes, float], _np.ndarray]
+		self.hits = 0
+		self.misses = 0
+
+	def __len__(self):
+		return len(self.__entries)
+
+	def clear(self):
+		self.__entries.clear()
+		self.hits = 0
+		self.misses = 0
+
+	def hard_edge_ids(self, mesh: MeshArrays, min_angle_cos: float, progress=None) -> _t.Tuple[_np.ndarray, bool]:
+		"""
+		Cached `hard_edge_ids`. The second returned value tells whether it was a cache hit.
+		"""
+		key = (content_hash(mesh), float(min_angle_cos))
+		entries = self.__entries
+		res = entries.get(key)
+		if res is not None:
+			entries.move_to_end(key)
+			self.hits += 1
+			return res, True
+
+		self.misses += 1
+		res = hard_edge_ids(mesh, min_angle_cos, progress=progress)
+		res.setflags(write=False)
+		entries[key] = res
+		while len(entries) > self.max_entries:
+			entries.popitem(last=False)
+		return res, False
+
+
+def to_index_array(ids: _np.ndarray) -> _array:
+	"""
+	Convert indices to a compact built-in ``array('i')``: 4 bytes per item, no NumPy required to use it
+	(as opposed to tens of bytes per item in a list of ints, or hundreds of them in a list of PyNodes).
+	"""
+	res = _array('i')
+	res.frombytes(_np.ascontiguousarray(ids, dtype=_np.intc).tobytes())
+	return res
@@ -0,0 +1,416 @@
+# encoding: utf-8
+"""
+Bulk-read/write mesh data through OpenMaya 2.0 as flat NumPy arrays (see `darlog_maya.mesh_arrays`).
+
+Each getter/setter here is a single API call (or a single iterator pass) per mesh,
+as opposed to per-component commands.
+Alternatively, they can work only on a part of a mesh (`ComponentScope`), for the cost
+proportional to that part's size.
+"""
+
+from array import array as _array
+from dataclasses import dataclass as _dataclass
+from itertools import chain as _chain
+
+from maya import cmds as _cmds
+from maya.api import OpenMaya as _om
+import numpy as _np
+
+from darlog_maya import api_undo as _api_undo
+from darlog_maya.api_nodes import _h_mesh_input, dag_path, has_history, mesh_fn
+from darlog_maya.components import VERTEX_FACE as _VERTEX_FACE, component_strings as _component_strings
+from darlog_maya.mesh_arrays import MeshArrays, _t_float, _t_index
+from darlog_maya.py23 import *
+
+try:
+	import typing as _t
+except ImportError:
+	pass
+
+
+def _int_array(values, count: int = -1) -> _np.ndarray:
+	return _np.fromiter(values, dtype=_t_index, count=count)
+
+
+def _vectors_array(vectors) -> _np.ndarray:
+	n = len(vectors)
+	return _np.fromiter(
+		_chain.from_iterable(vectors), dtype=_t_float, count=n * 3
+	).reshape(n, 3)
+
+
+def _index_component(component_type: int, ids: _t.Iterable[int]) -> _om.MObject:
+	fn = _om.MFnSingleIndexedComponent()
+	component = fn.create(component_type)
+	fn.addElements(_om.MIntArray([int(x) for x in ids]))
+	return component
+
+
+def component_ids(components: _t.Sequence[_t.AnyStr]) -> _np.ndarray:
+	"""Sorted unique indices of the given single-indexed component strings (``f[0:99]``, ``e[5]``, etc)."""
+	if not components:
+		return _np.zeros(0, dtype=_t_index)
+	sel = _om.MSelectionList()
+	for comp in components:
+		sel.add(comp)
+	ids = list()
+	for i in _range(sel.length()):
+		path, component = sel.getComponent(i)
+		ids.extend(_om.MFnSingleIndexedComponent(component).getElements())
+	return _np.unique(_np.array(ids, dtype=_t_index))
+
+
+@_dataclass
+class ComponentScope:
+	"""
+	A part of a mesh affected by a component selection:
+
+		- ``vertex_ids``: vertices of the selected components' edges. Their normals get unlocked.
+		- ``edge_ids``: edges to process: all the edges around these vertices (not only the selected ones),
+			since unlocking a vertex changes shading of every edge at it.
+		- ``face_ids``: all the faces around these edges.
+		- ``vertex_face_ids``: all the faces around the vertices (the same as ``face_ids``).
+	"""
+	edge_ids: _np.ndarray
+	face_ids: _np.ndarray
+	vertex_ids: _np.ndarray
+	vertex_face_ids: _np.ndarray
+
+	@classmethod
+	def whole_mesh(cls, fn: _om.MFnMesh) -> 'ComponentScope':
+		faces = _np.arange(fn.numPolygons, dtype=_t_index)
+		return cls(
+			edge_ids=_np.arange(fn.numEdges, dtype=_t_index),
+			face_ids=faces,
+			vertex_ids=_np.arange(fn.numVertices, dtype=_t_index),
+			vertex_face_ids=faces,
+		)
+
+
+def _convert_components(components: _t.Sequence[_t.AnyStr], **kwargs) -> _t.List[_t.AnyStr]:
+	if not components:
+		return list()
+	return _cmds.polyListComponentConversion(components, **kwargs) or list()
+
+
+def component_scope(components: _t.Sequence[_t.AnyStr]) -> ComponentScope:
+	"""
+	Find the scope affected by selected components of a single mesh (any of: faces, edges, vertices,
+	vertex-faces, UVs). All the conversions are done in just a few commands.
+
+	The edges at the boundary of the selection are included, too: they share vertices
+	with the selected ones, so they need to be re-classified once these vertices are unlocked.
+	"""
+	selected_edges = _convert_components(components, toEdge=True)
+	vertices = _convert_components(selected_edges, fromEdge=True, toVertex=True)
+	edges = _convert_components(vertices, fromVertex=True, toEdge=True)
+	face_ids = component_ids(_convert_components(vertices, fromVertex=True, toFace=True))
+	return ComponentScope(
+		edge_ids=component_ids(edges),
+		face_ids=face_ids,
+		vertex_ids=component_ids(vertices),
+		vertex_face_ids=face_ids,
+	)
+
+
+def _polygon_iter(path: _om.MDagPath, face_ids: _np.ndarray) -> _om.MItMeshPolygon:
+	return _om.MItMeshPolygon(path, _index_component(_om.MFn.kMeshPolygonComponent, face_ids))
+
+
+def read_edges(fn: _om.MFnMesh, edge_ids: _np.ndarray = None) -> _t.Tuple[_np.ndarray, _np.ndarray]:
+	"""
+	Vertex pairs (``(n_edges, 2)`` array) and smoothing (boolean array) of all the edges,
+	or of the given ones (sorted unique IDs, in this order), in a single edge-iterator pass.
+	"""
+	path = fn.dagPath()
+	if edge_ids is None:
+		it = _om.MItMeshEdge(path)
+	else:
+		it = _om.MItMeshEdge(path, _index_component(_om.MFn.kMeshEdgeComponent, edge_ids))
+	ids = _array('i')
+	vertices = _array('i')
+	smooth = _array('b')
+	while not it.isDone():
+		ids.append(it.index())
+		vertices.extend((it.vertexId(0), it.vertexId(1)))
+		smooth.append(it.isSmooth)
+		it.next()
+
+	ids = _np.array(ids, dtype=_t_index)
+	vertices = _np.array(vertices, dtype=_t_index).reshape(-1, 2)
+	smooth = _np.array(smooth, dtype=bool)
+	expected_ids = _np.arange(fn.numEdges, dtype=_t_index) if edge_ids is None else edge_ids
+	if not _np.array_equal(ids, expected_ids):
+		# The iterator's order isn't guaranteed for a component:
+		order = _np.searchsorted(expected_ids, ids)
+		vertices[order] = vertices.copy()
+		smooth[order] = smooth.copy()
+	return vertices, smooth
+
+
+def edge_vertices(fn: _om.MFnMesh, edge_ids: _np.ndarray = None) -> _np.ndarray:
+	return read_edges(fn, edge_ids)[0]
+
+
+def _read_scoped_mesh_arrays(path: _om.MDagPath, scope: ComponentScope) -> MeshArrays:
+	face_counts = _array('i')
+	face_vertices = _array('i')
+	fv_normals = _array('f')
+	it = _polygon_iter(path, scope.face_ids)
+	while not it.isDone():
+		face_verts = it.getVertices()
+		face_counts.append(len(face_verts))
+		face_vertices.extend(face_verts)
+		for normal in it.getNormals(_om.MSpace.kObject):
+			fv_normals.extend((normal.x, normal.y, normal.z))
+		it.next()
+
+	return MeshArrays(
+		face_counts=_np.array(face_counts, dtype=_t_index),
+		face_vertices=_np.array(face_vertices, dtype=_t_index),
+		fv_normals=_np.array(fv_normals, dtype=_t_float).reshape(-1, 3),
+		edge_vertices=edge_vertices(_om.MFnMesh(path), scope.edge_ids),
+		edge_ids=_np.array(scope.edge_ids, dtype=_t_index),
+	)
+
+
+def read_mesh_arrays(mesh: _h_mesh_input, scope: ComponentScope = None) -> MeshArrays:
+	"""
+	Read face-vertex normals and face/edge topology of the whole mesh at once,
+	with object-space normals.
+
+	If ``scope`` is given, only its faces/edges are read (with their actual edge IDs kept).
+	"""
+	path = dag_path(mesh)
+	if scope is not None:
+		return _read_scoped_mesh_arrays(path, scope)
+
+	fn = _om.MFnMesh(path)
+	face_counts, face_vertices = fn.getVertices()
+	normals = _vectors_array(fn.getNormals(_om.MSpace.kObject))
+	return MeshArrays(
+		face_counts=_int_array(face_counts, count=len(face_counts)),
+		face_vertices=_int_array(face_vertices, count=len(face_vertices)),
+		fv_normals=normals[_normal_ids(fn)],
+		edge_vertices=edge_vertices(fn),
+	)
+
+
+@_dataclass
+class EdgeNormalsSnapshot:
+	"""
+	Edge smoothing and locked normals of a mesh (or its scope), enough to restore them after `write_hard_edges`.
+	"""
+	edge_ids: _np.ndarray
+	edge_smooth: _np.ndarray
+	vertex_ids: _np.ndarray
+	locked_faces: _np.ndarray
+	locked_vertices: _np.ndarray
+	locked_normals: _np.ndarray
+
+
+def edge_smoothing(fn: _om.MFnMesh, edge_ids: _np.ndarray = None) -> _np.ndarray:
+	"""Boolean array: whether each edge is smooth."""
+	return read_edges(fn, edge_ids)[1]
+
+
+def _normal_ids(fn: _om.MFnMesh) -> _np.ndarray:
+	normal_counts, normal_ids = fn.getNormalIds()
+	return _int_array(normal_ids, count=len(normal_ids))
+
+
+def _locked_by_normal_ids(fn: _om.MFnMesh, normal_ids: _np.ndarray) -> _np.ndarray:
+	"""Fallback: lock state queried once per unique normal."""
+	unique_ids, fv_unique_i = _np.unique(normal_ids, return_inverse=True)
+	is_locked = _np.fromiter(
+		(fn.isNormalLocked(int(i)) for i in unique_ids), dtype=bool, count=len(unique_ids)
+	)
+	return is_locked[fv_unique_i]
+
+
+def _vertex_face_locks(
+	fn: _om.MFnMesh, fv_faces: _np.ndarray, fv_vertices: _np.ndarray, vertex_ids: _np.ndarray = None
+) -> _t.Optional[_np.ndarray]:
+	"""
+	Lock state of the normals at the given face-vertices (all of them around ``vertex_ids``, or the whole mesh),
+	with a single ``polyNormalPerVertex`` query. It returns them vertex after vertex, with faces in ascending order,
+	so they're reordered to match the given face-vertices.
+
+	``None`` if the query doesn't match the face-vertices.
+	"""
+	mesh_path = fn.fullPathName()
+	if vertex_ids is None:
+		components = ['{}.{}[*][*]'.format(mesh_path, _VERTEX_FACE)]
+	else:
+		components = [x + '[*]' for x in _component_strings(mesh_path, _VERTEX_FACE, vertex_ids.tolist())]
+	if not components or not len(fv_faces):
+		return _np.zeros(len(fv_faces), dtype=bool)
+	flags = _cmds.polyNormalPerVertex(components, q=True, freezeNormal=True) or list()
+	if len(flags) != len(fv_faces):
+		return None
+	res = _np.empty(len(fv_faces), dtype=bool)
+	res[_np.lexsort((fv_faces, fv_vertices))] = flags
+	return res
+
+
+def locked_face_vertices(
+	fn: _om.MFnMesh, face_counts: _np.ndarray = None, face_vertices: _np.ndarray = None,
+) -> _np.ndarray:
+	"""Boolean array: whether the normal is locked, for each face-vertex."""
+	if face_counts is None or face_vertices is None:
+		face_counts, face_vertices = fn.getVertices()
+		face_counts = _int_array(face_counts, count=len(face_counts))
+		face_vertices = _int_array(face_vertices, count=len(face_vertices))
+	fv_faces = _np.repeat(_np.arange(len(face_counts), dtype=_t_index), face_counts)
+	res = _vertex_face_locks(fn, fv_faces, face_vertices)
+	if res is None:
+		res = _locked_by_normal_ids(fn, _normal_ids(fn))
+	return res
+
+
+def _locked_normals_scoped(
+	path: _om.MDagPath, scope: ComponentScope
+) -> _t.Tuple[_np.ndarray, _np.ndarray, _np.ndarray]:
+	"""Faces, vertices and normals of locked face-vertices at the scope's vertices."""
+	fn = _om.MFnMesh(path)
+	scope_vertices = set(int(x) for x in scope.vertex_ids)
+	faces = _array('i')
+	vertices = _array('i')
+	normal_ids = _array('i')
+	normals = _array('f')
+	it = _polygon_iter(path, scope.vertex_face_ids)
+	while not it.isDone():
+		face_id = it.index()
+		face_normal_ids = fn.getFaceNormalIds(face_id)
+		face_normals = it.getNormals(_om.MSpace.kObject)
+		for local_i, vertex_id in enumerate(it.getVertices()):
+			if vertex_id not in scope_vertices:
+				continue
+			normal = face_normals[local_i]
+			faces.append(face_id)
+			vertices.append(vertex_id)
+			normal_ids.append(face_normal_ids[local_i])
+			normals.extend((normal.x, normal.y, normal.z))
+		it.next()
+
+	faces = _np.array(faces, dtype=_t_index)
+	vertices = _np.array(vertices, dtype=_t_index)
+	is_locked = _vertex_face_locks(fn, faces, vertices, scope.vertex_ids)
+	if is_locked is None:
+		is_locked = _locked_by_normal_ids(fn, _np.array(normal_ids, dtype=_t_index))
+	return (
+		faces[is_locked],
+		vertices[is_locked],
+		_np.array(normals, dtype=_t_float).reshape(-1, 3)[is_locked],
+	)
+
+
+def snapshot_edge_normals(mesh: _h_mesh_input, scope: ComponentScope = None) -> EdgeNormalsSnapshot:
+	path = dag_path(mesh)
+	fn = _om.MFnMesh(path)
+	if scope is not None:
+		locked_faces, locked_vertices, locked_normals = _locked_normals_scoped(path, scope)
+		return EdgeNormalsSnapshot(
+			edge_ids=scope.edge_ids,
+			edge_smooth=edge_smoothing(fn, scope.edge_ids),
+			vertex_ids=scope.vertex_ids,
+			locked_faces=locked_faces,
+			locked_vertices=locked_vertices,
+			locked_normals=locked_normals,
+		)
+
+	face_counts, face_vertices = fn.getVertices()
+	face_counts = _int_array(face_counts, count=len(face_counts))
+	face_vertices = _int_array(face_vertices, count=len(face_vertices))
+	fv_faces = _np.repeat(_np.arange(len(face_counts), dtype=_t_index), face_counts)
+	is_locked = locked_face_vertices(fn, face_counts, face_vertices)
+
+	locked_normals = _np.zeros((0, 3), dtype=_t_float)
+	if is_locked.any():
+		normals = _vectors_array(fn.getNormals(_om.MSpace.kObject))
+		locked_normals = normals[_normal_ids(fn)[is_locked]]
+
+	return EdgeNormalsSnapshot(
+		edge_ids=_np.arange(fn.numEdges, dtype=_t_index),
+		edge_smooth=edge_smoothing(fn),
+		vertex_ids=_np.arange(fn.numVertices, dtype=_t_index),
+		locked_faces=fv_faces[is_locked],
+		locked_vertices=face_vertices[is_locked],
+		locked_normals=locked_normals,
+	)
+
+
+def _set_edge_smoothing(fn: _om.MFnMesh, edge_ids: _np.ndarray, edge_smooth: _np.ndarray, vertex_ids: _np.ndarray):
+	fn.unlockVertexNormals(_om.MIntArray(vertex_ids.tolist()))
+	fn.setEdgeSmoothings(_om.MIntArray(edge_ids.tolist()), edge_smooth.tolist())
+	fn.cleanupEdgeSmoothing()
+
+
+def restore_edge_normals(fn: _om.MFnMesh, snapshot: EdgeNormalsSnapshot):
+	_set_edge_smoothing(fn, snapshot.edge_ids, snapshot.edge_smooth, snapshot.vertex_ids)
+	if len(snapshot.locked_faces):
+		# Setting per-face-vertex normals locks them back:
+		fn.setFaceVertexNormals(
+			_om.MVectorArray([_om.MVector(*(float(x) for x in n)) for n in snapshot.locked_normals]),
+			_om.MIntArray(snapshot.locked_faces.tolist()),
+			_om.MIntArray(snapshot.locked_vertices.tolist()),
+			_om.MSpace.kObject,
+		)
+	fn.updateSurface()
+
+
+def write_hard_edges(fn: _om.MFnMesh, hard_edge_ids: _t.Optional[_np.ndarray], scope: ComponentScope = None):
+	"""
+	Unlock normals and set edge smoothing straight in the mesh data:
+	the given edges become hard, all the others - soft.
+	With ``None`` instead of hard edges, the current edge smoothing is kept: normals are only unlocked.
+
+	If ``scope`` is given, only its edges/vertices are affected.
+	No construction history is created, and selection is left intact.
+	"""
+	if scope is None:
+		scope = ComponentScope.whole_mesh(fn)
+	if hard_edge_ids is None:
+		fn.unlockVertexNormals(_om.MIntArray(scope.vertex_ids.tolist()))
+	else:
+		edge_smooth = ~_np.isin(scope.edge_ids, hard_edge_ids)
+		_set_edge_smoothing(fn, scope.edge_ids, edge_smooth, scope.vertex_ids)
+	fn.updateSurface()
+
+
+def apply_hard_edges(
+	mesh: _h_mesh_input, hard_edge_ids: _t.Optional[_t.Iterable[int]], scope: ComponentScope = None, undoable=True
+):
+	"""
+	Perform `write_hard_edges` on a history-free mesh as a single bulk edit.
+
+	If ``undoable``, the previous state is captured beforehand, and the whole edit
+	is registered as a single undo-queue entry.
+	"""
+	path = dag_path(mesh)
+	if hard_edge_ids is not None:
+		hard_edge_ids = _np.array(hard_edge_ids, dtype=_t_index)
+	before = snapshot_edge_normals(path, scope) if undoable else None
+
+	def redo():
+		write_hard_edges(_om.MFnMesh(path), hard_edge_ids, scope)
+
+	def undo():
+		restore_edge_normals(_om.MFnMesh(path), before)
+
+	redo()
+	if undoable:
+		_api_undo.commit(undo, redo)
+
+
+def current_hard_edge_ids(mesh: _h_mesh_input, scope: ComponentScope = None) -> _np.ndarray:
+	"""IDs of the edges which are currently hard."""
+	if scope is None:
+		return _np.flatnonzero(~edge_smoothing(mesh_fn(mesh))).astype(_t_index)
+	return scope.edge_ids[~edge_smoothing(mesh_fn(mesh), scope.edge_ids)]
+
+
+def n_locked_face_vertices(mesh: _h_mesh_input, scope: ComponentScope = None) -> int:
+	if scope is None:
+		return int(locked_face_vertices(mesh_fn(mesh)).sum())
+	return len(_locked_normals_scoped(dag_path(mesh), scope)[0])
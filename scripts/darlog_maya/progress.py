@@ -0,0 +1,195 @@
+# encoding: utf-8
+"""
+Throttled, interruptible progress reporting for long-running tools.
+
+Updating any UI control per processed item (vertex, edge, mesh) might cost as much
+as the actual work. So a reporter takes updates as often as the caller wishes,
+but only passes them to its backend (UI / console) when both enough time passed
+and progress advanced enough since the last redraw.
+
+Cancellation is cooperative: a reporter polls its backend for the user's interrupt
+request at the same (throttled) moments, and then `update()` raises `Cancelled`.
+
+The base reporter doesn't depend on Maya, so it can be used headless.
+"""
+
+import sys as _sys
+from time import perf_counter as _clock
+
+from darlog_maya.py23 import *
+
+try:
+	import typing as _t
+except ImportError:
+	pass
+
+
+class Cancelled(Exception):
+	"""Raised from within a progress update when the operation was interrupted."""
+	pass
+
+
+class ProgressReporter(object):
+	"""
+	The base class, which doesn't display anything (works as a no-op backend on its own).
+
+	Subclasses only need to override the ``_draw()`` / ``_poll_cancelled()`` / ``_close()`` hooks.
+
+	:param min_interval: The minimum time (in seconds) between two redraws.
+	:param min_step_fraction: The minimum part of the whole range the progress has to advance by before redraw.
+	"""
+	def __init__(self, min_interval=0.1, min_step_fraction=0.01):
+		super(ProgressReporter, self).__init__()
+		self.min_interval = min_interval  # type: float
+		self.min_step_fraction = min_step_fraction  # type: float
+		self.label = ''
+		self.value = 0
+		self.maximum = 1
+		self.__cancelled = False
+		self.__step = 1
+		self.__next_value = 0
+		self.__next_time = 0.0
+		self.n_updates = 0
+		self.n_draws = 0
+
+	def start(self, maximum, label=None):  # type: (int, _t.Optional[_t.AnyStr]) -> None
+		"""Begin a new stage: reset the value and set its range."""
+		if label is not None:
+			self.label = label
+		self.maximum = max(1, int(maximum))
+		self.value = 0
+		self.__step = max(1, int(self.maximum * self.min_step_fraction))
+		self.__redraw(_clock())
+
+	def set_label(self, label):  # type: (_t.AnyStr) -> None
+		self.label = label
+		self.__redraw(_clock())
+
+	def update(self, value):  # type: (int) -> None
+		"""
+		Set the current progress. Very cheap if there's no need to redraw yet.
+
+		:raises Cancelled: if the operation was interrupted.
+		"""
+		self.value = value
+		self.n_updates += 1
+		if self.__cancelled:
+			self.check_cancelled()
+		if value < self.__next_value and value < self.maximum:
+			return
+		now = _clock()
+		if now < self.__next_time and value < self.maximum:
+			return
+		self.__redraw(now)
+
+	def step(self, n=1):  # type: (int) -> None
+		self.update(self.value + n)
+
+	def finish(self):
+		"""Force-draw the current stage as complete."""
+		self.value = self.maximum
+		self.__redraw(_clock())
+
+	def __redraw(self, now):  # type: (float) -> None
+		self.n_draws += 1
+		self._draw(self.label, min(max(0, self.value), self.maximum), self.maximum)
+		self.__next_value = self.value + self.__step
+		self.__next_time = now + self.min_interval
+		if not self.__cancelled and self._poll_cancelled():
+			self.__cancelled = True
+		self.check_cancelled()
+
+	def cancel(self):
+		"""Request cancellation from code. The next update raises `Cancelled`."""
+		self.__cancelled = True
+
+	@property
+	def cancelled(self):  # type: () -> bool
+		return self.__cancelled
+
+	def check_cancelled(self):
+		if self.__cancelled:
+			raise Cancelled("{}: cancelled at {}/{}".format(self.label or 'Operation', self.value, self.maximum))
+
+	def close(self):
+		self._close()
+
+	def __enter__(self):
+		return self
+
+	def __exit__(self, exc_type, exc_val, exc_tb):
+		self.close()
+
+	# Backend hooks:
+
+	def _draw(self, label, value, maximum):  # type: (_t.AnyStr, int, int) -> None
+		pass
+
+	def _poll_cancelled(self):  # type: () -> bool
+		return False
+
+	def _close(self):
+		pass
+
+
+NullProgress = ProgressReporter
+
+
+class ConsoleProgress(ProgressReporter):
+	"""Prints progress as text lines, for headless (batch / mayapy) runs."""
+	def __init__(self, min_interval=1.0, min_step_fraction=0.05, stream=None):
+		super(ConsoleProgress, self).__init__(min_interval=min_interval, min_step_fraction=min_step_fraction)
+		self.stream = stream
+
+	def _draw(self, label, value, maximum):
+		stream = _sys.stdout if self.stream is None else self.stream
+		stream.write("{}{}% ({}/{})\n".format(
+			'{}: '.format(label) if label else '',
+			int(100 * value / maximum), value, maximum
+		))
+
+
+class MayaProgressBar(ProgressReporter):
+	"""
+	Displays progress in a Maya ``progressBar`` control. By default, it's the main one (in help line),
+	which lets the user cancel the operation with Esc.
+
+	:param progress_bar:
+		Name of an existing ``progressBar`` control.
+		If it's created with ``isInterruptable=True``, it's polled for cancellation.
+	"""
+	def __init__(self, progress_bar=None, min_interval=0.1, min_step_fraction=0.01):  # type: (_t.AnyStr, float, float) -> None
+		from maya import cmds, mel
+		self.__cmds = cmds
+		self.__is_main = not progress_bar
+		if self.__is_main:
+			progress_bar = mel.eval('$tmp = $gMainProgressBar')
+		self.progress_bar = _unicode(progress_bar)
+		self.__begun = False
+		super(MayaProgressBar, self).__init__(min_interval=min_interval, min_step_fraction=min_step_fraction)
+
+	def _draw(self, label, value, maximum):
+		bar = self.progress_bar
+		if self.__is_main and not self.__begun:
+			self.__cmds.progressBar(bar, e=True, beginProgress=True, isInterruptable=True)
+			self.__begun = True
+		self.__cmds.progressBar(bar, e=True, maxValue=maximum, progress=value, status=label)
+
+	def _poll_cancelled(self):
+		return bool(self.__cmds.progressBar(self.progress_bar, q=True, isCancelled=True))
+
+	def _close(self):
+		if self.__begun:
+			self.__cmds.progressBar(self.progress_bar, e=True, endProgress=True)
+			self.__begun = False
+
+
+def for_current_session(min_interval=None):  # type: (_t.Optional[float]) -> ProgressReporter
+	"""Main progress bar in interactive Maya, console output in batch mode (or outside of Maya)."""
+	kwargs = dict() if min_interval is None else dict(min_interval=min_interval)
+	try:
+		from maya import cmds
+		is_batch = cmds.about(batch=True)
+	except Exception:
+		is_batch = True
+	return ConsoleProgress(**kwargs) if is_batch else MayaProgressBar(**kwargs)
@@ -0,0 +1,248 @@
+# encoding: utf-8
+"""
+Cooperative scheduler running long tools in small steps, without freezing Maya UI.
+
+A job is a generator: it does a portion of work (one mesh, one chunk of components)
+between two ``yield`` statements. The scheduler resumes jobs from a deferred callback
+(``evalDeferred(lowestPriority=True)`` - i.e., when Maya is idle), and keeps doing so
+within a time budget per tick. Then it hands control back to Maya, so the viewport
+stays interactive between ticks.
+
+Each tick of a job might be wrapped into its own undo chunk: a chunk can't be left open
+between ticks, since the user may do anything in the scene meanwhile.
+
+In batch mode (or outside of Maya), there's no idle loop, so jobs are run to completion right away.
+"""
+
+import sys as _sys
+import traceback as _traceback
+from time import perf_counter as _clock
+
+from darlog_maya import progress as _progress
+from darlog_maya.py23 import *
+
+try:
+	import typing as _t
+except ImportError:
+	pass
+
+
+_h_steps = _t.Iterator[_t.Any]
+_h_callback = _t.Callable[['Job'], _t.Any]
+
+STATUS_PENDING = 'pending'
+STATUS_RUNNING = 'running'
+STATUS_DONE = 'done'
+STATUS_CANCELLED = 'cancelled'
+STATUS_FAILED = 'failed'
+
+
+class Job(object):
+	"""
+	A single scheduled task.
+
+	:param steps: A generator (or any iterator) doing the work step by step. Its return value becomes `result`.
+	:param name: Shown in messages. Also used as undo-chunk name if ``undo_chunk`` is enabled.
+	:param undo_chunk: Wrap each tick of this job into an undo chunk.
+	:param progress:
+		The reporter used by the job itself. If it gets cancelled (e.g., with Esc in the main progress bar),
+		the job is cancelled, too. The scheduler closes it when the job ends.
+	:param on_done: Called with the job when it's finished successfully.
+	:param on_cancel: Called with the job when it's cancelled.
+	:param on_error: Called with the job when a step raised an exception (stored as `error`).
+		By default, the traceback is printed.
+
+	An exception raised by any of these callbacks is printed, too: it doesn't affect the job's status
+	or stop the scheduler.
+	"""
+	def __init__(
+		self, steps,  # type: _h_steps
+		name='',  # type: _t.AnyStr
+		undo_chunk=True,
+		progress=None,  # type: _t.Optional[_progress.ProgressReporter]
+		on_done=None,  # type: _t.Optional[_h_callback]
+		on_cancel=None,  # type: _t.Optional[_h_callback]
+		on_error=None,  # type: _t.Optional[_h_callback]
+	):
+		super(Job, self).__init__()
+		self.steps = iter(steps)
+		self.name = name
+		self.undo_chunk = undo_chunk
+		self.progress = progress
+		self.on_done = on_done
+		self.on_cancel = on_cancel
+		self.on_error = on_error
+		self.status = STATUS_PENDING
+		self.result = None  # type: _t.Any
+		self.error = None  # type: _t.Optional[BaseException]
+		self.n_steps = 0
+		self.n_ticks = 0
+		self.seconds = 0.0  # the actual time spent in steps
+		self.__cancel_requested = False
+
+	def __repr__(self):
+		return '<{} {} ({}, {} steps)>'.format(self.__class__.__name__, repr(self.name), self.status, self.n_steps)
+
+	@property
+	def is_finished(self):  # type: () -> bool
+		return self.status in (STATUS_DONE, STATUS_CANCELLED, STATUS_FAILED)
+
+	def cancel(self):
+		"""Request cancellation. The job stops before its next step."""
+		self.__cancel_requested = True
+
+	@property
+	def cancel_requested(self):  # type: () -> bool
+		return self.__cancel_requested or (self.progress is not None and self.progress.cancelled)
+
+	def _run_steps(self, deadline):  # type: (float) -> bool
+		"""Perform steps until the deadline. Returns whether the job is finished."""
+		self.status = STATUS_RUNNING
+		self.n_ticks += 1
+		start = _clock()
+		try:
+			while True:
+				if self.cancel_requested:
+					self.__finish(STATUS_CANCELLED)
+					return True
+				try:
+					next(self.steps)
+				except StopIteration as e:
+					self.result = getattr(e, 'value', None)
+					self.__finish(STATUS_DONE)
+					return True
+				self.n_steps += 1
+				if _clock() >= deadline:
+					return False
+		except _progress.Cancelled:
+			self.__finish(STATUS_CANCELLED)
+			return True
+		except Exception as e:
+			self.error = e
+			self.__finish(STATUS_FAILED)
+			return True
+		finally:
+			self.seconds += _clock() - start
+
+	def __finish(self, status):  # type: (str) -> None
+		self.status = status
+		if status == STATUS_CANCELLED:
+			close_f = getattr(self.steps, 'close', None)
+			if close_f is not None:
+				close_f()  # let the generator's own `finally` blocks run
+		if self.progress is not None:
+			self.progress.close()
+
+		callback = {
+			STATUS_DONE: self.on_done,
+			STATUS_CANCELLED: self.on_cancel,
+			STATUS_FAILED: self.on_error,
+		}[status]
+		if callback is not None:
+			try:
+				callback(self)
+			except Exception as e:
+				# The job itself is finished anyway: just report it, so the scheduler keeps going.
+				_report_exception("Job {} {} callback failed".format(repr(self.name), status), e)
+		elif status == STATUS_FAILED:
+			_report_exception("Job {} failed".format(repr(self.name)), self.error)
+
+
+def _report_exception(message, error):  # type: (str, BaseException) -> None
+	_sys.stderr.write("{}:\n{}".format(
+		message, ''.join(_traceback.format_exception(type(error), error, error.__traceback__))
+	))
+
+
+class Scheduler(object):
+	"""
+	Runs submitted jobs round-robin, in ticks.
+
+	:param budget: Time (in seconds) the scheduler may take per tick, for all the jobs together.
+		Each job performs at least one step per tick, though.
+	:param blocking: Run jobs to completion right away, instead of deferring them.
+		By default, it's enabled in batch mode and outside of Maya.
+	"""
+	def __init__(self, budget=0.05, blocking=None):  # type: (float, _t.Optional[bool]) -> None
+		super(Scheduler, self).__init__()
+		self.budget = budget
+		if blocking is None:
+			blocking = _is_batch()
+		self.blocking = blocking  # type: bool
+		self.jobs = list()  # type: _t.List[Job]
+		self.n_ticks = 0
+		self.__is_tick_scheduled = False
+
+	def submit(self, job):  # type: (Job) -> Job
+		self.jobs.append(job)
+		if self.blocking:
+			self.run_until_complete()
+		else:
+			self.__schedule_tick()
+		return job
+
+	def cancel(self, job):  # type: (Job) -> None
+		job.cancel()
+
+	def cancel_all(self):
+		for job in self.jobs:
+			job.cancel()
+
+	@property
+	def is_idle(self):  # type: () -> bool
+		return not self.jobs
+
+	def tick(self):
+		"""Give each job a fair share of the budget. Normally, called by the deferred callback."""
+		self.__is_tick_scheduled = False
+		if not self.jobs:
+			return
+		self.n_ticks += 1
+		tick_deadline = _clock() + self.budget
+		for job in list(self.jobs):
+			job_deadline = min(tick_deadline, _clock() + self.budget / max(1, len(self.jobs)))
+			if job.undo_chunk:
+				from darlog_maya.undo import undoable_context
+				with undoable_context(job.name or None):
+					is_finished = job._run_steps(job_deadline)
+			else:
+				is_finished = job._run_steps(job_deadline)
+			if is_finished:
+				self.jobs.remove(job)
+		if self.jobs and not self.blocking:
+			self.__schedule_tick()
+
+	def run_until_complete(self):
+		while self.jobs:
+			self.tick()
+
+	def __schedule_tick(self):
+		if self.__is_tick_scheduled:
+			return
+		from maya import cmds
+		cmds.evalDeferred(self.tick, lowestPriority=True)
+		self.__is_tick_scheduled = True
+
+
+def _is_batch():  # type: () -> bool
+	try:
+		from maya import cmds
+		return bool(cmds.about(batch=True))
+	except Exception:
+		return True
+
+
+_default_scheduler = None  # type: _t.Optional[Scheduler]
+
+
+def default_scheduler():  # type: () -> Scheduler
+	"""The session-wide scheduler shared by all the tools."""
+	global _default_scheduler
+	if _default_scheduler is None:
+		_default_scheduler = Scheduler()
+	return _default_scheduler
+
+
+def submit(steps, name='', **job_kwargs):  # type: (_h_steps, _t.AnyStr, ...) -> Job
+	"""Schedule a step-generator as a job in the default scheduler. See `Job` for the arguments."""
+	return default_scheduler().submit(Job(steps, name=name, **job_kwargs))
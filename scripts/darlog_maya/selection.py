@@ -0,0 +1,171 @@
+# encoding: utf-8
+"""
+Save/restore the active selection with a single API call each way.
+
+Selected UVs are the tricky part: UV IDs are per UV-set, so they might change (or mean
+something else) after UV-sets are edited. Thus, they're stored as face-vertices instead:
+per mesh, as a compact array of ``(face, face-relative vertex)`` index pairs - and converted back
+to the UVs of the then-current UV-set on restore. Both ways, only the faces of the selected UVs are visited
+(on capture, they're found with a single component conversion for the whole selection).
+"""
+
+from array import array as _array
+
+from maya import cmds as _cmds
+from maya.api import OpenMaya as _om
+
+from darlog_maya.py23 import *
+
+try:
+	import typing as _t
+except ImportError:
+	pass
+
+
+# Selection entries:
+_KIND_DAG = 0  # (path, component or null object)
+_KIND_UV = 1  # (path, flat face / face-relative vertex pairs)
+_KIND_OTHER = 2  # (selection strings, None): non-DAG nodes, plugs, etc.
+
+
+def _shape_path(path: _om.MDagPath) -> _om.MDagPath:
+	"""The path to the mesh itself, even if a component is given on its transform."""
+	if path.node().hasFn(_om.MFn.kTransform):
+		shape_path = _om.MDagPath(path)
+		try:
+			shape_path.extendToShape()
+		except RuntimeError:
+			return path  # more than one shape: can't be a component's owner anyway
+		return shape_path
+	return path
+
+
+def _uv_face_vertices(
+	uv_entries: _t.Sequence[_t.Tuple[_om.MDagPath, _t.Iterable[int]]], uv_components: _t.Sequence[_t.AnyStr]
+) -> _t.List[_array]:
+	"""
+	For each ``(mesh path, UV IDs)`` entry: face-vertices (as flat ``face, face-relative vertex`` pairs)
+	using any of these UVs of the current set.
+
+	Only the faces of the given UVs are visited. They're found with a single component conversion
+	of ``uv_components``: all the selected UVs, on all the meshes at once.
+	"""
+	res = [_array('i') for _ in uv_entries]
+	by_mesh = dict()  # type: _t.Dict[_t.AnyStr, _t.List[_t.Tuple[int, _t.Set[int]]]]
+	for i, (path, uv_ids) in enumerate(uv_entries):
+		by_mesh.setdefault(_shape_path(path).fullPathName(), list()).append((i, set(uv_ids)))
+	if not by_mesh:
+		return res
+
+	faces = _om.MSelectionList()
+	for face_comp in _cmds.polyListComponentConversion(uv_components, fromUV=True, toFace=True) or list():
+		faces.add(face_comp)
+	for i in _range(faces.length()):
+		path, comp = faces.getComponent(i)
+		mesh_entries = by_mesh.get(_shape_path(path).fullPathName())
+		if not mesh_entries:
+			continue
+		it = _om.MItMeshPolygon(path, comp)
+		while not it.isDone():
+			if it.hasUVs():
+				face = it.index()
+				for j in _range(it.polygonVertexCount()):
+					uv_id = it.getUVIndex(j)
+					for entry_i, uv_ids in mesh_entries:
+						if uv_id in uv_ids:
+							res[entry_i].extend((face, j))
+			it.next()
+	return res
+
+
+def _face_vertex_uvs(path: _om.MDagPath, face_vertices: _array) -> _om.MObject:
+	"""UV component (of the current set) for the given face-vertices. Only their faces are visited."""
+	n_faces = _om.MFnMesh(path).numPolygons
+	face_relative = dict()  # type: _t.Dict[int, _t.List[int]]
+	for face, j in _zip(face_vertices[0::2], face_vertices[1::2]):
+		if face < n_faces:
+			face_relative.setdefault(face, list()).append(j)
+
+	uv_ids = set()
+	if face_relative:
+		# An empty component would make the iterator visit all the faces
+		faces_fn = _om.MFnSingleIndexedComponent()
+		faces = faces_fn.create(_om.MFn.kMeshPolygonComponent)
+		faces_fn.addElements(sorted(face_relative.keys()))
+		it = _om.MItMeshPolygon(path, faces)
+		while not it.isDone():
+			if it.hasUVs():
+				count = it.polygonVertexCount()
+				for j in face_relative[it.index()]:
+					if j < count:
+						uv_ids.add(it.getUVIndex(j))
+			it.next()
+
+	comp_fn = _om.MFnSingleIndexedComponent()
+	comp = comp_fn.create(_om.MFn.kMeshMapComponent)
+	comp_fn.addElements(sorted(uv_ids))
+	return comp
+
+
+class SelectionSnapshot(object):
+	"""
+	The active selection, captured with a single `MGlobal.getActiveSelectionList()`
+	and restored with a single `MGlobal.setActiveSelectionList()`, in the original order.
+	"""
+	def __init__(self, selection: _om.MSelectionList = None):
+		super(SelectionSnapshot, self).__init__()
+		self.__entries = list()  # type: _t.List[_t.Tuple[int, _t.Any, _t.Any]]
+		if selection is None:
+			selection = _om.MGlobal.getActiveSelectionList()
+		self.__capture(selection)
+
+	@classmethod
+	def capture(cls) -> 'SelectionSnapshot':
+		return cls()
+
+	def __len__(self):
+		return len(self.__entries)
+
+	def __capture(self, selection: _om.MSelectionList):
+		uv_entries = list()  # type: _t.List[_t.Tuple[_om.MDagPath, _t.List[int]]]
+		uv_entry_indices = list()  # type: _t.List[int]
+		uv_components = list()  # type: _t.List[_t.AnyStr]
+		for i in _range(selection.length()):
+			try:
+				path, comp = selection.getComponent(i)
+			except (RuntimeError, TypeError):
+				# Not a DAG item
+				self.__entries.append((_KIND_OTHER, selection.getSelectionStrings(i), None))
+				continue
+
+			if not comp.isNull() and comp.apiType() == _om.MFn.kMeshMapComponent:
+				# Filled in below, for all the UV entries at once:
+				uv_entries.append((path, _om.MFnSingleIndexedComponent(comp).getElements()))
+				uv_entry_indices.append(len(self.__entries))
+				uv_components.extend(selection.getSelectionStrings(i))
+				self.__entries.append((_KIND_UV, path, None))
+				continue
+
+			self.__entries.append((_KIND_DAG, path, comp))
+
+		for entry_i, face_vertices in _zip(uv_entry_indices, _uv_face_vertices(uv_entries, uv_components)):
+			kind, path, _ = self.__entries[entry_i]
+			self.__entries[entry_i] = (kind, path, face_vertices)
+
+	def restore(self):
+		"""Make the captured items selected again (the ones which no longer exist are skipped)."""
+		selection = _om.MSelectionList()
+		for kind, item, data in self.__entries:
+			try:
+				if kind == _KIND_OTHER:
+					for name in item:
+						selection.add(name)
+				elif kind == _KIND_UV:
+					selection.add((item, _face_vertex_uvs(item, data)), mergeWithExisting=True)
+				elif data.isNull():
+					selection.add(item, mergeWithExisting=True)
+				else:
+					selection.add((item, data), mergeWithExisting=True)
+			except RuntimeError:
+				continue  # deleted meanwhile
+		_om.MGlobal.setActiveSelectionList(selection)
@@ -4,9 +4,13 @@
 
 import re as _re
 
+from maya.api import OpenMaya as _om
 from pymel import core as _pm
 from pymel.core import nodetypes as _nt
 
+from darlog_maya import api_undo as _api_undo
+from darlog_maya.api_nodes import dag_path as _dag_path, has_history as _has_history
+from darlog_maya.progress import NullProgress as _NullProgress, ProgressReporter as _ProgressReporter
 from darlog_maya.py23 import _t_str
 
 try:
@@ -90,28 +94,92 @@ def default_set_name(index: int):
 	return 'uvSet{}'.format(index)
 
 
-def mesh_uv_sets(mesh: _nt.Mesh) -> _t.List[_t.AnyStr]:
+class UVSetSnapshot(object):
+	"""
+	UV-set names and the current set of many meshes, each queried only once per operation
+	(instead of once per each check / name getter).
+
+	Meshes which weren't captured beforehand are captured on the first access.
+	The snapshot doesn't track the scene: it has to be explicitly refreshed after UV-sets are changed.
+	"""
+	def __init__(self, meshes: _t.Iterable[_nt.Mesh] = None):
+		super(UVSetSnapshot, self).__init__()
+		self.__names = dict()  # type: _t.Dict[_nt.Mesh, _t.List[_t.AnyStr]]
+		self.__current = dict()  # type: _t.Dict[_nt.Mesh, _t.Optional[_t.AnyStr]]
+		if meshes is not None:
+			self.refresh(meshes)
+
+	def __capture(self, mesh: _nt.Mesh):
+		self.__names[mesh] = list(mesh.getUVSetNames())
+		try:
+			self.__current[mesh] = mesh.getCurrentUVSetName()
+		except Exception:
+			self.__current[mesh] = None
+
+	def refresh(self, meshes: _t.Iterable[_nt.Mesh] = None):
+		"""Re-query the given meshes (all the already captured ones by default)."""
+		if meshes is None:
+			meshes = list(self.__names.keys())
+		for mesh in meshes:
+			self.__capture(mesh)
+
+	def __contains__(self, mesh: _nt.Mesh):
+		return mesh in self.__names
+
+	def __len__(self):
+		return len(self.__names)
+
+	def uv_sets(self, mesh: _nt.Mesh) -> _t.List[_t.AnyStr]:
+		if mesh not in self.__names:
+			self.__capture(mesh)
+		return self.__names[mesh]
+
+	def current(self, mesh: _nt.Mesh) -> _t.Optional[_t.AnyStr]:
+		if mesh not in self.__current:
+			self.__capture(mesh)
+		return self.__current[mesh]
+
+	def count(self, mesh: _nt.Mesh) -> int:
+		return len(self.uv_sets(mesh))
+
+	def expect_created(self, mesh: _nt.Mesh, uv_set: _t.AnyStr):
+		"""Record a UV-set which isn't created yet, but is going to be (when planning multiple edits in advance)."""
+		uv_sets = self.uv_sets(mesh)
+		if uv_set not in uv_sets:
+			self.__names[mesh] = uv_sets + [uv_set]
+
+
+def mesh_uv_sets(mesh: _nt.Mesh, snapshot: _t.Optional[UVSetSnapshot] = None) -> _t.List[_t.AnyStr]:
+	if snapshot is not None:
+		return snapshot.uv_sets(mesh)
 	return mesh.getUVSetNames()
 
 
-def mesh_uv_set_by_index(mesh: _nt.Mesh, uv_set: int, error_uv_set_label='') -> _t.AnyStr:
-	all_uv_sets = mesh_uv_sets(mesh)
+def mesh_uv_set_by_index(
+	mesh: _nt.Mesh, uv_set: int, error_uv_set_label='', snapshot: _t.Optional[UVSetSnapshot] = None
+) -> _t.AnyStr:
+	all_uv_sets = mesh_uv_sets(mesh, snapshot)
 	try:
 		return all_uv_sets[uv_set]
 	except IndexError:
 		raise InvalidUVSet.set_does_not_exist([mesh], uv_set, uv_set_label=error_uv_set_label)
 
 
-def mesh_uv_set_current(mesh: _nt.Mesh) -> _t.AnyStr:
+def mesh_uv_set_current(mesh: _nt.Mesh, snapshot: _t.Optional[UVSetSnapshot] = None) -> _t.AnyStr:
 	assert isinstance(mesh, _nt.Mesh)
+	if snapshot is not None:
+		current = snapshot.current(mesh)
+		if current is None:
+			raise InvalidUVSet.set_does_not_exist([mesh], None, uv_set_label='current')
+		return current
 	try:
 		return mesh.getCurrentUVSetName()
 	except Exception:
 		raise InvalidUVSet.set_does_not_exist([mesh], None, uv_set_label='current')
 
 
-def _is_uv_set_exists_by_index(mesh: _nt.Mesh, uv_set: int) -> bool:
-	all_uv_sets = mesh_uv_sets(mesh)
+def _is_uv_set_exists_by_index(mesh: _nt.Mesh, uv_set: int, snapshot: _t.Optional[UVSetSnapshot] = None) -> bool:
+	all_uv_sets = mesh_uv_sets(mesh, snapshot)
 	try:
 		uv_set_name = all_uv_sets[uv_set]
 		return True
@@ -119,13 +187,16 @@ def _is_uv_set_exists_by_index(mesh: _nt.Mesh, uv_set: int) -> bool:
 		return False
 
 
-def _is_uv_set_exists_by_name(mesh: _nt.Mesh, uv_set: _t.AnyStr) -> bool:
-	all_uv_sets = mesh_uv_sets(mesh)
+def _is_uv_set_exists_by_name(mesh: _nt.Mesh, uv_set: _t.AnyStr, snapshot: _t.Optional[UVSetSnapshot] = None) -> bool:
+	all_uv_sets = mesh_uv_sets(mesh, snapshot)
 	return uv_set in all_uv_sets
 
 
-def is_uv_set_exists(mesh: _nt.Mesh, uv_set: _h_uv_set) -> bool:
-	return _is_uv_set_exists_by_index(mesh, uv_set) if isinstance(uv_set, int) else _is_uv_set_exists_by_name(mesh, uv_set)
+def is_uv_set_exists(mesh: _nt.Mesh, uv_set: _h_uv_set, snapshot: _t.Optional[UVSetSnapshot] = None) -> bool:
+	return (
+		_is_uv_set_exists_by_index(mesh, uv_set, snapshot) if isinstance(uv_set, int)
+		else _is_uv_set_exists_by_name(mesh, uv_set, snapshot)
+	)
 
 
 def _rename_uv_set_in_mesh_by_src_name(mesh: _nt.Mesh, old_name: _t.AnyStr, new_name: _t.AnyStr):
@@ -142,8 +213,10 @@ def _rename_uv_set_in_mesh_by_src_name(mesh: _nt.Mesh, old_name: _t.AnyStr, new_
 		raise
 
 
-def _rename_uv_set_in_mesh_by_index(mesh: _nt.Mesh, index: int, new_name: str):
-	current_uv_sets = mesh_uv_sets(mesh)
+def _rename_uv_set_in_mesh_by_index(
+	mesh: _nt.Mesh, index: int, new_name: str, snapshot: _t.Optional[UVSetSnapshot] = None
+):
+	current_uv_sets = mesh_uv_sets(mesh, snapshot)
 	try:
 		old_name = current_uv_sets[index]
 	except IndexError:
@@ -168,8 +241,92 @@ def rename_uv_set_in_mesh(mesh: _nt.Mesh, uv_set: _t.Union[int, _t.AnyStr], new_
 	return _rename_uv_set_in_mesh_by_src_name(mesh, uv_set, new_name)
 
 
-def rename_uv_set_in_meshes(meshes: _t.Iterable[_nt.Mesh], uv_set: _t.Union[int, _t.AnyStr], new_name: _t.AnyStr):
-	rename_f = _rename_uv_set_in_mesh_by_index if isinstance(uv_set, int) else _rename_uv_set_in_mesh_by_src_name
-	for mesh in meshes:
-		rename_f(mesh, uv_set, new_name)
+def _rename_uv_sets_with_api(
+	renames: _t.List[_t.Tuple[_nt.Mesh, _om.MDagPath, _t.AnyStr, _t.AnyStr]],
+	progress: _ProgressReporter, i_start=0,
+):
+	"""
+	Rename UV-sets of many history-free meshes with direct API calls, in one pass.
+
+	All of them are registered as a single undo-queue entry. If interrupted (cancelled or failed),
+	the entry still covers the already renamed ones.
+	"""
+	done = list()  # type: _t.List[_t.Tuple[_om.MDagPath, _t.AnyStr, _t.AnyStr]]
+
+	def redo():
+		for path, old_name, new_name in done:
+			_om.MFnMesh(path).renameUVSet(old_name, new_name)
 
+	def undo():
+		for path, old_name, new_name in reversed(done):
+			_om.MFnMesh(path).renameUVSet(new_name, old_name)
+
+	try:
+		for i, (mesh, path, old_name, new_name) in enumerate(renames):
+			progress.update(i_start + i)
+			try:
+				_om.MFnMesh(path).renameUVSet(old_name, new_name)
+			except Exception:
+				print("{}:\tInternal error: unable to perform UV-set rename {} > {}".format(
+					repr(mesh), repr(old_name), repr(new_name)
+				))
+				raise
+			done.append((path, old_name, new_name))
+	finally:
+		if done:
+			_api_undo.commit(undo, redo)
+
+
+def rename_uv_set_in_meshes(
+	meshes: _t.Iterable[_nt.Mesh], uv_set: _t.Union[int, _t.AnyStr], new_name: _t.AnyStr,
+	progress: _t.Optional[_ProgressReporter] = None, snapshot: _t.Optional[UVSetSnapshot] = None
+):
+	"""
+	Rename the UV-set in all the meshes.
+
+	History-free meshes are renamed in bulk, by API calls recorded as a single undo-queue entry.
+	The ones with construction history still get a ``polyUVSet`` command each
+	(a direct rename there could be overridden by the history).
+
+	:param snapshot: UV-sets are read from it, and the renamed meshes are refreshed in it afterwards.
+	:raises darlog_maya.progress.Cancelled: if interrupted by user.
+	"""
+	if progress is None:
+		progress = _NullProgress()
+
+	meshes = list(meshes)
+	progress.start(len(meshes), "Renaming UV-sets")
+	try:
+		api_renames = list()  # type: _t.List[_t.Tuple[_nt.Mesh, _om.MDagPath, _t.AnyStr, _t.AnyStr]]
+		command_meshes = list()  # type: _t.List[_nt.Mesh]
+		for mesh in meshes:
+			if isinstance(uv_set, int):
+				current_uv_sets = mesh_uv_sets(mesh, snapshot)
+				try:
+					old_name = current_uv_sets[uv_set]
+				except IndexError:
+					raise InvalidUVSet(
+						[mesh], "{}: the shape doesn't have a UV-set with index: {}".format(repr(mesh), repr(uv_set))
+					)
+			else:
+				old_name = uv_set
+			if old_name == new_name:
+				continue
+			path = _dag_path(mesh)
+			if _has_history(_om.MFnMesh(path)):
+				command_meshes.append(mesh)
+			else:
+				api_renames.append((mesh, path, old_name, new_name))
+
+		_rename_uv_sets_with_api(api_renames, progress)
+
+		for i, mesh in enumerate(command_meshes):
+			progress.update(len(api_renames) + i)
+			if isinstance(uv_set, int):
+				_rename_uv_set_in_mesh_by_index(mesh, uv_set, new_name, snapshot=snapshot)
+			else:
+				_rename_uv_set_in_mesh_by_src_name(mesh, uv_set, new_name)
+		progress.finish()
+	finally:
+		if snapshot is not None:
+			snapshot.refresh(meshes)
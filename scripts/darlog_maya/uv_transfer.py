@@ -0,0 +1,193 @@
+# encoding: utf-8
+"""
+Direct UV-set copy on whole meshes: UVs are read from the source set as flat arrays
+and written to the target set with a few OpenMaya 2.0 calls per mesh.
+
+Unlike ``polyCopyUV``, no command is parsed, no component strings are built,
+and no history node is created. So, it only works on history-free meshes:
+on a mesh with construction history, a direct edit is overridden on the next evaluation.
+
+All the copies done by a `UVTransfer` are registered as a single undo-queue entry
+(see `darlog_maya.api_undo`).
+
+UV-set content also has a fingerprint (see `UVSetData.fingerprint`), to detect
+target sets which already match the source (`UVSetData.matches` hashes only the sets
+of the same size), or duplicate sets on the same mesh.
+"""
+
+from array import array as _array
+from dataclasses import dataclass as _dataclass, field as _field
+import hashlib as _hashlib
+
+from maya.api import OpenMaya as _om
+
+from darlog_maya import api_undo as _api_undo
+from darlog_maya.api_nodes import _h_mesh_input, dag_path
+from darlog_maya.py23 import *
+
+try:
+	import typing as _t
+except ImportError:
+	pass
+
+
+@_dataclass
+class UVSetData:
+	"""The whole content of a single UV-set: UV coordinates and their per-face-vertex assignment."""
+	us: _om.MFloatArray
+	vs: _om.MFloatArray
+	uv_counts: _om.MIntArray  # UVs per face (0 for unmapped faces)
+	uv_ids: _om.MIntArray  # flat UV ID per face-vertex of the mapped faces
+	_fingerprint: _t.Optional[str] = _field(default=None, init=False, repr=False, compare=False)
+
+	@classmethod
+	def read(cls, fn: _om.MFnMesh, uv_set: _t.AnyStr) -> 'UVSetData':
+		us, vs = fn.getUVs(uv_set)
+		uv_counts, uv_ids = fn.getAssignedUVs(uv_set)
+		return cls(us, vs, uv_counts, uv_ids)
+
+	def write(self, fn: _om.MFnMesh, uv_set: _t.AnyStr):
+		"""Replace the content of an existing UV-set."""
+		# `setUVs` requires arrays at least as big as the current UVs, so the set is cleared first:
+		fn.clearUVs(uv_set)
+		fn.setUVs(self.us, self.vs, uv_set)
+		fn.assignUVs(self.uv_counts, self.uv_ids, uv_set)
+
+	def sizes(self) -> _t.Tuple[int, int, int]:
+		"""The number of UVs, mapped faces and assigned face-vertices: cheap to compare before `fingerprint()`."""
+		return len(self.us), len(self.uv_counts), len(self.uv_ids)
+
+	def matches(self, other: 'UVSetData') -> bool:
+		"""Whether both sets have identical content. Hashed only if the sizes are the same."""
+		return self.sizes() == other.sizes() and self.fingerprint() == other.fingerprint()
+
+	def fingerprint(self) -> str:
+		"""
+		Hash of the UV coordinates and their face-vertex assignment: equal for UV-sets with identical content.
+		Computed once per instance.
+		"""
+		if self._fingerprint is None:
+			hasher = _hashlib.blake2b(digest_size=16)
+			for typecode, values in (
+				('i', self.uv_counts), ('i', self.uv_ids), ('f', self.us), ('f', self.vs),
+			):
+				data = _array(typecode, values)
+				hasher.update(_array('q', [len(data)]).tobytes())
+				hasher.update(data.tobytes())
+			self._fingerprint = hasher.hexdigest()
+		return self._fingerprint
+
+
+def uv_set_fingerprint(mesh: _h_mesh_input, uv_set: _t.AnyStr) -> str:
+	"""See `UVSetData.fingerprint`."""
+	return UVSetData.read(_om.MFnMesh(dag_path(mesh)), uv_set).fingerprint()
+
+
+def duplicate_uv_sets(fn: _om.MFnMesh, uv_sets: _t.Iterable[_t.AnyStr] = None) -> _t.List[_t.List[_t.AnyStr]]:
+	"""Groups of the mesh's UV-sets with identical content (only the groups of 2+ sets)."""
+	if uv_sets is None:
+		uv_sets = fn.getUVSetNames()
+	by_fingerprint = dict()  # type: _t.Dict[str, _t.List[_t.AnyStr]]
+	for uv_set in uv_sets:
+		by_fingerprint.setdefault(UVSetData.read(fn, uv_set).fingerprint(), list()).append(uv_set)
+	return [names for names in by_fingerprint.values() if len(names) > 1]
+
+
+@_dataclass
+class _CopyRecord:
+	path: _om.MDagPath
+	target: _t.AnyStr
+	data: UVSetData
+	before: _t.Optional[UVSetData]  # ``None`` if the target set was created
+
+	def redo(self):
+		fn = _om.MFnMesh(self.path)
+		if self.before is None:
+			# The name is free again: the set was deleted on undo.
+			fn.createUVSet(self.target)
+		self.data.write(fn, self.target)
+
+	def undo(self):
+		fn = _om.MFnMesh(self.path)
+		if self.before is None:
+			fn.deleteUVSet(self.target)
+		else:
+			self.before.write(fn, self.target)
+
+
+class UVTransfer(object):
+	"""
+	Copies UV-sets on many history-free meshes.
+
+	The copies are applied right away, but recorded in Maya's undo queue only on `commit()`:
+	all the ones made since the previous commit, as a single entry. As a context manager,
+	it commits on exit (even if interrupted, so the already copied meshes can still be undone).
+
+	:param undoable: Record the copies at all. Otherwise, the previous content of target sets isn't kept.
+	"""
+	def __init__(self, undoable=True):
+		super(UVTransfer, self).__init__()
+		self.undoable = undoable
+		self.n_copied = 0
+		self.__records = list()  # type: _t.List[_CopyRecord]
+
+	def __enter__(self):
+		return self
+
+	def __exit__(self, exc_type, exc_val, exc_tb):
+		self.commit()
+
+	def copy(
+		self, mesh: _h_mesh_input, source: _t.AnyStr, target: _t.AnyStr, create=False,
+		data: UVSetData = None,
+	) -> UVSetData:
+		"""
+		Copy the whole content of the ``source`` UV-set to the ``target`` one.
+
+		:param create:
+			The target set needs to be created. If the name is already taken
+			(e.g., the scene has changed since the copy was planned), an existing set is never overwritten:
+			Maya makes the created name unique, and that set is the one written.
+		:param data: Already read content of the source set (e.g., the same source copied to multiple targets).
+		:return: The copied data (to be reused as ``data`` for the next target).
+		"""
+		path = dag_path(mesh)
+		fn = _om.MFnMesh(path)
+		if data is None:
+			data = UVSetData.read(fn, source)
+		before = None
+		if create:
+			existing_sets = set(fn.getUVSetNames())
+			target = fn.createUVSet(target)
+			if target in existing_sets:
+				raise RuntimeError("UV-set {} already exists on {}".format(repr(target), path.fullPathName()))
+		elif self.undoable:
+			before = UVSetData.read(fn, target)
+		data.write(fn, target)
+
+		self.n_copied += 1
+		if self.undoable:
+			self.__records.append(_CopyRecord(path, target, data, before))
+		return data
+
+	@property
+	def n_pending(self) -> int:
+		"""The copies not yet registered in the undo queue."""
+		return len(self.__records)
+
+	def commit(self):
+		"""Register all the copies made since the previous commit as a single undo-queue entry."""
+		if not self.__records:
+			return
+		records = self.__records
+		self.__records = list()
+
+		def redo():
+			for record in records:
+				record.redo()
+
+		def undo():
+			for record in reversed(records):
+				record.undo()
+
+		_api_undo.commit(undo, redo)
@@ -10,6 +10,12 @@
 
 from darlog_maya_tools.references import import_all_references as _import_all_references
 
+try:
+	# The sampling engine requires NumPy, which isn't bundled with some Maya versions:
+	from darlog_maya import anim_sampling as _anim_sampling
+except ImportError:
+	_anim_sampling = None
+
 _t_j = _t.Union[_pm.nt.Joint, _pm.nt.Transform]
 _i_f = _t.Union[int, float]
 
@@ -31,6 +37,9 @@
 
 _deleted_sets = {'AllSet', 'ControlSet', 'DeformSet', 'Sets'}
 
+ENGINE_BAKE_RESULTS = 'bakeResults'
+ENGINE_SAMPLING = 'sampling'
+
 
 def _join_node_path(*parts):  # type: (str) -> str
 	if not parts:
@@ -82,12 +91,29 @@ def _is_baked_joint(joint):
 	return isinstance(joint, _pm.nt.Joint) or type(joint) == _pm.nt.Transform
 
 
-def _bake_keys(joints: _t.List[_t_j], frame_range: _t.Tuple[_i_f, _i_f] = None):
+def _bake_keys(
+	joints: _t.List[_t_j], frame_range: _t.Tuple[_i_f, _i_f] = None, engine: str = ENGINE_BAKE_RESULTS
+):
+	"""
+	:param engine:
+		`ENGINE_BAKE_RESULTS` (default): ``bakeResults`` with simulation, i.e., full scene evaluation on each frame.
+		`ENGINE_SAMPLING` (opt-in): only the local transforms of the joints are sampled
+		(see `darlog_maya.anim_sampling`). Much faster, but wrong for anything depending on previous frames
+		(dynamics, stateful rigs).
+	"""
 	if frame_range is None:
 		frame_range = (
 			_pm.playbackOptions(q=True, min=True),
 			_pm.playbackOptions(q=True, max=True)
 		)
+	if engine is None:
+		engine = ENGINE_BAKE_RESULTS
+	if engine == ENGINE_SAMPLING:
+		if _anim_sampling is None:
+			raise ImportError("<{}> engine for export_rig_cleanup requires NumPy".format(engine))
+		return _anim_sampling.bake(joints, _baked_attribs, frame_range, sample_by=1, minimize_rotations=True)
+	if engine != ENGINE_BAKE_RESULTS:
+		raise ValueError("Unknown bake engine: {}".format(repr(engine)))
 	return _pm.bakeResults(
 		joints,
 		simulation=True, t=frame_range, sampleBy=1, at=_baked_attribs,
@@ -97,7 +123,8 @@ def _bake_keys(joints: _t.List[_t_j], frame_range: _t.Tuple[_i_f, _i_f] = None):
 
 
 def _cleanup_joints(
-	root_joints: _t.List[_t_j], frame_range: _t.Tuple[_i_f, _i_f] = None, remove_animation=False
+	root_joints: _t.List[_t_j], frame_range: _t.Tuple[_i_f, _i_f] = None, remove_animation=False,
+	engine: str = ENGINE_BAKE_RESULTS
 ):
 	"""
 	- Bake animation
@@ -121,7 +148,7 @@ def _cleanup_joints(
 	if remove_animation and frame_range is None:
 		first_frame = _pm.playbackOptions(q=True, min=True)
 		frame_range = (first_frame, first_frame + 1)
-	_bake_keys(baked_joints, frame_range=frame_range)
+	_bake_keys(baked_joints, frame_range=frame_range, engine=engine)
 	if non_joints:
 		_pm.delete(non_joints)
 
@@ -149,7 +176,8 @@ def _cleanup_sets():
 
 def cleanup_rig(
 	global_group='Group', joints_group='DeformationSystem', geometry_group='Geometry',
-	frame_range: _t.Tuple[_i_f, _i_f] = None, remove_animation=False, remove_geo=False
+	frame_range: _t.Tuple[_i_f, _i_f] = None, remove_animation=False, remove_geo=False,
+	engine: str = ENGINE_BAKE_RESULTS
 ):
 	"""
 	Cleanup (Advanced Skeleton) rig for export:
@@ -157,13 +185,19 @@ def cleanup_rig(
 	- Bake animation on joints
 	- Unparent root joints and skinned geo
 	- Remove the rest of the rig
+
+	:param engine:
+		How to bake animation: `ENGINE_BAKE_RESULTS` (default) or `ENGINE_SAMPLING`
+		(faster, requires NumPy, only for rigs without dynamics - see `_bake_keys`).
 	"""
 	_import_all_references(confirm_load=False)
 
 	root_joints = _get_root_joints(global_group, joints_group)
 	root_geo_objects = _get_root_geo_objects(global_group, geometry_group)
 
-	baked_joints = _cleanup_joints(root_joints, frame_range=frame_range, remove_animation=remove_animation)
+	baked_joints = _cleanup_joints(
+		root_joints, frame_range=frame_range, remove_animation=remove_animation, engine=engine
+	)
 
 	if root_geo_objects:
 		if remove_geo:
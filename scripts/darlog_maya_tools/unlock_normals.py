@@ -8,6 +8,8 @@
 https://github.com/Lex-DRL
 """
 
+from array import array as _array
+from dataclasses import dataclass as _dataclass
 import math
 
 from pymel import core as pm
@@ -16,6 +18,20 @@
 from pymel.core import nodetypes as nt
 from pymel.core import datatypes as dt
 
+from darlog_maya import progress as _progress
+from darlog_maya.components import component_strings as _component_strings
+from darlog_maya import scheduler as _scheduler
+from darlog_maya.undo import undoable_context as _undoable_context
+from darlog_maya.user_interaction import print as _print
+
+try:
+	# The vectorized engine requires NumPy, which isn't bundled with some Maya versions:
+	from darlog_maya import mesh_arrays as _mesh_arrays
+	from darlog_maya import mesh_data as _mesh_data
+except ImportError:
+	_mesh_arrays = None
+	_mesh_data = None
+
 try:
 	import typing as _t
 	_t_poly_objects = _t.Iterable[_t.Union[nt.Transform, nt.Mesh]]
@@ -41,6 +57,8 @@ def __reset(self):
 		self.__text = None  # type: ui.Text
 		self.__progress_bar_total = None  # type: ui.ProgressBar
 		self.__progress_bar_stage = None  # type: ui.ProgressBar
+		self.__total_reporter = None  # type: _progress.ProgressReporter
+		self.__stage_reporter = None  # type: _progress.ProgressReporter
 
 	def init(self):
 		with win.window(title="Converting locked normals to Soft/Hard Edges") as window:  # type: ui.Window
@@ -49,6 +67,8 @@ def init(self):
 				self.__text = win.text(label='  Step 1 of 2  ', align='center')  # type: ui.Text
 				self.__progress_bar_total = win.progressBar(maxValue=10, width=400, isInterruptable=True)  # type: ui.ProgressBar
 				self.__progress_bar_stage = win.progressBar(maxValue=10, width=400, isInterruptable=True)  # type: ui.ProgressBar
+		self.__total_reporter = _progress.MayaProgressBar(self.__progress_bar_total.name())
+		self.__stage_reporter = _WindowStageProgress(self.__progress_bar_stage.name())
 		window.show()
 
 	def close(self):
@@ -87,6 +107,20 @@ def stage_progress_bar(self):  # type: () -> ui.ProgressBar
 		assert isinstance(self.__progress_bar_stage, ui.ProgressBar)
 		return self.__progress_bar_stage
 
+	@property
+	def total_reporter(self):  # type: () -> _progress.ProgressReporter
+		"""Throttled, interruptible access to the total progress bar."""
+		if self.__win is None or self.__total_reporter is None:
+			self.init()
+		return self.__total_reporter
+
+	@property
+	def stage_reporter(self):  # type: () -> _progress.ProgressReporter
+		"""Throttled, interruptible access to the stage progress bar. Its label is shown in the window."""
+		if self.__win is None or self.__stage_reporter is None:
+			self.init()
+		return self.__stage_reporter
+
 	@property
 	def label(self):  # type: () -> str
 		return self.label_widget.getLabel()
@@ -132,6 +166,14 @@ def stage_max(self, value):  # type: (int) -> ...
 		self.stage_progress_bar.setMaxValue(max(1, value))
 
 
+class _WindowStageProgress(_progress.MayaProgressBar):
+	"""Displays the stage label in the window's text widget, too."""
+	def _draw(self, label, value, maximum):
+		super(_WindowStageProgress, self)._draw(label, value, maximum)
+		if Window.label != label:
+			Window.label = label
+
+
 Window = _StaticWindowContainer()
 
 
@@ -144,54 +186,369 @@ def _vf_normal(vf):  # type: (pm.MeshVertexFace) -> dt.Vector
 _cos_almost_same_dir = math.cos(math.radians(_almost_same_dir_angle_deg))
 
 
-def _vertex_hard_edges(vtx, min_angle_cos=_cos_almost_same_dir):  # type: (pm.MeshVertex, float) -> _t.List[pm.MeshEdge]
-	hard_edges = []  # type: _t.List[pm.MeshEdge]
-	vtx_faces = pm.ls(pm.polyListComponentConversion(vtx, toVertexFace=True), fl=1)  # type: _t.List[pm.MeshVertexFace]
-	prev_normal = _vf_normal(vtx_faces[-1])
-	for vf in vtx_faces:
-		cur_normal = _vf_normal(vf)
-		if prev_normal.dot(cur_normal) > min_angle_cos:
-			hard_edges.append(
-				pm.ls(pm.polyListComponentConversion(vf, toEdge=True), fl=1)[0]
-			)
-		prev_normal = cur_normal
+def _normals_diverge(normal_a, normal_b, min_angle_cos=_cos_almost_same_dir):  # type: (dt.Vector, dt.Vector, float) -> bool
+	"""
+	The rule both engines share (the same as in `darlog_maya.mesh_arrays.hard_edges_mask`):
+	an edge is hard if, at its vertex, the (unit) normals on the faces at both sides
+	diverge by more than the angle whose cosine is ``min_angle_cos``.
+	"""
+	return normal_a.dot(normal_b) < min_angle_cos
 
-	return hard_edges
 
+def _is_hard_edge(shape, edge_i, min_angle_cos=_cos_almost_same_dir):  # type: (nt.Mesh, int, float) -> bool
+	"""
+	Per-edge counterpart of `darlog_maya.mesh_arrays.hard_edges_mask`: border edges are never hard,
+	and for non-manifold edges, each face is compared against the first one.
+	"""
+	edge = shape.e[edge_i]  # type: pm.MeshEdge
+	faces = sorted(edge.connectedFaces().indices())
+	if len(faces) < 2:
+		return False
+	for vtx_i in edge.connectedVertices().indices():
+		vf_normals = [_vf_normal('{}.vtxFace[{}][{}]'.format(shape, vtx_i, face_i)) for face_i in faces]
+		if any(_normals_diverge(vf_normals[0], x, min_angle_cos) for x in vf_normals[1:]):
+			return True
+	return False
 
-def _run_on_shapes_with_window_initialized(shapes):  # type: (_t.Sequence[nt.Mesh]) -> ...
-	n_shapes = len(shapes)
-	Window.total_max = n_shapes
-	Window.total_progress = 0
-	for shape_i, shape in enumerate(shapes):
-		Window.label = '  Step 1 of 2 for: {s} ({i}/{n})  '.format(s=shape, i=shape_i, n=n_shapes)
-		Window.total_progress = shape_i
-		Window.stage_progress = 0
 
-		verts = shape.vtx  # type: pm.MeshVertex
-		Window.stage_max = len(verts)
+ENGINE_ARRAYS = 'arrays'
+ENGINE_LEGACY = 'legacy'
+
+
+def default_engine():  # type: () -> str
+	"""
+	The vectorized engine if NumPy is available, the per-edge PyMel one otherwise.
+	Either way, the result is the same: only the speed differs.
+	"""
+	return ENGINE_LEGACY if _mesh_data is None else ENGINE_ARRAYS
+
 
-		hard_edges = []  # type: _t.List[pm.MeshEdge]
-		for vtx_i, vtx in enumerate(verts):
-			Window.stage_progress = vtx_i
-			hard_edges.extend(_vertex_hard_edges(vtx))
+# Keyed by mesh content, so it's safe to keep between runs:
+_hard_edges_cache = None if _mesh_arrays is None else _mesh_arrays.HardEdgesCache()
 
-		Window.label = '  Step 2 of 2 for: {s} ({i}/{n})'.format(s=shape, i=shape_i, n=n_shapes)
-		Window.stage_max = len(hard_edges)
-		Window.stage_progress = 0
+
+def clear_cache():
+	if _hard_edges_cache is not None:
+		_hard_edges_cache.clear()
+
+
+def _shape_hard_edge_ids_arrays(
+	shape,  # type: nt.Mesh
+	progress,  # type: _progress.ProgressReporter
+	scope=None,  # type: _t.Optional[_mesh_data.ComponentScope]
+	min_angle_cos=_cos_almost_same_dir,
+):  # type: (...) -> _t.Tuple[_array, bool]
+	"""
+	Edge-centric engine: read all the face-vertex normals and topology once,
+	then classify every edge in a single vectorized pass (reporting progress chunk by chunk).
+	With ``scope``, only the faces around its edges are read.
+
+	Meshes with the same topology and normals as a previously processed one reuse its result.
+	The second returned value tells whether it was the case.
+	"""
+	mesh = _mesh_data.read_mesh_arrays(shape, scope)
+	hard_edges, is_cached = _hard_edges_cache.hard_edge_ids(mesh, min_angle_cos, progress=progress)
+	return _mesh_arrays.to_index_array(hard_edges), is_cached
+
+
+def _shape_hard_edge_ids_legacy(
+	shape,  # type: nt.Mesh
+	progress,  # type: _progress.ProgressReporter
+	scope=None,  # type: _t.Optional[_mesh_data.ComponentScope]
+	min_angle_cos=_cos_almost_same_dir,
+):  # type: (...) -> _t.Tuple[_array, bool]
+	"""
+	Per-edge engine, with PyMel queries only (no NumPy needed). It follows exactly the same rule
+	as the vectorized one, so both produce the same hard edges.
+	Edges are visited one by one (no PyNode is kept for the whole mesh), and only indices of hard edges are stored.
+	With ``scope``, only its edges are visited.
+	"""
+	edge_ids = range(shape.numEdges()) if scope is None else scope.edge_ids.tolist()
+	progress.start(len(edge_ids))
+
+	hard_edges = _array('i')
+	for i, edge_i in enumerate(edge_ids):
+		progress.update(i)
+		if _is_hard_edge(shape, edge_i, min_angle_cos=min_angle_cos):
+			hard_edges.append(edge_i)
+	return _array('i', sorted(hard_edges)), False
+
+
+def _components(shape, ids, component='e'):  # type: (nt.Mesh, _t.Iterable[int], str) -> _t.List[str]
+	"""Compact component strings for the given indices, with consecutive ones merged into ranges."""
+	return _component_strings(shape.name(), component, sorted(set(ids)))
+
+
+def _write_hard_edges_with_commands(
+	shape,  # type: nt.Mesh
+	hard_edges,  # type: _t.Optional[_t.Sequence[int]]
+	scope=None,  # type: _t.Optional[_mesh_data.ComponentScope]
+):
+	"""
+	Creates 3 history nodes and changes selection.
+	With ``None`` instead of hard edges, only normals are unlocked (a single history node).
+	"""
+	if scope is None:
 		pm.polyNormalPerVertex(shape, unFreezeNormal=True)
+	else:
+		pm.polyNormalPerVertex(_components(shape, scope.vertex_ids.tolist(), 'vtx'), unFreezeNormal=True)
+	if hard_edges is None:
+		return
+	if scope is None:
 		pm.polySoftEdge(shape, angle=180)  # make all edges soft
-		if hard_edges:
-			pm.select(hard_edges, r=True)
-			pm.polySoftEdge(a=0)
-		Window.stage_progress = len(hard_edges)
-	Window.total_progress = n_shapes
+	else:
+		pm.polySoftEdge(_components(shape, scope.edge_ids.tolist()), angle=180)
+	if hard_edges:
+		pm.select(_components(shape, hard_edges), r=True)
+		pm.polySoftEdge(a=0)
+
+
+def _can_write_directly(shape):  # type: (nt.Mesh) -> bool
+	"""Direct edits are only persistent on meshes without history. Others have to go through commands."""
+	return _mesh_data is not None and not _mesh_data.has_history(shape)
+
+
+STATUS_PENDING = 'pending'
+STATUS_NO_LOCKED = 'no locked normals'
+
+
+@_dataclass
+class MeshAnalysis:
+	"""What the tool does (or did) to a single shape."""
+	shape: nt.Mesh
+	n_vertices: int
+	n_edges: int
+	n_face_vertices: int
+	n_locked: int  # face-vertices with locked normals
+	hard_edges: _array  # array('i') of edge indices
+	status: str = STATUS_PENDING
+	from_cache: bool = False
+	# Edge smoothing already matches the normals: they only need to be unlocked.
+	edges_matching: bool = False
+	# Only a part of the mesh (selected components) is processed. All the counts above are for this part:
+	scope: _t.Optional['_mesh_data.ComponentScope'] = None
 
+	@property
+	def n_hard_edges(self):  # type: () -> int
+		return len(self.hard_edges)
 
-def to_mesh_shapes_gen(
+	@property
+	def is_skipped(self):  # type: () -> bool
+		return self.status != STATUS_PENDING
+
+	@property
+	def estimated_work(self):  # type: () -> int
+		"""Rough number of components to process: face-vertices to read for classification, and edges to write."""
+		if self.is_skipped:
+			return 0
+		return self.n_face_vertices + (0 if self.edges_matching else self.n_edges)
+
+	def as_dict(self):  # type: () -> _t.Dict[str, _t.Any]
+		return dict(
+			shape=unicode(self.shape),
+			vertices=self.n_vertices, edges=self.n_edges, face_vertices=self.n_face_vertices,
+			locked_face_vertices=self.n_locked, hard_edges=self.n_hard_edges,
+			status=self.status, from_cache=self.from_cache, edges_matching=self.edges_matching,
+			estimated_work=self.estimated_work,
+			scoped=self.scope is not None,
+		)
+
+
+@_dataclass
+class UnlockNormalsReport:
+	meshes: _t.List[MeshAnalysis]
+
+	@property
+	def to_process(self):  # type: () -> _t.List[MeshAnalysis]
+		return [x for x in self.meshes if not x.is_skipped]
+
+	@property
+	def skipped_no_locked(self):  # type: () -> _t.List[MeshAnalysis]
+		return [x for x in self.meshes if x.status == STATUS_NO_LOCKED]
+
+	@property
+	def edges_matching(self):  # type: () -> _t.List[MeshAnalysis]
+		"""Meshes which only get their normals unlocked, with edge smoothing left as-is."""
+		return [x for x in self.to_process if x.edges_matching]
+
+	@property
+	def n_from_cache(self):  # type: () -> int
+		return sum(1 for x in self.meshes if x.from_cache)
+
+	@property
+	def estimated_work(self):  # type: () -> int
+		return sum(x.estimated_work for x in self.meshes)
+
+	def as_dicts(self):  # type: () -> _t.List[_t.Dict[str, _t.Any]]
+		return [x.as_dict() for x in self.meshes]
+
+	def summary(self):  # type: () -> str
+		return (
+			"{n_process} of {n} shape(s) to process ({n_hard} hard edges, ~{work} components); "
+			"{n_matching} with edges already matching (only normals unlocked); "
+			"skipped: {n_unlocked} without locked normals; "
+			"{n_cached} reused hard edges of identical meshes"
+		).format(
+			n_process=len(self.to_process), n=len(self.meshes),
+			n_hard=sum(x.n_hard_edges for x in self.to_process), work=self.estimated_work,
+			n_unlocked=len(self.skipped_no_locked), n_matching=len(self.edges_matching),
+			n_cached=self.n_from_cache,
+		)
+
+
+def _n_locked_face_vertices(shape, scope=None):  # type: (nt.Mesh, _t.Optional[_mesh_data.ComponentScope]) -> int
+	if _mesh_data is not None:
+		return _mesh_data.n_locked_face_vertices(shape, scope)
+	return sum(1 for x in pm.polyNormalPerVertex(shape.vtxFace, q=True, freezeNormal=True) if x)
+
+
+def _current_hard_edge_ids(shape, scope=None):  # type: (nt.Mesh, _t.Optional[_mesh_data.ComponentScope]) -> _t.Optional[_array]
+	"""``None`` if it can't be cheaply found."""
+	if _mesh_data is None:
+		return None
+	return _mesh_arrays.to_index_array(_mesh_data.current_hard_edge_ids(shape, scope))
+
+
+def _hard_edge_ids_f(engine=None):
+	if engine is None:
+		engine = default_engine()
+	if engine == ENGINE_ARRAYS and _mesh_data is None:
+		raise ImportError("<{}> engine for unlock_normals requires NumPy".format(engine))
+	return _shape_hard_edge_ids_arrays if engine == ENGINE_ARRAYS else _shape_hard_edge_ids_legacy
+
+
+def _scope(shape, components):  # type: (nt.Mesh, _t.Optional[_t.List[str]]) -> _t.Optional[_mesh_data.ComponentScope]
+	"""Scoped processing needs the API-based reader. Without it, the whole shape is processed."""
+	if not components or _mesh_data is None:
+		return None
+	return _mesh_data.component_scope(components)
+
+
+def _analyze_shape(
+	shape,  # type: nt.Mesh
+	progress,  # type: _progress.ProgressReporter
+	hard_edge_ids_f,  # type: _t.Callable[..., _t.Tuple[_array, bool]]
+	components=None,  # type: _t.Optional[_t.List[str]]
+):  # type: (...) -> MeshAnalysis
+	"""
+	Read-only: find hard edges and whether the shape needs to be processed at all.
+
+	If ``components`` are given, only the edges affected by them are analyzed,
+	for the cost proportional to the number of these components.
+	"""
+	scope = _scope(shape, components)
+	if scope is None:
+		res = MeshAnalysis(
+			shape=shape,
+			n_vertices=shape.numVertices(), n_edges=shape.numEdges(), n_face_vertices=shape.numFaceVertices(),
+			n_locked=_n_locked_face_vertices(shape), hard_edges=_array('i'),
+		)
+	else:
+		res = MeshAnalysis(
+			shape=shape,
+			n_vertices=len(scope.vertex_ids), n_edges=len(scope.edge_ids),
+			# approximately: each edge of a face counts as a face-vertex
+			n_face_vertices=len(scope.edge_ids) * 2,
+			n_locked=_n_locked_face_vertices(shape, scope), hard_edges=_array('i'),
+			scope=scope,
+		)
+	if not res.n_locked:
+		res.status = STATUS_NO_LOCKED
+		return res
+
+	res.hard_edges, res.from_cache = hard_edge_ids_f(shape, progress, scope)
+	res.edges_matching = _current_hard_edge_ids(shape, scope) == res.hard_edges
+	return res
+
+
+def _run_on_shapes_gen(
+	shapes,  # type: _t.Sequence[nt.Mesh]
+	total_progress,  # type: _progress.ProgressReporter
+	stage_progress,  # type: _progress.ProgressReporter
+	engine=None,  # type: str
+	direct_write=True,
+	dry_run=False,
+	components=None,  # type: _t.Optional[_t.Dict[nt.Mesh, _t.List[str]]]
+):  # type: (...) -> _t.Generator[None, None, UnlockNormalsReport]
+	"""
+	The actual conversion, reporting to any progress backend (so it also works headless).
+
+	It's a generator yielding after each step (analysis or write of a single shape),
+	so it can be run as a `darlog_maya.scheduler` job. The report is its return value.
+
+	Shapes without locked normals are skipped. The ones with edge smoothing already matching the normals
+	only get the normals unlocked (edge smoothing isn't written).
+
+	:param direct_write:
+		When enabled, meshes without construction history get their edge smoothing/normals
+		written straight into the mesh data, in a single bulk (undoable) call per mesh:
+		no history nodes created, selection isn't touched.
+		Otherwise (or for meshes with history), ``polyNormalPerVertex`` / ``polySoftEdge`` commands are used.
+	:param dry_run: Only analyze the shapes, don't modify the scene.
+	:param components:
+		Selected components (as strings) per shape. Only the edges/normals around them
+		are processed for these shapes, the rest of the mesh is left untouched.
+	:raises darlog_maya.progress.Cancelled: if interrupted by user.
+	"""
+	hard_edge_ids_f = _hard_edge_ids_f(engine)
+	if components is None:
+		components = dict()
+
+	n_shapes = len(shapes)
+	report = UnlockNormalsReport([])
+	total_progress.start(n_shapes)
+	for shape_i, shape in enumerate(shapes):
+		total_progress.update(shape_i)
+		stage_progress.start(1, '  Step 1 of 2 for: {s} ({i}/{n})  '.format(s=shape, i=shape_i, n=n_shapes))
+
+		analysis = _analyze_shape(shape, stage_progress, hard_edge_ids_f, components.get(shape))
+		report.meshes.append(analysis)
+		yield
+		if dry_run or analysis.is_skipped:
+			continue
+
+		stage_progress.start(1, '  Step 2 of 2 for: {s} ({i}/{n})'.format(s=shape, i=shape_i, n=n_shapes))
+		hard_edges = None if analysis.edges_matching else analysis.hard_edges
+		if direct_write and _can_write_directly(shape):
+			_mesh_data.apply_hard_edges(shape, hard_edges, analysis.scope)
+		else:
+			_write_hard_edges_with_commands(shape, hard_edges, analysis.scope)
+		stage_progress.finish()
+		yield
+	total_progress.finish()
+	return report
+
+
+def _run_on_shapes(*args, **kwargs):  # type: (...) -> UnlockNormalsReport
+	"""Synchronous `_run_on_shapes_gen()`: the same arguments, returns the report right away."""
+	steps = _run_on_shapes_gen(*args, **kwargs)
+	while True:
+		try:
+			next(steps)
+		except StopIteration as e:
+			return e.value
+
+
+def _run_on_shapes_with_window_initialized(
+	shapes,  # type: _t.Sequence[nt.Mesh]
+	engine=None,  # type: str
+	direct_write=True,
+	components=None,  # type: _t.Optional[_t.Dict[nt.Mesh, _t.List[str]]]
+):  # type: (...) -> UnlockNormalsReport
+	return _run_on_shapes(
+		shapes, Window.total_reporter, Window.stage_reporter,
+		engine=engine, direct_write=direct_write, components=components
+	)
+
+
+def _node_uuid(node):  # type: (nt.DependNode) -> str
+	"""All the instances of a shape share the same UUID (unlike DAG paths)."""
+	return pm.ls(node, uuid=True)[0]
+
+
+def _to_mesh_shapes_with_instances_gen(
 	sel  # type: _t_poly_objects
 ):
-	"""Force-convert selection to poly-shapes (meshes)."""
 	for item in sel:
 		if isinstance(item, nt.Mesh):
 			yield item
@@ -203,27 +560,152 @@ def to_mesh_shapes_gen(
 		# just skip whatever is left
 
 
-def run_on_objects(objects):  # type: (_t_poly_objects) -> ...
+def to_mesh_shapes_gen(
+	sel  # type: _t_poly_objects
+):
+	"""Force-convert selection to poly-shapes (meshes). Each instanced shape is yielded only once."""
+	seen = set()  # type: _t.Set[str]
+	for shape in _to_mesh_shapes_with_instances_gen(sel):
+		uuid = _node_uuid(shape)
+		if uuid in seen:
+			continue
+		seen.add(uuid)
+		yield shape
+
+
+def to_mesh_shapes_and_components(
+	sel  # type: _t.Iterable[_t.Union[nt.Transform, nt.Mesh, pm.Component]]
+):  # type: (...) -> _t.Tuple[_t.List[nt.Mesh], _t.Dict[nt.Mesh, _t.List[str]]]
+	"""
+	Split selection into unique shapes to process and components selected on some of them.
+
+	A shape selected as a whole (or via its transform) is processed as a whole, even if its components
+	are selected, too. Components of instanced shapes are merged into a single entry.
+	"""
+	sel = list(sel)
+	objects = list()
+	components_by_uuid = dict()  # type: _t.Dict[str, _t.Tuple[nt.Mesh, _t.List[str]]]
+	for item in sel:
+		if not isinstance(item, pm.Component):
+			objects.append(item)
+			continue
+		shape = item.node()
+		if not isinstance(shape, nt.Mesh):
+			continue
+		uuid = _node_uuid(shape)
+		if uuid not in components_by_uuid:
+			components_by_uuid[uuid] = (shape, list())
+		components_by_uuid[uuid][1].append(unicode(item))
+
+	shapes = list(to_mesh_shapes_gen(objects))
+	whole = set(_node_uuid(x) for x in shapes)
+	components = dict()  # type: _t.Dict[nt.Mesh, _t.List[str]]
+	for uuid, (shape, shape_components) in components_by_uuid.items():
+		if uuid in whole:
+			continue
+		shapes.append(shape)
+		components[shape] = shape_components
+	return shapes, components
+
+
+def run_on_objects(objects, engine=None, direct_write=True):  # type: (_t_poly_objects, str, bool) -> ...
+	"""
+	Objects might also contain components (faces, edges, vertices, etc.):
+	then only the edges around them are processed on their meshes.
+	"""
 	try:
 		Window.close()
 	except Exception:
 		pass
 	Window.init()
 
-	shapes = list(to_mesh_shapes_gen(objects))
+	shapes, components = to_mesh_shapes_and_components(objects)
 	if not shapes:
 		Window.label = "You need to have at least one object selected"
 		return
 
 	try:
-		_run_on_shapes_with_window_initialized(shapes)
+		with _undoable_context("unlockNormalsChunk"):
+			report = _run_on_shapes_with_window_initialized(
+				shapes, engine=engine, direct_write=direct_write, components=components
+			)
 		Window.close()
+		_print("Normals unlocked. {}".format(report.summary()))
+	except _progress.Cancelled:
+		Window.label = "Cancelled by user. The already processed shapes can be undone"
 	except Exception as e:
 		Window.label = "Unexpected error (see console)"
 		raise e
 
 
-def run():
-	sel = pm.ls(sl=True, fl=True, shapes=True, transforms=True)
-	run_on_objects(sel)
+def analyze_objects(
+	objects,  # type: _t_poly_objects
+	engine=None,  # type: str
+	progress=None,  # type: _progress.ProgressReporter
+):  # type: (...) -> UnlockNormalsReport
+	"""
+	Dry run: report what `run_on_objects()` would do (hard edges per mesh, skipped meshes, estimated work),
+	without changing the scene.
+	"""
+	if progress is None:
+		progress = _progress.NullProgress()
+	shapes, components = to_mesh_shapes_and_components(objects)
+	return _run_on_shapes(
+		shapes, progress, _progress.NullProgress(), engine=engine, dry_run=True, components=components
+	)
+
+
+def analyze(engine=None):  # type: (str) -> UnlockNormalsReport
+	"""Dry run on selection, with a summary printed."""
+	sel = pm.ls(sl=True)
+	with _progress.for_current_session() as progress:
+		report = analyze_objects(sel, engine=engine, progress=progress)
+	_print(report.summary())
+	return report
+
+
+def run_async(
+	engine=None,  # type: str
+	direct_write=True,
+	scheduler=None,  # type: _t.Optional[_scheduler.Scheduler]
+):  # type: (...) -> _t.Optional[_scheduler.Job]
+	"""
+	Like `run()`, but processes the selection shape by shape in the background (on idle),
+	so the viewport stays interactive. Cancel with Esc (main progress bar) or ``job.cancel()``.
+
+	Each tick is a separate undo entry. Returns the scheduled job.
+	"""
+	sel = pm.ls(sl=True)
+	shapes, components = to_mesh_shapes_and_components(sel)
+	if not shapes:
+		_print("You need to have at least one object selected")
+		return None
+
+	def on_done(job):  # type: (_scheduler.Job) -> ...
+		try:
+			pm.select([x for x in sel if x.exists()], r=True)
+		except Exception:
+			pass
+		_print("Normals unlocked. {}".format(job.result.summary()))
+
+	def on_cancel(job):  # type: (_scheduler.Job) -> ...
+		_print("Unlocking normals was cancelled. The already processed shapes can be undone")
+
+	progress = _progress.for_current_session()
+	job = _scheduler.Job(
+		_run_on_shapes_gen(
+			shapes, progress, _progress.NullProgress(),
+			engine=engine, direct_write=direct_write, components=components,
+		),
+		name='unlockNormalsChunk', progress=progress, on_done=on_done, on_cancel=on_cancel,
+	)
+	if scheduler is None:
+		scheduler = _scheduler.default_scheduler()
+	return scheduler.submit(job)
+
+
+def run(engine=None, direct_write=True):
+	# Not flattened: component ranges are kept as-is, so their cost doesn't depend on selection size.
+	sel = pm.ls(sl=True)
+	run_on_objects(sel, engine=engine, direct_write=direct_write)
 	pm.select(sel, r=True)
@@ -1,27 +1,39 @@
 # encoding: utf-8
 """
 Copy UVs between sets on multiple shapes at once.
+
+Whole history-free shapes are copied directly, as UV arrays (see `darlog_maya.uv_transfer`),
+without creating any history nodes. Component selections and shapes with construction history
+are still copied with ``polyCopyUV``. Either way, the whole batch is a single undo step.
 """
 
 __author__ = 'Lex Darlog (DRL)'
 
+from dataclasses import dataclass as _dataclass
 from pprint import pformat as _pformat
 
+from maya.api import OpenMaya as _om
 from pymel import core as _pm
 from pymel.core import nodetypes as _nt
 
+from darlog_maya import progress as _progress
+from darlog_maya import scheduler as _scheduler
+from darlog_maya.components import MeshComponents
 from darlog_maya.ls_convert import (
-	FromToMesh,
-
-	_h_poly_selection_input,
 	_h_poly_selection_input_seq,
-	_h_poly_grouped_output,
 )
-from darlog_maya.py23 import _t_str, _zip
-from darlog_maya.typing_poly import _t_poly_object_or_comp
+from darlog_maya.ls_convert_api import (
+	FromToMeshApi,
+	active_poly_selection as _active_poly_selection,
+	_h_api_compact_output,
+)
+from darlog_maya.py23 import _t_str, _unicode, _zip
+from darlog_maya.selection import SelectionSnapshot
+from darlog_maya.undo import undoable_context as _undoable_context
 from darlog_maya.user_interaction import print
 from darlog_maya.uv_set import (
 	InvalidUVSet,
+	UVSetSnapshot,
 	default_set_name,
 	mesh_uv_sets,
 	mesh_uv_set_current,
@@ -34,6 +46,8 @@
 	_h_uv_set,
 	_t_uv_set
 )
+from darlog_maya.api_nodes import dag_path as _dag_path, has_history as _has_history
+from darlog_maya.uv_transfer import UVSetData, UVTransfer
 
 try:
 	import typing as _t
@@ -41,69 +55,155 @@
 	pass
 
 
-_converter = FromToMesh(no_intermediate_shapes=True)
+# Meshes are needed as PyNodes for UV-set queries, but components are passed to commands as-is:
+_converter = FromToMeshApi(no_intermediate_shapes=True, mesh_pynodes=True)
+
+ENGINE_ARRAYS = 'arrays'
+ENGINE_COMMAND = 'command'
+
+
+def default_engine():  # type: () -> str
+	"""Direct array copy for whole history-free shapes (``polyCopyUV`` is still used for the rest)."""
+	return ENGINE_ARRAYS
+
+
+@_dataclass(frozen=True)
+class MeshTransfer:
+	"""What's copied on a single mesh: all the UV-set names are already resolved."""
+	mesh: _nt.Mesh
+	components: MeshComponents  # the whole mesh or the selected components, compacted
+	source: _t.AnyStr
+	target: _t.AnyStr
+	create: bool  # the target set doesn't exist yet
+
+	def as_dict(self) -> _t.Dict[_t.AnyStr, _t.Any]:
+		return dict(
+			mesh=_unicode(self.mesh), source=self.source, target=self.target, create=self.create,
+			whole=self.components.whole, components=self.components.n_components,
+		)
+
+
+@_dataclass(frozen=True)
+class TransferPlan:
+	"""
+	The validated UV copy: produced by `plan_copy_uv()` / `plan_copy_uv_fan_out()`
+	and consumed by `execute_plan()`.
+
+	It describes the scene at the moment of planning. E.g., once executed, the created target sets
+	already exist, so re-running the same plan fails: re-plan it instead.
+	"""
+	from_set: _t.Optional[_h_uv_set]
+	to_set: _t.Union[_h_uv_set, None, _t.Tuple[_t.Optional[_h_uv_set], ...]]  # a tuple for fan-out
+	transfers: _t.Tuple[MeshTransfer, ...] = ()
+
+	def __len__(self):
+		return len(self.transfers)
+
+	def __iter__(self) -> _t.Iterator[MeshTransfer]:
+		return iter(self.transfers)
+
+	@property
+	def meshes(self) -> _t.List[_nt.Mesh]:
+		"""Unique meshes, in order."""
+		res = list()  # type: _t.List[_nt.Mesh]
+		seen = set()
+		for x in self.transfers:
+			if x.mesh not in seen:
+				seen.add(x.mesh)
+				res.append(x.mesh)
+		return res
+
+	@property
+	def n_created(self) -> int:
+		return sum(1 for x in self.transfers if x.create)
+
+	def as_dict(self) -> _t.Dict[_t.AnyStr, _t.Any]:
+		"""JSON-friendly representation (e.g., for a dry run)."""
+		return dict(
+			from_set=self.from_set,
+			to_set=list(self.to_set) if isinstance(self.to_set, tuple) else self.to_set,
+			transfers=[x.as_dict() for x in self.transfers],
+		)
+
+
+@_dataclass
+class CopyReport:
+	"""The result of an executed `TransferPlan`."""
+	meshes: _t.List[_nt.Mesh]  # all the meshes in the plan
+	skipped: _t.List[MeshTransfer]  # the ones whose target set already had the same content as the source
+
+	@property
+	def n_skipped(self) -> int:
+		return len(self.skipped)
 
 
 def _dummy_str(uv_set: _t.AnyStr):
 	return uv_set
 
 
-def __is_ok_target_uv_set_by_index(mesh: _nt.Mesh, uv_set: int) -> bool:
+def __is_ok_target_uv_set_by_index(mesh: _nt.Mesh, uv_set: int, snapshot: UVSetSnapshot = None) -> bool:
 	assert isinstance(uv_set, int)
-	all_uv_sets = mesh_uv_sets(mesh)
+	all_uv_sets = mesh_uv_sets(mesh, snapshot)
 	# we should fail when (n=2 and uv_set=3) or (n=2 and uv_set=-3)
 	return len(all_uv_sets) >= abs(uv_set)
 
 
-def _group_by_meshes_for_transfer(
-	items: _h_poly_selection_input_seq, from_set: _t.Optional[_h_uv_set], to_set: _t.Optional[_h_uv_set],
-	all_transform_descendents=True
-) -> _h_poly_grouped_output:
-	"""
-	Pre-verify input arguments and group the items by their shape.
-	"""
-	for s_type_upper, s_type, set_arg in [
-		('Source', 'source', from_set),
-		('Target', 'target', to_set),
-	]:
-		if not(
-			isinstance(set_arg, _t_uv_set) or (set_arg is None)
-		):
-			raise TypeError("{} UV-set must be either int or string. Got {}: {}".format(
-				s_type_upper, type(set_arg), repr(set_arg)
-			))
-		if isinstance(set_arg, _t_str) and not is_valid_name(set_arg):
-			raise ValueError("Invalid {} UV-set name: {}".format(s_type, repr(set_arg)))
-
-	grouped_by_mesh, error_input = _converter.group_by_mesh(items, all_transform_descendents=all_transform_descendents)
+def _check_set_arg(set_arg: _t.Optional[_h_uv_set], s_type: _t.AnyStr):
+	if not(
+		isinstance(set_arg, _t_uv_set) or (set_arg is None)
+	):
+		raise TypeError("{} UV-set must be either int or string. Got {}: {}".format(
+			s_type.capitalize(), type(set_arg), repr(set_arg)
+		))
+	if isinstance(set_arg, _t_str) and not is_valid_name(set_arg):
+		raise ValueError("Invalid {} UV-set name: {}".format(s_type, repr(set_arg)))
+
+
+def _group_items(items: _h_poly_selection_input_seq, all_transform_descendents=True) -> _h_api_compact_output:
+	grouped_by_mesh, error_input = _converter.group_by_mesh(
+		items, all_transform_descendents=all_transform_descendents, compact=True
+	)
 	if error_input:
 		raise ValueError("Unsupported selection: {}".format(
 			repr(error_input[0]) if len(error_input) == 1 else _pformat(error_input)
 		))
-
 	assert not error_input
+	return grouped_by_mesh
 
+
+def _plan_transfers(
+	grouped_by_mesh: _h_api_compact_output, from_set: _t.Optional[_h_uv_set], to_set: _t.Optional[_h_uv_set],
+	snapshot: UVSetSnapshot, expect_created=False,
+) -> _t.Tuple[_t.List[MeshTransfer], _t.List[InvalidUVSet]]:
+	"""
+	Resolve source/target UV-set names on each mesh. Errors are returned instead of raised:
+	one `InvalidUVSet` per kind of issue, listing all the meshes with it.
+
+	:param expect_created: Record target sets to be created in the ``snapshot``, as if they already exist
+		(for the next targets planned with the same snapshot).
+	"""
 	error_meshes_no_src_set: _t.List[_nt.Mesh] = list()
 	error_meshes_no_trg_set: _t.List[_nt.Mesh] = list()
 	error_clash_meshes: _t.List[_nt.Mesh] = list()
 	error_clash_set_names: _t.List[_t.AnyStr] = list()
+	transfers: _t.List[MeshTransfer] = list()
 
 	is_ok_src_f = _exists_by_index if isinstance(from_set, int) else _exists_by_name
 	if from_set is None:
-		is_ok_src_f = lambda *args: True
+		is_ok_src_f = lambda *args, **kwargs: True
 	is_ok_trg_f = __is_ok_target_uv_set_by_index if isinstance(to_set, int) else _exists_by_name
 	if to_set is None:
-		is_ok_trg_f = lambda *args: True
+		is_ok_trg_f = lambda *args, **kwargs: True
 
-	get_source_uv_set_f = _factory_source_uv_set_name_getter(from_set)
-	get_target_uv_set_f = _factory_target_uv_set_name_getter(to_set)
+	get_source_uv_set_f = _factory_source_uv_set_name_getter(from_set, snapshot)
+	get_target_uv_set_f = _factory_target_uv_set_name_getter(to_set, snapshot)
 
-	for mesh in grouped_by_mesh.keys():
+	for mesh, mesh_components in grouped_by_mesh.items():
 		was_error = False
-		if not is_ok_src_f(mesh, from_set):
+		if not is_ok_src_f(mesh, from_set, snapshot=snapshot):
 			error_meshes_no_src_set.append(mesh)
 			was_error = True
-		if not is_ok_trg_f(mesh, to_set):
+		if not is_ok_trg_f(mesh, to_set, snapshot=snapshot):
 			error_meshes_no_trg_set.append(mesh)
 			was_error = True
 		if was_error:
@@ -114,49 +214,129 @@ def _group_by_meshes_for_transfer(
 		if src_name == trg_name:
 			error_clash_meshes.append(mesh)
 			error_clash_set_names.append(src_name)
+			continue
+		transfers.append(MeshTransfer(mesh, mesh_components, src_name, trg_name, make_new))
+		if make_new and expect_created:
+			snapshot.expect_created(mesh, trg_name)
 
+	errors: _t.List[InvalidUVSet] = list()
 	for s_type, set_arg, error_meshes in [
 		('source', from_set, error_meshes_no_src_set),
 		('target', to_set, error_meshes_no_trg_set),
 	]:
 		if error_meshes:
-			raise InvalidUVSet.set_does_not_exist(error_meshes, set_arg, uv_set_label=s_type)
+			errors.append(InvalidUVSet.set_does_not_exist(error_meshes, set_arg, uv_set_label=s_type))
 
 	if error_clash_meshes:
-		raise InvalidUVSet(error_clash_meshes, "Can't copy UVs from {} UV-set to itself on the following {}:\n{}".format(
+		errors.append(InvalidUVSet(error_clash_meshes, "Can't copy UVs from {} UV-set to itself on the following {}:\n{}".format(
 			'current' if from_set is None else ('<{}>'.format(from_set) if isinstance(from_set, int) else repr(from_set)),
 			'poly-shape' if len(error_clash_meshes) == 1 else 'poly-shapes',
 			'\n'.join(
 				'\t{}\t>\t{}'.format(repr(uv_name), mesh)
 				for mesh, uv_name in _zip(error_clash_meshes, error_clash_set_names)
 			)
-		))
+		)))
+	return transfers, errors
 
-	assert not (error_meshes_no_src_set or error_meshes_no_trg_set or error_clash_meshes)
-	return grouped_by_mesh
 
+def plan_copy_uv(
+	items: _h_poly_selection_input_seq, from_set: _t.Optional[_h_uv_set] = None, to_set: _t.Optional[_h_uv_set] = None,
+	all_transform_descendents=True
+) -> TransferPlan:
+	"""
+	Pre-verify input arguments, group the items by their shape (as compact index arrays)
+	and resolve source/target UV-set names for each of them.
+
+	UV-sets of all the meshes are queried only once. Nothing is changed in the scene,
+	so it can be used as a dry run, too.
+
+	:raises InvalidUVSet: listing all the meshes with the same issue.
+	"""
+	_check_set_arg(from_set, 'source')
+	_check_set_arg(to_set, 'target')
+
+	grouped_by_mesh = _group_items(items, all_transform_descendents=all_transform_descendents)
+	snapshot = UVSetSnapshot(grouped_by_mesh.keys())
+	transfers, errors = _plan_transfers(grouped_by_mesh, from_set, to_set, snapshot)
+	if errors:
+		raise errors[0]
+	return TransferPlan(from_set, to_set, tuple(transfers))
+
+
+def plan_copy_uv_fan_out(
+	items: _h_poly_selection_input_seq, from_set: _t.Optional[_h_uv_set] = None,
+	to_sets: _t.Sequence[_t.Optional[_h_uv_set]] = (None, ),
+	all_transform_descendents=True
+) -> TransferPlan:
+	"""
+	Like `plan_copy_uv()`, but the same source set is copied to multiple targets, in the given order.
+	A target set created by a previous target is considered as existing for the next ones
+	(e.g., ``to_sets=[None, None]`` creates two new sets).
 
-def _factory_source_uv_set_name_getter(from_set: _t.Optional[_h_uv_set]) -> _t.Callable[[_nt.Mesh], _t.AnyStr]:
+	In the plan, all the transfers of a mesh go together, so the source UVs are read only once per mesh.
+
+	:raises InvalidUVSet: all the issues with all the targets at once.
+	"""
+	_check_set_arg(from_set, 'source')
+	to_sets = tuple(to_sets)
+	if not to_sets:
+		raise ValueError("No target UV-sets given")
+	for to_set in to_sets:
+		_check_set_arg(to_set, 'target')
+
+	grouped_by_mesh = _group_items(items, all_transform_descendents=all_transform_descendents)
+	snapshot = UVSetSnapshot(grouped_by_mesh.keys())
+	per_mesh = {mesh: list() for mesh in grouped_by_mesh.keys()}  # type: _t.Dict[_nt.Mesh, _t.List[MeshTransfer]]
+	all_errors: _t.List[InvalidUVSet] = list()
+	for to_set in to_sets:
+		transfers, errors = _plan_transfers(grouped_by_mesh, from_set, to_set, snapshot, expect_created=True)
+		for transfer in transfers:
+			per_mesh[transfer.mesh].append(transfer)
+		all_errors.extend(errors)
+
+	if len(all_errors) == 1:
+		raise all_errors[0]
+	if all_errors:
+		error_meshes = list()  # type: _t.List[_nt.Mesh]
+		for e in all_errors:
+			error_meshes.extend(x for x in e.meshes if x not in error_meshes)
+		raise InvalidUVSet(error_meshes, '\n'.join(str(e) for e in all_errors))
+
+	return TransferPlan(
+		from_set, to_sets,
+		tuple(transfer for transfers in per_mesh.values() for transfer in transfers)
+	)
+
+
+def _factory_source_uv_set_name_getter(
+	from_set: _t.Optional[_h_uv_set], snapshot: UVSetSnapshot = None
+) -> _t.Callable[[_nt.Mesh], _t.AnyStr]:
 	"""
 	To avoid unnecessary work per each item, it's better to first build a function
 	for a given (fixed) uv-set argument and just call it within loop unconditionally.
 	This factory does just that.
 
 	The returned function takes mesh and returns uv-set name as a string.
+	UV-sets are read from the ``snapshot``, if given.
 	"""
+	def get_source_uv_set_current(mesh: _nt.Mesh) -> _t.AnyStr:
+		return mesh_uv_set_current(mesh, snapshot)
+
 	if from_set is None:
-		return mesh_uv_set_current
+		return get_source_uv_set_current
 
 	def get_source_uv_set_str(mesh: _nt.Mesh) -> _t.AnyStr:
 		return from_set
 
 	def get_source_uv_set_int(mesh: _nt.Mesh) -> _t.AnyStr:
-		return mesh_uv_set_by_index(mesh, from_set, error_uv_set_label='source')
+		return mesh_uv_set_by_index(mesh, from_set, error_uv_set_label='source', snapshot=snapshot)
 
 	return get_source_uv_set_int if isinstance(from_set, int) else get_source_uv_set_str
 
 
-def _factory_target_uv_set_name_getter(to_set: _t.Optional[_h_uv_set]) -> _t.Callable[[_nt.Mesh], _t.Tuple[_t.AnyStr, bool]]:
+def _factory_target_uv_set_name_getter(
+	to_set: _t.Optional[_h_uv_set], snapshot: UVSetSnapshot = None
+) -> _t.Callable[[_nt.Mesh], _t.Tuple[_t.AnyStr, bool]]:
 	"""
 	Similar factory for target uv-set name getter.
 
@@ -166,14 +346,18 @@ def _factory_target_uv_set_name_getter(to_set: _t.Optional[_h_uv_set]) -> _t.Cal
 		- ``bool``: whether this set should be created as new one.
 	"""
 	def get_target_uv_set_always_new(mesh: _nt.Mesh) -> _t.Tuple[_t.AnyStr, bool]:
-		mesh_sets = mesh_uv_sets(mesh)
-		return default_set_name(len(mesh_sets)), True
+		mesh_sets = mesh_uv_sets(mesh, snapshot)
+		# The default name for the next index might be taken already (e.g., ``['map1', 'uvSet2']``):
+		index = len(mesh_sets)
+		while default_set_name(index) in mesh_sets:
+			index += 1
+		return default_set_name(index), True
 
 	if to_set is None:
 		return get_target_uv_set_always_new
 
 	def get_target_uv_set_str(mesh: _nt.Mesh) -> _t.Tuple[_t.AnyStr, bool]:
-		mesh_sets = mesh_uv_sets(mesh)
+		mesh_sets = mesh_uv_sets(mesh, snapshot)
 		return to_set, to_set in mesh_sets
 
 	if not isinstance(to_set, int):
@@ -191,7 +375,7 @@ def get_target_uv_set_str(mesh: _nt.Mesh) -> _t.Tuple[_t.AnyStr, bool]:
 		required_set_count = to_set
 
 	def get_target_uv_set_int_positive(mesh: _nt.Mesh) -> _t.Tuple[_t.AnyStr, bool]:
-		mesh_sets = mesh_uv_sets(mesh)
+		mesh_sets = mesh_uv_sets(mesh, snapshot)
 		n = len(mesh_sets)
 		if n < required_set_count:
 			raise InvalidUVSet.set_does_not_exist([mesh], to_set, uv_set_label='target')
@@ -200,7 +384,7 @@ def get_target_uv_set_int_positive(mesh: _nt.Mesh) -> _t.Tuple[_t.AnyStr, bool]:
 		return mesh_sets[to_set], False
 
 	def get_target_uv_set_int_negative(mesh: _nt.Mesh) -> _t.Tuple[_t.AnyStr, bool]:
-		mesh_sets = mesh_uv_sets(mesh)
+		mesh_sets = mesh_uv_sets(mesh, snapshot)
 		n = len(mesh_sets)
 		if n < required_set_count:
 			raise InvalidUVSet.set_does_not_exist([mesh], to_set, uv_set_label='target')
@@ -211,83 +395,180 @@ def get_target_uv_set_int_negative(mesh: _nt.Mesh) -> _t.Tuple[_t.AnyStr, bool]:
 	return get_target_uv_set_int_positive
 
 
-def _copy_uv(
-	items: _h_poly_selection_input_seq, from_set: _t.Optional[_h_uv_set], to_set: _t.Optional[_h_uv_set],
-	all_transform_descendents=True
-) -> _t.List[_nt.Mesh]:
-	grouped_by_mesh = _group_by_meshes_for_transfer(
-		items, from_set=from_set, to_set=to_set,
-		all_transform_descendents=all_transform_descendents
-	)
-	if not grouped_by_mesh:
-		return list()
-
-	get_source_uv_set_f = _factory_source_uv_set_name_getter(from_set)
-	get_target_uv_set_f = _factory_target_uv_set_name_getter(to_set)
+def _is_direct_copy(mesh_components: MeshComponents, engine: _t.AnyStr) -> bool:
+	"""Whether the mesh can be copied with direct array writes: the whole history-free shape."""
+	if engine != ENGINE_ARRAYS or not mesh_components.whole:
+		return False
+	return not _has_history(mesh_components.path)
 
-	for mesh, mesh_items in grouped_by_mesh.items():
-		source_set_name = get_source_uv_set_f(mesh)
-		target_set_name, make_new = get_target_uv_set_f(mesh)
-		_pm.polyCopyUV(mesh_items, uvSetNameInput=source_set_name, uvSetName=target_set_name, createNewMap=make_new)
 
-	return list(grouped_by_mesh.keys())
-
-
-_h_uv_as_vf = _t.Union[_t.List[_pm.MeshVertexFace], _h_poly_selection_input]
+def _copy_uv_plan_gen(
+	plan: TransferPlan, progress: _progress.ProgressReporter = None,
+	engine: _t.AnyStr = None, commit_each_step=False, skip_matching=False,
+) -> _t.Generator[None, None, CopyReport]:
+	"""
+	Copy UVs as planned, yielding after each mesh
+	(so it can be run as a `darlog_maya.scheduler` job).
 
+	With ``skip_matching`` (opt-in: it reads both sets of each whole mesh, whichever engine copies it),
+	whole meshes whose (existing) target set already has the same content as the source
+	(see `UVSetData.matches`) are skipped.
 
-def _convert_uv_to_vf_gen(
-	items: _h_poly_selection_input_seq
-) -> _t.Generator[_t.Tuple[bool, _h_uv_as_vf], _t.Any, None]:
+	Direct copies are registered in the undo queue together, when the generator ends (or is interrupted).
+	With ``commit_each_step``, they're registered before each ``yield`` instead:
+	needed when each step is run in its own undo chunk.
 	"""
-	Since Maya's UVs are locked per-set, we need to pre-convert all the actual UVs to vertex faces
-	to restore selection after transfer.
-	"""
-	for item in items:
-		if not isinstance(item, _pm.MeshUV):
-			yield True, item
-			continue
-
-		vertex_faces: _t.List[_pm.MeshVertexFace] = _pm.polyListComponentConversion(item, fromUV=True, toVertexFace=True)
-		yield False, vertex_faces
+	if progress is None:
+		progress = _progress.NullProgress()
+	if engine is None:
+		engine = default_engine()
+	if engine not in (ENGINE_ARRAYS, ENGINE_COMMAND):
+		raise ValueError("Unknown UV-copy engine: {}".format(repr(engine)))
+	skipped = list()  # type: _t.List[MeshTransfer]
+	if not plan:
+		return CopyReport(list(), skipped)
+
+	progress.start(len(plan), "Copying UVs")
+	# The same source on the same mesh (fan-out) is read only once:
+	last_source = None  # type: _t.Optional[_t.Tuple[_nt.Mesh, _t.AnyStr]]
+	source_data = None  # type: _t.Optional[UVSetData]
+	with UVTransfer() as transfer:
+		for i, mesh_transfer in enumerate(plan):
+			progress.update(i)
+			mesh_components = mesh_transfer.components
+			source = (mesh_transfer.mesh, mesh_transfer.source)
+			if source != last_source:
+				source_data = None
+				last_source = source
+
+			if skip_matching and mesh_components.whole and not mesh_transfer.create:
+				fn = _om.MFnMesh(_dag_path(mesh_components.path))
+				if source_data is None:
+					source_data = UVSetData.read(fn, mesh_transfer.source)
+				if source_data.matches(UVSetData.read(fn, mesh_transfer.target)):
+					skipped.append(mesh_transfer)
+					yield
+					continue
+
+			if _is_direct_copy(mesh_components, engine):
+				source_data = transfer.copy(
+					mesh_components.path, mesh_transfer.source, mesh_transfer.target, create=mesh_transfer.create,
+					data=source_data
+				)
+			else:
+				# The whole mesh or the minimal list of component ranges:
+				_pm.polyCopyUV(
+					mesh_components.command_args(),
+					uvSetNameInput=mesh_transfer.source, uvSetName=mesh_transfer.target,
+					createNewMap=mesh_transfer.create
+				)
+			if commit_each_step:
+				transfer.commit()
+			yield
+	progress.finish()
+
+	return CopyReport(plan.meshes, skipped)
 
 
-def _restore_uv_from_vf_back(flat_items: _t.Iterable[_t.Tuple[bool, _h_uv_as_vf]]):
-	for is_intact, item in flat_items:
-		if is_intact:
-			yield item
-		for uv in _pm.polyListComponentConversion(item, fromVertexFace=True, toUV=True):
-			yield uv
+def _copy_uv(
+	plan: TransferPlan, progress: _progress.ProgressReporter = None, engine: _t.AnyStr = None, skip_matching=False
+) -> CopyReport:
+	steps = _copy_uv_plan_gen(plan, progress=progress, engine=engine, skip_matching=skip_matching)
+	while True:
+		try:
+			next(steps)
+		except StopIteration as e:
+			return e.value
 
 
 def copy_uv(
 	items: _h_poly_selection_input_seq, from_set: _t.Optional[_h_uv_set] = None, to_set: _t.Optional[_h_uv_set] = None,
-	all_transform_descendents=True, do_print=True
+	all_transform_descendents=True, do_print=True, engine: _t.AnyStr = None, skip_matching=False
 ) -> _t.List[_nt.Mesh]:
 	"""
-	Batch-copy UVs between sets for multiple poly-shapes at once.
-
-	Unfortunately, not undoable :(
+	Batch-copy UVs between sets for multiple poly-shapes at once. The whole batch is a single undo step.
+
+	:param engine:
+		`ENGINE_ARRAYS` (default): whole history-free shapes are copied directly, without history nodes.
+		`ENGINE_COMMAND`: ``polyCopyUV`` for everything.
+	:param skip_matching:
+		Don't copy to whole shapes where the target set already matches the source.
+		Opt-in: the check itself reads both sets on each such shape.
 	"""
 
-	pre_selection_uv_as_vf = list(_convert_uv_to_vf_gen(_pm.ls(sl=1)))
+	pre_selection = SelectionSnapshot()
+	try:
+		plan = plan_copy_uv(items, from_set, to_set, all_transform_descendents=all_transform_descendents)
+	except InvalidUVSet as e:
+		_pm.select(_converter.meshes_to_transforms_if_only_one(e.meshes), r=1)
+		raise e
+	return _execute_plan(plan, pre_selection, do_print=do_print, engine=engine, skip_matching=skip_matching)
 
-	# with _undoable_context("uvSetsBulkCopyChunk"):  # not undoable :(
 
+def copy_uv_fan_out(
+	items: _h_poly_selection_input_seq, from_set: _t.Optional[_h_uv_set] = None,
+	to_sets: _t.Sequence[_t.Optional[_h_uv_set]] = (None, ),
+	all_transform_descendents=True, do_print=True, engine: _t.AnyStr = None, skip_matching=False
+) -> _t.List[_nt.Mesh]:
+	"""
+	Copy the same source UV-set to multiple target sets (see `plan_copy_uv_fan_out()`) in a single pass:
+	one selection conversion, one validation (reporting all the issues at once) and one undo step.
+	"""
+	pre_selection = SelectionSnapshot()
 	try:
-		meshes = _copy_uv(items, from_set, to_set, all_transform_descendents=all_transform_descendents)
+		plan = plan_copy_uv_fan_out(items, from_set, to_sets, all_transform_descendents=all_transform_descendents)
 	except InvalidUVSet as e:
-		_pm.select([_converter.mesh_to_transform_if_only_one(mesh) for mesh in e.meshes], r=1)
+		_pm.select(_converter.meshes_to_transforms_if_only_one(e.meshes), r=1)
 		raise e
+	return _execute_plan(plan, pre_selection, do_print=do_print, engine=engine, skip_matching=skip_matching)
+
+
+def execute_plan(
+	plan: TransferPlan, do_print=True, engine: _t.AnyStr = None, skip_matching=False
+) -> _t.List[_nt.Mesh]:
+	"""
+	Perform an already validated copy (see `plan_copy_uv()`), as a single undo step.
+	Like `copy_uv()`, restores the selection afterwards.
+	"""
+	return _execute_plan(plan, SelectionSnapshot(), do_print=do_print, engine=engine, skip_matching=skip_matching)
+
+
+def _execute_plan(
+	plan: TransferPlan, pre_selection: SelectionSnapshot,
+	do_print=True, engine: _t.AnyStr = None, skip_matching=False
+) -> _t.List[_nt.Mesh]:
+	try:
+		with _undoable_context("uvSetsBulkCopyChunk"), _progress.for_current_session() as progress:
+			report = _copy_uv(plan, progress=progress, engine=engine, skip_matching=skip_matching)
+	except _progress.Cancelled:
+		if do_print:
+			print("UV copy was cancelled. Undo to revert the shapes processed so far")
+		return list()
+
+	return _finish_copy(report, pre_selection, plan.from_set, plan.to_set, do_print=do_print)
+
 
+def _finish_copy(
+	report: CopyReport, pre_selection: SelectionSnapshot,
+	from_set: _t.Optional[_h_uv_set], to_set: _t.Union[_h_uv_set, None, _t.Tuple], do_print=True
+) -> _t.List[_nt.Mesh]:
+	"""Restore selection and report the result."""
+	def set_label(uv_set: _t.Optional[_h_uv_set]) -> str:
+		if uv_set is None:
+			return 'new'
+		return "<{}>".format(uv_set) if isinstance(uv_set, int) else repr(uv_set)
+
+	meshes = report.meshes
 	copy_from_to_suffix = ''
 	if do_print:
 		copy_from = ''
 		if from_set is not None:
-			copy_from = " from <{}>".format(from_set) if isinstance(from_set, int) else " from {}".format((repr(from_set)))
+			copy_from = " from {}".format(set_label(from_set))
 		copy_to = ''
-		if to_set is not None:
-			copy_to = " to <{}>".format(to_set) if isinstance(to_set, int) else " to {}".format((repr(to_set)))
+		if isinstance(to_set, tuple):
+			copy_to = " to {}".format(', '.join(set_label(x) for x in to_set))
+		elif to_set is not None:
+			copy_to = " to {}".format(set_label(to_set))
 		copy_from_to_suffix = '{}{} set'.format(copy_from, copy_to) if (copy_from or copy_to) else ''
 
 	if not meshes:
@@ -296,28 +577,70 @@ def copy_uv(
 		return list()
 
 	try:
-		restored_selection_with_uv = [
-			_converter.mesh_to_transform_if_only_one(x) if isinstance(x, _nt.Mesh) else x
-			for x in _restore_uv_from_vf_back(pre_selection_uv_as_vf)
-		]
-		_pm.select(restored_selection_with_uv, r=1)
+		pre_selection.restore()
 	except Exception:
 		pass
 
 	if do_print:
-		print("UVs on {} were copied{}".format(
+		print("UVs on {} were copied{}{}".format(
 			repr(meshes[0]) if len(meshes) == 1 else "{} poly-shapes".format(len(meshes)),
-			copy_from_to_suffix
+			copy_from_to_suffix,
+			"; skipped {} already matching".format(report.n_skipped) if report.skipped else ''
 		))
 	return meshes
 
 
+def copy_uv_async(
+	items: _h_poly_selection_input_seq, from_set: _t.Optional[_h_uv_set] = None, to_set: _t.Optional[_h_uv_set] = None,
+	all_transform_descendents=True, do_print=True, scheduler: _t.Optional[_scheduler.Scheduler] = None,
+	engine: _t.AnyStr = None, skip_matching=False
+) -> _t.Optional[_scheduler.Job]:
+	"""
+	Like `copy_uv()`, but the copy itself is done mesh by mesh in the background (on idle),
+	so the viewport stays interactive. Validation is still done right away, raising the same errors.
+	Each tick of the job is a separate undo step.
+
+	Cancel with Esc (main progress bar) or ``job.cancel()``.
+	Returns the scheduled job (its result is a `CopyReport`),
+	or ``None`` if there's nothing to copy.
+	"""
+	pre_selection = SelectionSnapshot()
+	try:
+		plan = plan_copy_uv(items, from_set, to_set, all_transform_descendents=all_transform_descendents)
+	except InvalidUVSet as e:
+		_pm.select(_converter.meshes_to_transforms_if_only_one(e.meshes), r=1)
+		raise e
+	if not plan:
+		_finish_copy(CopyReport(list(), list()), pre_selection, from_set, to_set, do_print=do_print)
+		return None
+
+	def on_done(job: _scheduler.Job):
+		_finish_copy(job.result, pre_selection, from_set, to_set, do_print=do_print)
+
+	def on_cancel(job: _scheduler.Job):
+		if do_print:
+			print("UV copy was cancelled. The shapes processed so far keep the copied UVs (undoable)")
+
+	progress = _progress.for_current_session()
+	job = _scheduler.Job(
+		_copy_uv_plan_gen(
+			plan, progress=progress, engine=engine, commit_each_step=True, skip_matching=skip_matching
+		),
+		name='uvSetsBulkCopyChunk', undo_chunk=True,
+		progress=progress, on_done=on_done, on_cancel=on_cancel,
+	)
+	if scheduler is None:
+		scheduler = _scheduler.default_scheduler()
+	return scheduler.submit(job)
+
+
 def copy_uv_on_selection(
 	from_set: _t.Optional[_h_uv_set] = None, to_set: _t.Optional[_h_uv_set] = None,
-	all_transform_descendents=True, do_print=True
+	all_transform_descendents=True, do_print=True, engine: _t.AnyStr = None, skip_matching=False
 ) -> _t.List[_nt.Mesh]:
 	return copy_uv(
-		(x for x in _pm.ls(sl=1) if isinstance(x, _t_poly_object_or_comp)),
+		_active_poly_selection(),
 		from_set=from_set, to_set=to_set,
-		all_transform_descendents=all_transform_descendents, do_print=do_print
+		all_transform_descendents=all_transform_descendents, do_print=do_print,
+		engine=engine, skip_matching=skip_matching
 	)
@@ -11,23 +11,22 @@
 from pymel.core import nodetypes as _nt
 
 from darlog_maya.ls_convert import (
-	cleanup_input,
-	FromToMesh,
-
 	_h_poly_object,
 	_h_poly_selection_input_seq,
 )
+from darlog_maya.ls_convert_api import FromToMeshApi, active_selection as _active_selection
+from darlog_maya import progress as _progress
 from darlog_maya.py23 import *
 from darlog_maya.undo import undoable_context as _undoable_context
 from darlog_maya.user_interaction import print
-from darlog_maya.uv_set import InvalidUVSet, mesh_uv_sets, is_valid_name, rename_uv_set_in_meshes
+from darlog_maya.uv_set import InvalidUVSet, UVSetSnapshot, mesh_uv_sets, is_valid_name, rename_uv_set_in_meshes
 
 try:
 	import typing as _t
 except ImportError:
 	pass
 
-_converter = FromToMesh(no_intermediate_shapes=True)
+_converter = FromToMeshApi(no_intermediate_shapes=True, mesh_pynodes=True)
 
 
 def _rename_uv_set_in_mesh(mesh: _nt.Mesh, index: int, new_name: str):
@@ -48,13 +47,15 @@ def _rename_uv_set_in_mesh(mesh: _nt.Mesh, index: int, new_name: str):
 
 def _list_meshes_for_uv_rename(
 	items: _h_poly_selection_input_seq,
-	index=0, name='map1', all_transform_descendents=True
+	index=0, name='map1', all_transform_descendents=True, snapshot: UVSetSnapshot = None
 ) -> _t.List[_nt.Mesh]:
 	"""
 	Error-check all the inputs and then list the shapes pending for UV-rename.
 
 	The pre-check is done in order to list problematic meshes if any issue is found.
 	Which, in turn, is done to auto-select them.
+
+	UV-sets of all the meshes are captured into the ``snapshot`` (if given), to be reused by the rename itself.
 	"""
 	if not isinstance(index, int):
 		raise TypeError("UV-set index must be an int. Got {}: {}".format(type(index), repr(index)))
@@ -64,12 +65,7 @@ def _list_meshes_for_uv_rename(
 	if not is_valid_name(name):
 		raise ValueError("Invalid UV-set name: {}".format(repr(name)))
 
-	items_list = cleanup_input(items)
-
-	if not items_list:
-		return list()
-
-	meshes, error_input = _converter.to_meshes(items_list, all_transform_descendents=all_transform_descendents)
+	meshes, error_input = _converter.to_meshes(items, all_transform_descendents=all_transform_descendents)
 	if error_input:
 		raise ValueError(
 			"Unsupported value: {}".format(repr(error_input[0]))
@@ -78,12 +74,15 @@ def _list_meshes_for_uv_rename(
 		)
 
 	assert len(error_input) == 0
+	if snapshot is None:
+		snapshot = UVSetSnapshot()
+	snapshot.refresh(meshes)
 
 	meshes_for_rename = list()  # type: _t.List[_nt.Mesh]
 	meshes_with_name_clashes = list()  # type: _t.List[_t.Tuple[_nt.Mesh, _t.List[str]]]
 	meshes_with_wrong_uv_sets = list(meshes_with_name_clashes)
 	for mesh in meshes:
-		uv_sets = mesh_uv_sets(mesh)
+		uv_sets = mesh_uv_sets(mesh, snapshot)
 		try:
 			current_set = uv_sets[index]
 		except IndexError:
@@ -137,7 +136,7 @@ def verify_on_objects_or_components(
 			items, index=index, name=name, all_transform_descendents=all_transform_descendents
 		)
 	except InvalidUVSet as e:
-		_pm.select([_converter.mesh_to_transform_if_only_one(mesh) for mesh in e.meshes], r=1)
+		_pm.select(_converter.meshes_to_transforms_if_only_one(e.meshes), r=1)
 		raise e
 
 	if not meshes_for_rename:
@@ -145,7 +144,7 @@ def verify_on_objects_or_components(
 			print("All the meshes have UV-set <{}> named {}".format(index, repr(name)))
 		return list()
 
-	res = [_converter.mesh_to_transform_if_only_one(mesh) for mesh in meshes_for_rename]
+	res = _converter.meshes_to_transforms_if_only_one(meshes_for_rename)
 	_pm.select(res, r=1)
 
 	if do_print:
@@ -163,7 +162,7 @@ def verify_on_selection(
 	index=0, name='map1', all_transform_descendents=True, do_print=True
 ) -> _t.List[_h_poly_object]:
 	return verify_on_objects_or_components(
-		_pm.ls(sl=1),
+		_active_selection(),
 		index=index, name=name,
 		all_transform_descendents=all_transform_descendents, do_print=do_print
 	)
@@ -173,12 +172,13 @@ def rename_on_objects_or_components(
 	items: _h_poly_selection_input_seq,
 	index=0, name='map1', all_transform_descendents=True, do_print=True
 ) -> _t.List[_h_poly_object]:
+	snapshot = UVSetSnapshot()
 	try:
 		meshes_for_rename = _list_meshes_for_uv_rename(
-			items, index=index, name=name, all_transform_descendents=all_transform_descendents
+			items, index=index, name=name, all_transform_descendents=all_transform_descendents, snapshot=snapshot
 		)
 	except InvalidUVSet as e:
-		_pm.select([_converter.mesh_to_transform_if_only_one(mesh) for mesh in e.meshes], r=1)
+		_pm.select(_converter.meshes_to_transforms_if_only_one(e.meshes), r=1)
 		raise e
 
 	if not meshes_for_rename:
@@ -186,11 +186,16 @@ def rename_on_objects_or_components(
 			print("All the meshes have UV-set <{}> named {}".format(index, repr(name)))
 		return list()
 
-	res = [_converter.mesh_to_transform_if_only_one(mesh) for mesh in meshes_for_rename]
+	res = _converter.meshes_to_transforms_if_only_one(meshes_for_rename)
 
-	with _undoable_context("uvSetsRenameChunk"):
-		rename_uv_set_in_meshes(meshes_for_rename, index, name)
-		_pm.select(res, r=1)
+	try:
+		with _undoable_context("uvSetsRenameChunk"), _progress.for_current_session() as progress:
+			rename_uv_set_in_meshes(meshes_for_rename, index, name, progress=progress, snapshot=snapshot)
+			_pm.select(res, r=1)
+	except _progress.Cancelled:
+		if do_print:
+			print("UV-set rename was cancelled. Undo to revert the already renamed ones")
+		return list()
 
 	if do_print:
 		print(
@@ -207,7 +212,7 @@ def rename_on_selection(
 	index=0, name='map1', all_transform_descendents=True, do_print=True
 ) -> _t.List[_h_poly_object]:
 	return rename_on_objects_or_components(
-		_pm.ls(sl=1),
+		_active_selection(),
 		index=index, name=name,
 		all_transform_descendents=all_transform_descendents, do_print=do_print
 	)
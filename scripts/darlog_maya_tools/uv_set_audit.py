@@ -0,0 +1,192 @@
+# encoding: utf-8
+"""
+Scene-wide audit of UV-set layouts: which meshes have which UV-sets (in which order).
+
+All the meshes are visited with a single dependency-node iterator, and their layouts are
+collected into a compact index: each distinct layout (signature) is stored once,
+and each mesh refers to it by number. Then, meshes are grouped by signature,
+e.g. ``('map1', 'lightmap')`` > 1240 meshes, and the ones not matching the expected
+(or the most common) layout are reported as outliers.
+
+Optionally, UV-sets with identical content on the same mesh (duplicates) are found, too,
+by their fingerprints (see `darlog_maya.uv_transfer.UVSetData.fingerprint`).
+
+The report can be exported to JSON.
+"""
+
+__author__ = 'Lex Darlog (DRL)'
+
+from array import array as _array
+import io as _io
+import json as _json
+
+from maya.api import OpenMaya as _om
+from pymel import core as _pm
+
+from darlog_maya.ls_convert_api import FromToMeshApi
+from darlog_maya.py23 import *
+from darlog_maya.user_interaction import print
+from darlog_maya.uv_transfer import duplicate_uv_sets
+
+try:
+	import typing as _t
+except ImportError:
+	pass
+
+_converter = FromToMeshApi(no_intermediate_shapes=True)
+
+_h_signature = _t.Tuple[_t.AnyStr, ...]
+
+
+class UVLayoutIndex(object):
+	"""
+	UV-set layouts of many meshes.
+
+	Each distinct signature (the tuple of UV-set names in their order) is stored only once.
+	Per mesh, only its full path and the signature number are kept.
+	"""
+
+	def __init__(self):
+		super(UVLayoutIndex, self).__init__()
+		self.signatures = list()  # type: _t.List[_h_signature]
+		self.mesh_paths = list()  # type: _t.List[_t.AnyStr]
+		self.mesh_signatures = _array('i')
+		# Only for the meshes with duplicate UV-sets, if they were searched for:
+		self.duplicates = dict()  # type: _t.Dict[_t.AnyStr, _t.List[_t.List[_t.AnyStr]]]
+		self.__signature_ids = dict()  # type: _t.Dict[_h_signature, int]
+
+	def __len__(self):
+		return len(self.mesh_paths)
+
+	def add(
+		self, mesh_path: _t.AnyStr, uv_sets: _t.Iterable[_t.AnyStr],
+		duplicates: _t.List[_t.List[_t.AnyStr]] = None
+	) -> int:
+		"""Add a mesh. Returns the number of its signature."""
+		if duplicates:
+			self.duplicates[mesh_path] = duplicates
+		signature = tuple(uv_sets)
+		signature_id = self.__signature_ids.get(signature)
+		if signature_id is None:
+			signature_id = len(self.signatures)
+			self.__signature_ids[signature] = signature_id
+			self.signatures.append(signature)
+		self.mesh_paths.append(mesh_path)
+		self.mesh_signatures.append(signature_id)
+		return signature_id
+
+	def signature_of(self, i: int) -> _h_signature:
+		return self.signatures[self.mesh_signatures[i]]
+
+	def counts(self) -> _t.List[_t.Tuple[_h_signature, int]]:
+		"""All the signatures with the number of meshes having each, the most common first."""
+		n_per_id = [0] * len(self.signatures)
+		for signature_id in self.mesh_signatures:
+			n_per_id[signature_id] += 1
+		order = sorted(_range(len(self.signatures)), key=lambda i: (-n_per_id[i], self.signatures[i]))
+		return [(self.signatures[i], n_per_id[i]) for i in order]
+
+	def groups(self) -> _t.Dict[_h_signature, _t.List[_t.AnyStr]]:
+		"""Mesh paths per signature, the most common signature first."""
+		res = {signature: list() for signature, n in self.counts()}  # type: _t.Dict[_h_signature, _t.List[_t.AnyStr]]
+		for path, signature_id in _zip(self.mesh_paths, self.mesh_signatures):
+			res[self.signatures[signature_id]].append(path)
+		return res
+
+	def most_common(self) -> _t.Optional[_h_signature]:
+		counts = self.counts()
+		return counts[0][0] if counts else None
+
+	def outliers(self, expected: _t.Iterable[_t.AnyStr] = None) -> _t.List[_t.AnyStr]:
+		"""
+		Paths of the meshes with a layout other than the ``expected`` one
+		(by default, other than the most common one).
+		"""
+		expected = self.most_common() if expected is None else tuple(expected)
+		expected_id = self.__signature_ids.get(expected, -1)
+		return [
+			path for path, signature_id in _zip(self.mesh_paths, self.mesh_signatures)
+			if signature_id != expected_id
+		]
+
+	def as_dict(self, expected: _t.Iterable[_t.AnyStr] = None) -> _t.Dict[_t.AnyStr, _t.Any]:
+		"""JSON-friendly representation of the whole report."""
+		expected = self.most_common() if expected is None else tuple(expected)
+		groups = self.groups()
+		return dict(
+			meshes=len(self),
+			expected=None if expected is None else list(expected),
+			signatures=[
+				dict(uv_sets=list(signature), count=len(paths), meshes=paths)
+				for signature, paths in groups.items()
+			],
+			outliers=self.outliers(expected),
+			duplicates=self.duplicates,
+		)
+
+	def export_json(self, file_path: _t.AnyStr, expected: _t.Iterable[_t.AnyStr] = None, indent=1):
+		with _io.open(file_path, 'w', encoding='utf-8') as f:
+			f.write(_unicode(_json.dumps(self.as_dict(expected), indent=indent, ensure_ascii=False)))
+
+	def summary(self, expected: _t.Iterable[_t.AnyStr] = None, max_signatures=20) -> str:
+		expected = self.most_common() if expected is None else tuple(expected)
+		counts = self.counts()
+		lines = [
+			"{} meshes, {} distinct UV-set layouts, {} outliers (not matching {}):".format(
+				len(self), len(counts), len(self.outliers(expected)), repr(list(expected or ()))
+			)
+		]
+		lines.extend(
+			"\t{}\t{}{}".format(n, list(signature), '' if signature != expected else '\t(expected)')
+			for signature, n in counts[:max_signatures]
+		)
+		if len(counts) > max_signatures:
+			lines.append("\t... {} more".format(len(counts) - max_signatures))
+		if self.duplicates:
+			lines.append("{} meshes have UV-sets with identical content".format(len(self.duplicates)))
+		return '\n'.join(lines)
+
+
+def index_scene(no_intermediate_shapes=True, find_duplicates=False) -> UVLayoutIndex:
+	"""
+	Collect UV-set layouts of all the meshes in the scene, in a single dependency-node iterator pass.
+
+	:param find_duplicates: Also find UV-sets with identical content (reads UVs of every mesh with 2+ sets).
+	"""
+	index = UVLayoutIndex()
+	it = _om.MItDependencyNodes(_om.MFn.kMesh)
+	fn = _om.MFnMesh()
+	while not it.isDone():
+		fn.setObject(it.thisNode())
+		if not (no_intermediate_shapes and fn.isIntermediateObject):
+			uv_sets = fn.getUVSetNames()
+			duplicates = duplicate_uv_sets(fn, uv_sets) if find_duplicates and len(uv_sets) > 1 else None
+			index.add(fn.fullPathName(), uv_sets, duplicates)
+		it.next()
+	return index
+
+
+def audit_scene(
+	expected: _t.Iterable[_t.AnyStr] = None, json_path: _t.AnyStr = None,
+	select_outliers=False, no_intermediate_shapes=True, find_duplicates=False, do_print=True
+) -> UVLayoutIndex:
+	"""
+	Index UV-set layouts of all the meshes in the scene and report the outliers.
+
+	:param expected: The layout every mesh should have. By default, the most common one.
+	:param json_path: If given, the report is also saved to this JSON file.
+	:param select_outliers: Select the outliers (their transforms if they're the only shape).
+	:param find_duplicates: Also list meshes with UV-sets of identical content.
+	"""
+	index = index_scene(no_intermediate_shapes=no_intermediate_shapes, find_duplicates=find_duplicates)
+	if json_path:
+		index.export_json(json_path, expected)
+	if select_outliers:
+		outliers = index.outliers(expected)
+		if outliers:
+			_pm.select(_converter.meshes_to_transforms_if_only_one(outliers), r=1)
+		else:
+			_pm.select(clear=True)
+	if do_print:
+		print(index.summary(expected))
+	return index